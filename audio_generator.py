@@ -3,32 +3,35 @@ Audio generation using OpenAI TTS or gTTS.
 """
 import os
 from pathlib import Path
-from openai import OpenAI
 from gtts import gTTS
 from config import Config
 from models_schemas import Script
+from tts_batch import TTSJob, synthesize_threaded
+from tts_cache import get_tts_cache
+from clients import get_openai_client
 
 
 class AudioGenerator:
     """Generates narration audio from scripts."""
     
-    def __init__(self, use_openai_tts: bool = True):
+    def __init__(self, use_openai_tts: bool = True, chunk_chars: int = None):
         """
         Initialize the audio generator.
         
         Args:
             use_openai_tts: If True, use OpenAI TTS. If False, use free gTTS.
+            chunk_chars: Synthesize long narration in sentence chunks of about this
+                many characters, in parallel (default: Config.TTS_CHUNK_CHARS; 0 = off)
         """
         self.use_openai_tts = use_openai_tts
+        self.chunk_chars = Config.TTS_CHUNK_CHARS if chunk_chars is None else chunk_chars
         if use_openai_tts:
-            client_kwargs = {"api_key": Config.OPENAI_API_KEY}
             # Note: OpenRouter may not support TTS, so this might fail
             # In that case, fall back to gTTS
-            if Config.OPENAI_BASE_URL:
-                client_kwargs["base_url"] = Config.OPENAI_BASE_URL
-            self.client = OpenAI(**client_kwargs)
+            self.client = get_openai_client()
             self.model = Config.OPENAI_TTS_MODEL
             self.voice = Config.OPENAI_TTS_VOICE
+        self.cache = get_tts_cache()
     
     def generate_narration(self, script: Script, output_dir: str = "output/audio"):
         """
@@ -46,25 +49,34 @@ class AudioGenerator:
         # Create output directory
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
-        audio_files = []
-        
-        for scene in script.scenes:
-            audio_path = os.path.join(
-                output_dir,
-                f"scene_{scene.scene_number}_narration.mp3"
+        jobs = [
+            TTSJob(
+                scene_number=scene.scene_number,
+                text=scene.narration,
+                output_path=os.path.join(output_dir, f"scene_{scene.scene_number}_narration.mp3"),
+                cache_key=self.cache_key(scene.narration)
             )
-            
-            if self.use_openai_tts:
-                self._generate_openai_tts(scene.narration, audio_path)
-            else:
-                self._generate_gtts(scene.narration, audio_path)
-            
-            audio_files.append(audio_path)
-            print(f"  [OK] Scene {scene.scene_number} audio saved")
+            for scene in script.scenes
+        ]
         
-        print(f"[OK] Generated {len(audio_files)} audio files")
+        # Both backends block on network I/O, so scenes are synthesized on a thread pool
+        synthesize = self._generate_openai_tts if self.use_openai_tts else self._generate_gtts
+        hits = self.cache.hits if self.cache else 0
+        audio_files = synthesize_threaded(jobs, synthesize, cache=self.cache, chunk_chars=self.chunk_chars)
+        
+        cached = f" ({self.cache.hits - hits} from cache)" if self.cache else ""
+        print(f"[OK] Generated {len(audio_files)} audio files{cached}")
         return audio_files
     
+    def cache_key(self, text: str):
+        """Narration cache key for a text with the current backend and voice (None without a cache)."""
+        if not self.cache:
+            return None
+        options = {"chunk_chars": self.chunk_chars} if self.chunk_chars else {}
+        if self.use_openai_tts:
+            return self.cache.make_key("openai", self.voice, text, model=self.model, **options)
+        return self.cache.make_key("gtts", "en", text, slow=False, **options)
+    
     def _generate_openai_tts(self, text: str, output_path: str):
         """Generate audio using OpenAI TTS."""
         response = self.client.audio.speech.create(
@@ -0,0 +1,144 @@
+"""
+Cheap audio duration probing.
+MP3 durations are computed from the frame headers alone (4 bytes per frame,
+nothing is decoded), so narration can be measured before rendering without
+starting ffmpeg. Other formats fall back to ffmpeg's stream summary.
+"""
+import os
+from typing import Optional
+from ffmpeg_tools import probe_duration
+
+# Bitrates in kbit/s, indexed by the header's 4-bit bitrate index
+_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 25: [11025, 12000, 8000]}
+_VERSIONS = {3: 1, 2: 2, 0: 25}     # Header version bits -> MPEG 1, 2 or 2.5
+_LAYERS = {3: 1, 2: 2, 1: 3}        # Header layer bits -> Layer I, II or III
+
+
+def _parse_header(data: bytes, pos: int) -> Optional[tuple]:
+    """
+    Decode the MPEG audio frame header at pos.
+    
+    Returns:
+        (frame length in bytes, samples in the frame, sample rate, mono), or None
+    """
+    if pos + 4 > len(data) or data[pos] != 0xFF or data[pos + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = _VERSIONS.get((b1 >> 3) & 3)
+    layer = _LAYERS.get((b1 >> 1) & 3)
+    bitrate_index, rate_index = b2 >> 4, (b2 >> 2) & 3
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    
+    bitrate = _BITRATES[(min(version, 2), layer)][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 576 if layer == 3 and version != 1 else 1152
+        length = samples // 8 * bitrate // sample_rate + padding
+    mono = (b3 >> 6) == 3
+    return length, samples, sample_rate, mono
+
+
+def _id3v2_size(data: bytes) -> int:
+    """Bytes taken by a leading ID3v2 tag (0 if there is none)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _gapless_trim(data: bytes, xing_at: int) -> int:
+    """Encoder delay + padding (in samples) from a LAME/Lavc tag after the Xing header."""
+    flags = int.from_bytes(data[xing_at + 4:xing_at + 8], "big")
+    offset = xing_at + 8
+    for flag, size in ((1, 4), (2, 4), (4, 100), (8, 4)):   # frames, bytes, TOC, quality
+        if flags & flag:
+            offset += size
+    if data[offset:offset + 4] not in (b"LAME", b"Lavc", b"Lavf"):
+        return 0
+    d = data[offset + 21:offset + 24]
+    if len(d) < 3:
+        return 0
+    delay = (d[0] << 4) | (d[1] >> 4)
+    padding = ((d[1] & 0x0F) << 8) | d[2]
+    return delay + padding
+
+
+def mp3_duration(path: str) -> Optional[float]:
+    """
+    Duration of an MP3 file from its frame headers.
+    
+    Every frame header is walked (rather than trusting a Xing/VBRI summary),
+    so concatenated and VBR files such as gTTS output are measured exactly.
+    
+    Returns:
+        Duration in seconds, or None if no MPEG audio frames were found
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    
+    pos = _id3v2_size(data)
+    total_samples = 0
+    trimmed = 0
+    sample_rate = None
+    first = True
+    while pos < len(data) - 4:
+        header = _parse_header(data, pos)
+        if header is None:
+            # Junk or a trailing tag: resync on the next frame header
+            pos = data.find(b"\xff", pos + 1)
+            if pos < 0:
+                break
+            continue
+        length, samples, rate, mono = header
+        if first:
+            # A Xing/Info/VBRI frame carries metadata, not audio
+            side_info = (17 if mono else 32) if samples == 1152 else (9 if mono else 17)
+            tag_at = pos + 4 + side_info
+            first = False
+            if data[tag_at:tag_at + 4] in (b"Xing", b"Info"):
+                trimmed = _gapless_trim(data, tag_at)
+                pos += length
+                continue
+            if data[pos + 36:pos + 40] == b"VBRI":
+                pos += length
+                continue
+        total_samples += samples
+        sample_rate = rate
+        pos += max(length, 1)
+    
+    if not sample_rate:
+        return None
+    return max(0, total_samples - trimmed) / sample_rate
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """
+    Duration of an audio file, reading only MP3 headers where possible.
+    
+    Returns:
+        Duration in seconds, or None if the file is missing or unreadable
+    """
+    if not path or not os.path.exists(path):
+        return None
+    if path.lower().endswith(".mp3"):
+        try:
+            duration = mp3_duration(path)
+            if duration:
+                return duration
+        except OSError:
+            return None
+    return probe_duration(path)
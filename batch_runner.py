@@ -0,0 +1,195 @@
+"""
+Batch generation of many topics (e.g. a course syllabus) in one process.
+Each topic runs through its own VideoPipeline, a few at a time. The pipelines
+share the pooled API client and the process-wide LLM, TTS and render budgets
+(see clients.py). Progress is written to a JSON manifest after every topic,
+so an interrupted batch resumes where it stopped instead of starting over.
+"""
+import os
+import json
+import time
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Type
+from pydantic import BaseModel
+from config import Config
+from pipeline import VideoPipeline
+
+
+class TopicRecord(BaseModel):
+    """Progress of one topic in a batch."""
+    topic: str
+    output_name: str
+    status: str = "pending"   # "pending", "running", "done" or "failed"
+    attempts: int = 0
+    video: Optional[str] = None
+    results: Optional[str] = None
+    error: Optional[str] = None
+    seconds: Optional[float] = None
+    finished_at: Optional[str] = None
+
+
+class BatchManifest:
+    """Per-topic progress, saved atomically after every change."""
+    
+    def __init__(self, path: str):
+        """
+        Load the manifest at path, or start an empty one.
+        
+        Args:
+            path: JSON file the progress is kept in
+        """
+        self.path = path
+        self.topics: Dict[str, TopicRecord] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.topics = {
+                name: TopicRecord(**record) for name, record in data.get("topics", {}).items()
+            }
+    
+    def record(self, topic: str, output_name: str) -> TopicRecord:
+        """The topic's record, created as pending if it is new."""
+        with self._lock:
+            if output_name not in self.topics:
+                self.topics[output_name] = TopicRecord(topic=topic, output_name=output_name)
+            return self.topics[output_name]
+    
+    def is_done(self, output_name: str) -> bool:
+        """Whether a topic finished and its video is still on disk."""
+        record = self.topics.get(output_name)
+        return bool(record and record.status == "done" and record.video and os.path.exists(record.video))
+    
+    def update(self, output_name: str, **fields):
+        """Change a topic's record and save the manifest."""
+        with self._lock:
+            record = self.topics[output_name]
+            for key, value in fields.items():
+                setattr(record, key, value)
+            self._save()
+    
+    def save(self):
+        with self._lock:
+            self._save()
+    
+    def _save(self):
+        # Written to a temporary file first, so a crash never leaves a truncated manifest
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "topics": {name: record.model_dump() for name, record in self.topics.items()}
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+def read_topics_file(path: str) -> List[str]:
+    """
+    Read one topic per line, skipping blank lines and # comments.
+    
+    Returns:
+        Topics in file order
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = [line.strip() for line in f]
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+class BatchRunner:
+    """Runs many topics through the video pipeline with a resumable manifest."""
+    
+    def __init__(self, manifest_path: str = None, max_workers: int = None,
+                 pipeline_class: Type[VideoPipeline] = VideoPipeline, trace: bool = None,
+                 **pipeline_options):
+        """
+        Initialize the runner.
+        
+        Args:
+            manifest_path: Progress manifest (default: <OUTPUT_DIR>/batch_manifest.json)
+            max_workers: Topics generated at the same time (default: Config.BATCH_WORKERS)
+            pipeline_class: VideoPipeline or a variant such as EnhancedVideoPipeline
+            trace: Write a Chrome trace per topic (default: Config.PIPELINE_TRACE)
+            **pipeline_options: Passed to every pipeline (e.g. style, blueprint_mode)
+        """
+        self.manifest = BatchManifest(manifest_path or os.path.join(Config.OUTPUT_DIR, "batch_manifest.json"))
+        self.max_workers = max(1, max_workers or Config.BATCH_WORKERS)
+        self.pipeline_class = pipeline_class
+        self.trace = trace
+        self.pipeline_options = pipeline_options
+    
+    def run(self, topics: List[str]) -> List[TopicRecord]:
+        """
+        Generate a video for every topic that has not been finished yet.
+        
+        Topics recorded as done (with their video still present) are skipped;
+        failed topics and topics interrupted mid-run are generated again,
+        resuming from the stages they had finished.
+        
+        Returns:
+            The records of all topics, in the given order
+        """
+        names = {}
+        for topic in topics:
+            names.setdefault(VideoPipeline.output_name(topic), topic)
+        for name, topic in names.items():
+            self.manifest.record(topic, name)
+        self.manifest.save()
+        
+        pending = [(topic, name) for name, topic in names.items() if not self.manifest.is_done(name)]
+        print("="*70)
+        print(f"[BATCH] {len(names)} topics, {len(names) - len(pending)} already done, "
+              f"{len(pending)} to generate ({self.max_workers} at a time)")
+        print(f"[BATCH] Manifest: {self.manifest.path}")
+        print("="*70)
+        
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as pool:
+                futures = {pool.submit(self.run_topic, topic, name): name for topic, name in pending}
+                for finished, future in enumerate(as_completed(futures), 1):
+                    record = self.manifest.topics[futures[future]]
+                    mark = "[OK]" if record.status == "done" else "[X]"
+                    print(f"\n[BATCH] ({finished}/{len(pending)}) {mark} {record.topic}")
+        
+        records = [self.manifest.topics[name] for name in names]
+        done = sum(1 for record in records if record.status == "done")
+        print(f"\n[BATCH] {done}/{len(records)} topics done")
+        for record in records:
+            if record.status != "done":
+                print(f"  [X] {record.topic}: {record.error}")
+        return records
+    
+    def run_topic(self, topic: str, output_name: str):
+        """Generate one topic and record the outcome in the manifest."""
+        record = self.manifest.topics[output_name]
+        self.manifest.update(output_name, status="running", attempts=record.attempts + 1, error=None)
+        start = time.perf_counter()
+        try:
+            # Each topic gets its own scene directory so concurrent renders never share files
+            pipeline = self.pipeline_class(
+                scene_dir=os.path.join(Config.OUTPUT_DIR, f"{output_name}_scenes"),
+                **self.pipeline_options
+            )
+            # Whatever an interrupted attempt finished is reused
+            results = pipeline.generate_video(topic, output_name, resume=True, trace=self.trace)
+            if not os.path.exists(results["video"]):
+                raise RuntimeError("No video was produced")
+            self.manifest.update(
+                output_name,
+                status="done",
+                video=results["video"],
+                results=os.path.join(Config.OUTPUT_DIR, f"{output_name}_results.json"),
+                seconds=round(time.perf_counter() - start, 1),
+                finished_at=time.strftime("%Y-%m-%dT%H:%M:%S")
+            )
+        except Exception as e:
+            traceback.print_exc()
+            self.manifest.update(
+                output_name,
+                status="failed",
+                error=str(e) or type(e).__name__,
+                seconds=round(time.perf_counter() - start, 1),
+                finished_at=time.strftime("%Y-%m-%dT%H:%M:%S")
+            )
@@ -0,0 +1,456 @@
+"""
+Offline benchmarks for the render and assembly hot paths.
+Runs on the checked-in blueprint fixtures with stub LLM and TTS backends, so
+nothing touches the network and timings depend only on the code and the
+machine. Every case is compared with a stored baseline recorded on the same
+machine; regressions and cases that fail are listed and make the run exit
+non-zero. No baseline is checked in (timings only compare on the machine
+that recorded them), so record one first on a fresh checkout.
+
+Usage:
+    python benchmark.py --update-baseline        # record the baseline
+    python benchmark.py                          # compare against it
+    python benchmark.py --styles all --presets draft production --repeat 5
+"""
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+import importlib.util
+from contextlib import redirect_stdout
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+from pydantic import BaseModel
+from config import Config
+from models_schemas import Script, VideoBlueprint
+from render_styles import STYLES
+from render_presets import PRESETS
+from ffmpeg_tools import run_ffmpeg
+from tts_batch import TTSJob, synthesize_threaded
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(REPO_DIR, "output")
+FIXTURES = ["how_dns_works_video", "what_is_api_video", "how_api_works_video"]
+CASES = ["codegen", "manim_render", "simple_frames", "simple_encode", "assembly", "pipeline"]
+DEFAULT_BASELINE = os.path.join(REPO_DIR, "benchmark_baseline.json")
+
+# Differences below these are measurement noise, whatever the percentage
+MIN_SECONDS = 0.05
+MIN_MB = 5.0
+
+
+class CaseResult(BaseModel):
+    """Measurements of one benchmark case."""
+    name: str
+    seconds: Optional[float] = None           # Median of the timed runs
+    runs: List[float] = []
+    peak_mb: Optional[float] = None           # Peak Python heap (tracemalloc) during the warm-up run
+    per_scene: Dict[str, float] = {}          # Median seconds per scene, where measured
+    per_frame_ms: Optional[float] = None
+    skipped: Optional[str] = None             # Not applicable here, e.g. Manim is not installed
+    error: Optional[str] = None               # The case (or its fixture setup) raised
+
+
+class StubLLMClient:
+    """Answers chat completions with fixture JSON: the script for plain requests, the blueprint for streamed ones."""
+    
+    def __init__(self, script: Script, blueprint: VideoBlueprint, chunk_size: int = 200):
+        self.script_json = json.dumps(script.model_dump())
+        self.blueprint_json = json.dumps(blueprint.model_dump())
+        self.chunk_size = chunk_size
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+    
+    def create(self, stream: bool = False, **request):
+        if not stream:
+            message = SimpleNamespace(content=self.script_json)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+        text = self.blueprint_json
+        return (
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + self.chunk_size]))])
+            for i in range(0, len(text), self.chunk_size)
+        )
+
+
+class StubTTS:
+    """Writes silent MP3 narration (2.5 words per second) instead of calling a TTS service."""
+    
+    def generate_narration(self, script: Script, output_dir: str) -> List[str]:
+        os.makedirs(output_dir, exist_ok=True)
+        jobs = [
+            TTSJob(
+                scene_number=scene.scene_number,
+                text=scene.narration,
+                output_path=os.path.join(output_dir, f"scene_{scene.scene_number}_narration.mp3")
+            )
+            for scene in script.scenes
+        ]
+        return synthesize_threaded(jobs, self.synthesize)
+    
+    def synthesize(self, text: str, output_path: str):
+        seconds = max(1.0, len(text.split()) / 2.5)
+        run_ffmpeg(
+            "-f", "lavfi", "-i", "anullsrc=channel_layout=mono:sample_rate=24000",
+            "-t", f"{seconds:.2f}", "-c:a", "libmp3lame", "-b:a", "48k", output_path
+        )
+
+
+def load_fixture(name: str) -> tuple:
+    """(Script, VideoBlueprint) of a checked-in fixture."""
+    with open(os.path.join(FIXTURE_DIR, f"{name}_script.json"), encoding="utf-8") as f:
+        script = Script(**json.load(f))
+    with open(os.path.join(FIXTURE_DIR, f"{name}_blueprint.json"), encoding="utf-8") as f:
+        blueprint = VideoBlueprint(**json.load(f))
+    return script, blueprint
+
+
+def measure(name: str, make_case: Callable[[], Callable[[], Optional[dict]]], repeat: int) -> CaseResult:
+    """
+    Set a case up, run it once under tracemalloc (warm-up and memory), then time it repeat times.
+    
+    make_case builds the case and returns the function to time, which may
+    return {"per_scene": {scene: seconds}, "frames": n} for finer-grained
+    results. An exception in either is recorded as the case's error.
+    """
+    result = CaseResult(name=name)
+    try:
+        with redirect_stdout(io.StringIO()):
+            fn = make_case()
+            tracemalloc.start()
+            try:
+                fn()
+                result.peak_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 2)
+            finally:
+                tracemalloc.stop()
+            
+            per_scene, frames = {}, 0
+            for _ in range(repeat):
+                start = time.perf_counter()
+                extra = fn() or {}
+                result.runs.append(round(time.perf_counter() - start, 4))
+                for scene, seconds in extra.get("per_scene", {}).items():
+                    per_scene.setdefault(str(scene), []).append(seconds)
+                frames = extra.get("frames", frames)
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+        return result
+    
+    result.seconds = round(statistics.median(result.runs), 4)
+    result.per_scene = {scene: round(statistics.median(times), 4) for scene, times in per_scene.items()}
+    if frames:
+        result.per_frame_ms = round(result.seconds / frames * 1000, 3)
+    return result
+
+
+def codegen_case(style: str, blueprint: VideoBlueprint, workdir: str) -> Callable:
+    """Writing each scene's Manim script (CLI backend)."""
+    from manim_engine import ManimEngine
+    engine = ManimEngine(style=style, backend="cli")
+    engine.output_dir = workdir
+    
+    def run():
+        per_scene = {}
+        for scene_bp in blueprint.scene_blueprints:
+            start = time.perf_counter()
+            engine.prepare_scene_job(scene_bp)
+            per_scene[scene_bp.scene_number] = time.perf_counter() - start
+        return {"per_scene": per_scene}
+    
+    return run
+
+
+def manim_render_case(style: str, preset: str, blueprint: VideoBlueprint, workdir: str) -> Callable:
+    """Rendering every scene with Manim, one at a time and without the render cache."""
+    from manim_engine import ManimEngine
+    from render_scheduler import RenderScheduler
+    engine = ManimEngine(style=style)
+    engine.output_dir = workdir
+    engine.scheduler = RenderScheduler(max_workers=1, use_cache=False, backend=engine.scheduler.backend, preset=preset)
+    
+    def run():
+        results = engine.scheduler.run([engine.prepare_scene_job(scene_bp) for scene_bp in blueprint.scene_blueprints])
+        failed = [r for r in results if not r.success]
+        if failed:
+            raise RuntimeError(f"scene {failed[0].scene_number}: {failed[0].error}")
+        return {"per_scene": {r.scene_number: r.render_time for r in results}}
+    
+    return run
+
+
+def _simple_generator(preset: str, workdir: str):
+    from simple_video_generator import SimpleVideoGenerator
+    generator = SimpleVideoGenerator(preset=preset)
+    generator.output_dir = workdir
+    generator.temp_dir = os.path.join(workdir, "temp")
+    return generator
+
+
+def simple_frames_case(preset: str, blueprint: VideoBlueprint, workdir: str) -> Callable:
+    """Computing the simple renderer's fade-in frames (no encoding)."""
+    generator = _simple_generator(preset, workdir)
+    
+    def run():
+        per_scene, frames = {}, 0
+        for scene_bp in blueprint.scene_blueprints:
+            start = time.perf_counter()
+            total_frames = max(1, round(scene_bp.duration * generator.fps))
+            frames += sum(1 for _ in generator._fade_frames(scene_bp, total_frames))
+            per_scene[scene_bp.scene_number] = time.perf_counter() - start
+        return {"per_scene": per_scene, "frames": frames}
+    
+    return run
+
+
+def simple_encode_case(preset: str, blueprint: VideoBlueprint, audio_dir: str, workdir: str) -> Callable:
+    """Drawing and encoding the whole video with the simple renderer's ffmpeg path."""
+    generator = _simple_generator(preset, workdir)
+    output_path = os.path.join(workdir, f"simple_{preset}.mp4")
+    
+    def run():
+        images = [generator.render_scene_image(scene_bp) for scene_bp in blueprint.scene_blueprints]
+        generator.encode_video(blueprint, images, output_path, audio_dir)
+    
+    return run
+
+
+def assembly_case(blueprint: VideoBlueprint, audio_dir: str, workdir: str) -> Callable:
+    """Muxing pre-rendered scene videos with narration and joining them."""
+    from video_assembler import VideoAssembler, AssemblyScene
+    generator = _simple_generator("draft", workdir)
+    scenes = []
+    for scene_bp in blueprint.scene_blueprints:
+        video_path = os.path.join(workdir, f"assembly_scene_{scene_bp.scene_number}.mp4")
+        if not os.path.exists(video_path):
+            with redirect_stdout(io.StringIO()):
+                generator.encode_scene(scene_bp, generator.render_scene_image(scene_bp), None, video_path)
+        scenes.append(AssemblyScene(
+            scene_number=scene_bp.scene_number,
+            video=video_path,
+            audio=os.path.join(audio_dir, f"scene_{scene_bp.scene_number}_narration.mp3")
+        ))
+    assembler = VideoAssembler(fit="freeze", temp_dir=os.path.join(workdir, "assembly_temp"))
+    output_path = os.path.join(workdir, "assembled.mp4")
+    
+    def run():
+        if not assembler.assemble(scenes, output_path):
+            raise RuntimeError("no scenes assembled")
+    
+    return run
+
+
+def pipeline_case(name: str, script: Script, blueprint: VideoBlueprint, workdir: str) -> Callable:
+    """The whole pipeline (simple renderer, draft preset) with stub LLM and TTS backends."""
+    from pipeline import VideoPipeline
+    from llm_cache import LLMCache
+    
+    def run():
+        pipeline = VideoPipeline(scene_dir=os.path.join(workdir, f"{name}_scenes"), preset="draft")
+        client = StubLLMClient(script, blueprint)
+        for generator in (pipeline.script_gen, pipeline.blueprint_gen):
+            generator.client = client
+            generator.cache = LLMCache(mode="off")
+        pipeline.audio_gen = StubTTS()
+        pipeline.generate_video(script.topic, f"bench_{name}", trace=False)
+    
+    return run
+
+
+def run_suite(args) -> Dict[str, CaseResult]:
+    """Run the selected cases on every selected fixture."""
+    workdir = tempfile.mkdtemp(prefix="video_benchmark_")
+    # Everything the code under test writes stays out of the real output directory
+    Config.OUTPUT_DIR = workdir
+    Config.TEMP_DIR = os.path.join(workdir, "temp")
+    if not Config.OPENAI_API_KEY:
+        Config.OPENAI_API_KEY = "offline-benchmark"  # The stub client never uses it
+    manim_missing = importlib.util.find_spec("manim") is None
+    
+    results = {}
+    
+    def record(result: CaseResult):
+        results[result.name] = result
+        if result.error:
+            print(f"  [X] {result.name}: {result.error}")
+        elif result.skipped:
+            print(f"  [WARN] {result.name}: {result.skipped}")
+        else:
+            print(f"  [OK] {result.name}: {result.seconds:.3f}s (peak {result.peak_mb} MB)")
+    
+    try:
+        for fixture in args.fixtures:
+            print(f"\n[BENCH] {fixture}")
+            fixture_dir = os.path.join(workdir, fixture)
+            audio_dir = os.path.join(fixture_dir, "audio")
+            # A broken fixture (or no ffmpeg for the stub narration) fails its cases, not the suite
+            setup_error = None
+            try:
+                script, blueprint = load_fixture(fixture)
+                os.makedirs(fixture_dir, exist_ok=True)
+                with redirect_stdout(io.StringIO()):
+                    StubTTS().generate_narration(script, audio_dir)
+            except Exception as e:
+                setup_error = f"fixture setup failed: {type(e).__name__}: {e}"
+            
+            def run_case(name: str, make_case: Callable):
+                if setup_error:
+                    record(CaseResult(name=name, error=setup_error))
+                else:
+                    record(measure(name, make_case, args.repeat))
+            
+            if "codegen" in args.cases:
+                for style in args.styles:
+                    run_case(f"codegen/{style}/{fixture}",
+                             lambda: codegen_case(style, blueprint, fixture_dir))
+            if "manim_render" in args.cases:
+                for style in args.styles:
+                    for preset in args.presets:
+                        name = f"manim_render/{style}/{preset}/{fixture}"
+                        if manim_missing:
+                            record(CaseResult(name=name, skipped="Manim is not installed"))
+                        else:
+                            run_case(name, lambda: manim_render_case(style, preset, blueprint, fixture_dir))
+            for preset in args.presets:
+                if "simple_frames" in args.cases:
+                    run_case(f"simple_frames/{preset}/{fixture}",
+                             lambda: simple_frames_case(preset, blueprint, fixture_dir))
+                if "simple_encode" in args.cases:
+                    run_case(f"simple_encode/{preset}/{fixture}",
+                             lambda: simple_encode_case(preset, blueprint, audio_dir, fixture_dir))
+            if "assembly" in args.cases:
+                run_case(f"assembly/{fixture}", lambda: assembly_case(blueprint, audio_dir, fixture_dir))
+            if "pipeline" in args.cases:
+                run_case(f"pipeline/{fixture}", lambda: pipeline_case(fixture, script, blueprint, fixture_dir))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def compare(results: Dict[str, CaseResult], baseline: dict, tolerance: float) -> List[str]:
+    """
+    Print each case against the baseline.
+    
+    Returns:
+        Descriptions of the cases that regressed (failed cases are reported by failures())
+    """
+    regressions = []
+    cases = baseline.get("cases", {})
+    print(f"\n{'Case':<52} {'Median':>9} {'Baseline':>9} {'Change':>8}")
+    print("-" * 82)
+    for name, result in results.items():
+        if result.error:
+            print(f"{name:<52} {'FAILED':>9}")
+            continue
+        if result.skipped:
+            print(f"{name:<52} {'skipped':>9}")
+            continue
+        base = cases.get(name)
+        if not base or base.get("seconds") is None:
+            print(f"{name:<52} {result.seconds:>8.3f}s {'-':>9} {'new':>8}")
+            continue
+        change = (result.seconds - base["seconds"]) / base["seconds"] if base["seconds"] else 0.0
+        status = ""
+        if change > tolerance and result.seconds - base["seconds"] > MIN_SECONDS:
+            status = "  [X] slower"
+            regressions.append(f"{name}: {base['seconds']:.3f}s -> {result.seconds:.3f}s ({change:+.0%})")
+        base_mb, peak_mb = base.get("peak_mb"), result.peak_mb
+        if base_mb and peak_mb and peak_mb > base_mb * (1 + tolerance) and peak_mb - base_mb > MIN_MB:
+            status += "  [X] memory"
+            regressions.append(f"{name}: peak {base_mb:.1f} MB -> {peak_mb:.1f} MB")
+        print(f"{name:<52} {result.seconds:>8.3f}s {base['seconds']:>8.3f}s {change:>+8.0%}{status}")
+    return regressions
+
+
+def failures(results: Dict[str, CaseResult]) -> List[str]:
+    """Descriptions of the cases that raised (skipped cases are not failures)."""
+    return [f"{name}: {result.error}" for name, result in results.items() if result.error]
+
+
+def report_failures(failed: List[str]):
+    print(f"\n[X] {len(failed)} case(s) failed:")
+    for failure in failed:
+        print(f"  {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the render and assembly hot paths")
+    parser.add_argument("--fixtures", nargs="+", choices=FIXTURES, default=FIXTURES)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--styles", nargs="+", choices=list(STYLES) + ["all"], default=["default"],
+                        help="Manim styles for the codegen and render cases ('all' for every style)")
+    parser.add_argument("--presets", nargs="+", choices=list(PRESETS), default=["draft"],
+                        help="Render presets for the Manim and simple renderer cases")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per case (after one warm-up run)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a case counts as a regression")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with or update")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--output", default=None, help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+    if "all" in args.styles:
+        args.styles = list(STYLES)
+    
+    results = run_suite(args)
+    report = {
+        "machine": machine_info(),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"repeat": args.repeat, "fade_seconds": Config.SIMPLE_FADE_SECONDS,
+                     "render_backend": Config.RENDER_BACKEND},
+        "cases": {name: result.model_dump() for name, result in results.items()}
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    
+    failed = failures(results)
+    if args.update_baseline:
+        if failed:
+            # A baseline without these cases would hide them from every later comparison
+            report_failures(failed)
+            print(f"\n[X] Baseline not saved")
+            sys.exit(1)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n[OK] Baseline saved to {args.baseline}")
+        return
+    
+    if not os.path.exists(args.baseline):
+        print(f"\n[WARN] No baseline at {args.baseline}; record one on this machine with "
+              f"'python benchmark.py --update-baseline'")
+        compare(results, {}, args.tolerance)
+        if failed:
+            report_failures(failed)
+            sys.exit(1)
+        return
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("machine") != report["machine"]:
+        print(f"\n[WARN] Baseline was recorded on a different machine: {baseline.get('machine')}")
+    
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n[X] {len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+    if failed:
+        report_failures(failed)
+    if regressions or failed:
+        sys.exit(1)
+    print(f"\n[OK] No regressions (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
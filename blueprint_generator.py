@@ -2,10 +2,16 @@
 Blueprint generator - converts scripts into animation blueprints.
 """
 import json
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
 from config import Config
-from prompts import BLUEPRINT_GENERATION_PROMPT
-from models_schemas import Script, VideoBlueprint
+from prompts import BLUEPRINT_GENERATION_PROMPT, SCENE_BLUEPRINT_PROMPT
+from models_schemas import Script, Scene, AnimationElement, SceneBlueprint, VideoBlueprint
+from streaming_json import StreamingJSONParser
+from llm_cache import get_llm_cache
+from instrumentation import in_context
+from clients import get_openai_client
 
 
 class BlueprintGenerator:
@@ -13,11 +19,9 @@ class BlueprintGenerator:
     
     def __init__(self):
         """Initialize the blueprint generator with OpenAI client."""
-        client_kwargs = {"api_key": Config.OPENAI_API_KEY}
-        if Config.OPENAI_BASE_URL:
-            client_kwargs["base_url"] = Config.OPENAI_BASE_URL
-        self.client = OpenAI(**client_kwargs)
+        self.client = get_openai_client()
         self.model = Config.OPENAI_MODEL
+        self.cache = get_llm_cache()
     
     def generate(self, script: Script) -> VideoBlueprint:
         """
@@ -31,86 +35,23 @@ class BlueprintGenerator:
         """
         print(f"[ART] Generating animation blueprint for: {script.topic}")
         
-        # Convert script to JSON string
-        script_json = json.dumps(script.model_dump(), indent=2)
-        
-        # Create the prompt
-        prompt = BLUEPRINT_GENERATION_PROMPT.format(
-            script_json=script_json,
-            topic=script.topic
-        )
+        prompt = self._video_prompt(script)
         
         # Call GPT-4 with retry logic
         max_retries = 3  # Increased from 2
         for attempt in range(max_retries):
+            # Lower temperature on retries for more consistent JSON
+            temperature = 0.3 if attempt == 0 else 0.2 if attempt == 1 else 0.1
+            request = self._request(prompt, temperature, max_tokens=4000)  # Ensure complete response
+            parser = StreamingJSONParser()
+            
             try:
-                # Lower temperature on retries for more consistent JSON
-                temperature = 0.3 if attempt == 0 else 0.2 if attempt == 1 else 0.1
-                
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": "You are an animation director. Always respond with valid JSON following the exact schema provided. Keep responses concise."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    temperature=temperature,
-                    max_tokens=4000,  # Ensure complete response
-                    response_format={"type": "json_object"}
-                )
-                
-                # Parse the response
-                content = response.choices[0].message.content
-                
-                # Robust JSON cleaning
-                content = content.strip()
-                
-                # Remove markdown code blocks if present
-                if content.startswith("```json"):
-                    content = content[7:]  # Remove ```json
-                if content.startswith("```"):
-                    content = content[3:]  # Remove ```
-                if content.endswith("```"):
-                    content = content[:-3]  # Remove trailing ```
-                
-                content = content.strip()
-                
-                # Decode HTML entities (&amp; -> &, &quot; -> ", etc.)
-                import html
-                content = html.unescape(content)
-                
-                # Find JSON object boundaries
-                if not content.startswith("{"):
-                    start = content.find("{")
-                    if start != -1:
-                        content = content[start:]
-                    else:
-                        raise json.JSONDecodeError("No JSON object found", content, 0)
-                
-                if not content.endswith("}"):
-                    end = content.rfind("}")
-                    if end != -1:
-                        content = content[:end + 1]
-                    else:
-                        raise json.JSONDecodeError("No closing brace found", content, len(content))
-                
-                # Remove any trailing commas before closing braces/brackets
-                import re
-                content = re.sub(r',(\s*[}\]])', r'\1', content)
-                
-                # Auto-complete truncated JSON if needed
-                content = self._auto_complete_json(content)
-                
-                # Parse JSON
-                blueprint_data = json.loads(content)
+                # Elements are validated as they stream in, so a bad one aborts early
+                for _ in self._stream_objects(request, parser, attempt=attempt):
+                    pass
                 
                 # Validate and create VideoBlueprint object
-                blueprint = VideoBlueprint(**blueprint_data)
+                blueprint = VideoBlueprint(**parser.close())
                 
                 print(f"[OK] Generated blueprint with {len(blueprint.scene_blueprints)} scenes")
                 total_elements = sum(len(scene.elements) for scene in blueprint.scene_blueprints)
@@ -118,47 +59,241 @@ class BlueprintGenerator:
                 
                 return blueprint
                 
-            except json.JSONDecodeError as e:
-                print(f"[WARN] JSON parse error (attempt {attempt + 1}/{max_retries}): {e}")
+            except (json.JSONDecodeError, ValidationError) as e:
+                # Never serve an unusable response from the cache again
+                self.cache.discard(**request)
+                print(f"[WARN] Invalid blueprint JSON (attempt {attempt + 1}/{max_retries}): {e}")
                 if attempt == max_retries - 1:
-                    # Save failed response for debugging
-                    try:
-                        with open("output/failed_blueprint_response.txt", "w", encoding="utf-8") as f:
-                            f.write(content if 'content' in locals() else "No content available")
-                        print(f"[DEBUG] Failed response saved to: output/failed_blueprint_response.txt")
-                    except:
-                        pass
+                    self._save_failed_response(parser.text)
                     print(f"[X] Error generating blueprint: {e}")
                     raise
                 print("  Retrying...")
-                continue
             except Exception as e:
+                self.cache.discard(**request)
                 print(f"[X] Error generating blueprint: {e}")
                 raise
     
-    def _auto_complete_json(self, content: str) -> str:
-        """Auto-complete truncated JSON by adding missing brackets."""
-        # Count opening and closing brackets
-        open_braces = content.count('{')
-        close_braces = content.count('}')
-        open_brackets = content.count('[')
-        close_brackets = content.count(']')
+    def iter_blueprint_scenes(self, script: Script) -> Iterator[SceneBlueprint]:
+        """
+        Stream the whole-video blueprint, yielding each scene as soon as it closes.
+        
+        Uses the same single request as generate(), so the renderer can start
+        on scene 1 while the model is still writing the later scenes. If the
+        response is cut off, the scene it stopped in is repaired, and any
+        scene still missing (or left without elements) is generated on its
+        own with generate_scene(); the whole video is never requested again.
+        """
+        print(f"[ART] Streaming animation blueprint for: {script.topic}")
+        
+        expected = {scene.scene_number: scene for scene in script.scenes}
+        delivered = set()
+        request = self._request(self._video_prompt(script), temperature=0.3, max_tokens=4000)
+        parser = StreamingJSONParser()
+        
+        try:
+            for path, obj in self._stream_objects(request, parser):
+                if len(path) == 2 and path[0] == "scene_blueprints":
+                    scene_bp = self._scene_blueprint(obj, expected)
+                    if scene_bp and scene_bp.scene_number not in delivered:
+                        delivered.add(scene_bp.scene_number)
+                        print(f"  [OK] Scene {scene_bp.scene_number} blueprint: {len(scene_bp.elements)} elements")
+                        yield scene_bp
+        except (json.JSONDecodeError, ValidationError) as e:
+            # Scenes delivered before the bad element are kept
+            self.cache.discard(**request)
+            self._save_failed_response(parser.text)
+            print(f"[WARN] Invalid blueprint JSON: {e}")
+        else:
+            if parser.root is not None and not parser.done:
+                # Truncated: the scene being written when the response stopped is still usable
+                for scene_bp in self._repaired_scenes(parser.close(), expected, delivered):
+                    delivered.add(scene_bp.scene_number)
+                    print(f"  [OK] Scene {scene_bp.scene_number} blueprint repaired: {len(scene_bp.elements)} elements")
+                    yield scene_bp
+        
+        missing = [expected[number] for number in sorted(set(expected) - delivered)]
+        if missing:
+            print(f"[WARN] Blueprint response is missing scenes {[scene.scene_number for scene in missing]}, "
+                  f"generating them one by one")
+            yield from self._generate_scenes(script, missing)
+    
+    def generate_scene(self, script: Script, scene: Scene) -> SceneBlueprint:
+        """
+        Generate the animation blueprint for a single scene.
+        
+        A failed or invalid response only retries this scene, not the whole video.
+        
+        Args:
+            script: The full video script (for visual consistency)
+            scene: The scene to visualize
+            
+        Returns:
+            SceneBlueprint for the scene
+        """
+        prompt = SCENE_BLUEPRINT_PROMPT.format(
+            topic=script.topic,
+            script_json=json.dumps(script.model_dump(), indent=2),
+            scene_json=json.dumps(scene.model_dump(), indent=2),
+            scene_number=scene.scene_number,
+            scene_count=len(script.scenes),
+            duration=scene.duration
+        )
         
-        # Add missing closing brackets
-        if open_brackets > close_brackets:
-            content += ']' * (open_brackets - close_brackets)
+        max_retries = 3
+        for attempt in range(max_retries):
+            temperature = 0.3 if attempt == 0 else 0.2 if attempt == 1 else 0.1
+            request = self._request(prompt, temperature, max_tokens=1500)
+            parser = StreamingJSONParser()
+            
+            try:
+                for _ in self._stream_objects(request, parser, scene=scene.scene_number, attempt=attempt):
+                    pass
+                scene_data = parser.close()
+                if not isinstance(scene_data, dict):
+                    # Anything but an object must be discarded from the cache and retried,
+                    # not fail below with a TypeError that skips both
+                    raise json.JSONDecodeError(
+                        f"Expected a scene object, got {type(scene_data).__name__}", parser.text, 0
+                    )
+                
+                # The script, not the model, is authoritative for these fields
+                scene_data["scene_number"] = scene.scene_number
+                scene_data.setdefault("duration", scene.duration)
+                scene_data.setdefault("narration_text", scene.narration)
+                
+                scene_bp = SceneBlueprint(**scene_data)
+                print(f"  [OK] Scene {scene.scene_number} blueprint: {len(scene_bp.elements)} elements")
+                return scene_bp
+                
+            except (json.JSONDecodeError, ValidationError) as e:
+                self.cache.discard(**request)
+                print(f"  [WARN] Scene {scene.scene_number} blueprint invalid (attempt {attempt + 1}/{max_retries}): {e}")
+                if attempt == max_retries - 1:
+                    raise
+    
+    def iter_scene_blueprints(self, script: Script, max_workers: int = None) -> Iterator[SceneBlueprint]:
+        """
+        Generate scene blueprints in parallel, yielding each one as soon as it is ready.
         
-        # Add missing closing braces
-        if open_braces > close_braces:
-            content += '}' * (open_braces - close_braces)
+        Scenes arrive in completion order, not scene order, so a renderer can
+        start on the first finished scene while the rest are still generating.
+        """
+        print(f"[ART] Generating {len(script.scenes)} scene blueprints in parallel for: {script.topic}")
+        yield from self._generate_scenes(script, script.scenes, max_workers)
+    
+    def _generate_scenes(self, script: Script, scenes: List[Scene], max_workers: int = None) -> Iterator[SceneBlueprint]:
+        """Run generate_scene() for the given scenes in parallel, yielding in completion order."""
+        workers = min(max_workers or Config.BLUEPRINT_WORKERS, len(scenes)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(in_context(self.generate_scene), script, scene) for scene in scenes]
+            for future in as_completed(futures):
+                yield future.result()
+    
+    def generate_per_scene(self, script: Script) -> VideoBlueprint:
+        """Generate a blueprint with one request per scene."""
+        return self.build_video_blueprint(script, list(self.iter_scene_blueprints(script)))
+    
+    def build_video_blueprint(self, script: Script, scene_blueprints: List[SceneBlueprint]) -> VideoBlueprint:
+        """Assemble per-scene blueprints into a VideoBlueprint in scene order."""
+        scene_blueprints = sorted(scene_blueprints, key=lambda bp: bp.scene_number)
+        blueprint = VideoBlueprint(
+            topic=script.topic,
+            total_duration=sum(bp.duration for bp in scene_blueprints),
+            scene_blueprints=scene_blueprints
+        )
+        total_elements = sum(len(bp.elements) for bp in scene_blueprints)
+        print(f"[OK] Generated blueprint with {len(scene_blueprints)} scenes")
+        print(f"  Total animation elements: {total_elements}")
+        return blueprint
+    
+    def _video_prompt(self, script: Script) -> str:
+        return BLUEPRINT_GENERATION_PROMPT.format(
+            script_json=json.dumps(script.model_dump(), indent=2),
+            topic=script.topic
+        )
+    
+    def _request(self, prompt: str, temperature: float, max_tokens: int) -> dict:
+        return dict(
+            model=self.model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an animation director. Always respond with valid JSON following the exact schema provided. Keep responses concise."
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            response_format={"type": "json_object"}
+        )
+    
+    def _stream_objects(self, request: dict, parser: StreamingJSONParser, scene: int = None,
+                        attempt: int = 0) -> Iterator[Tuple[tuple, dict]]:
+        """Feed the streamed response to the parser, yielding objects as they close."""
+        label = "blueprint" if scene is None else "scene_blueprint"
+        for chunk in self.cache.stream(self.client, label=label, scene=scene, attempt=attempt, **request):
+            for path, obj in parser.feed(chunk):
+                if len(path) >= 2 and path[-2] == "elements":
+                    AnimationElement(**obj)
+                yield path, obj
+    
+    def _scene_blueprint(self, scene_data: dict, expected: Dict[int, Scene]) -> Optional[SceneBlueprint]:
+        """Validate one streamed scene, filling narration from the script if it is missing."""
+        scene = expected.get(scene_data.get("scene_number"))
+        if scene is None:
+            return None
+        scene_data.setdefault("narration_text", scene.narration)
+        scene_data.setdefault("duration", scene.duration)
+        return SceneBlueprint(**scene_data)
+    
+    def _repaired_scenes(self, root: dict, expected: Dict[int, Scene], delivered: set) -> Iterator[SceneBlueprint]:
+        """
+        Undelivered scenes in a repaired (closed-off) truncated response.
         
-        return content
+        Elements cut off part-way are dropped; a scene with no complete
+        element left is not used.
+        """
+        scenes = root.get("scene_blueprints") if isinstance(root, dict) else None
+        for scene_data in scenes if isinstance(scenes, list) else []:
+            if not isinstance(scene_data, dict) or scene_data.get("scene_number") in delivered:
+                continue
+            elements = []
+            for elem in scene_data.get("elements") or []:
+                try:
+                    elements.append(AnimationElement(**elem).model_dump())
+                except (TypeError, ValidationError):
+                    continue
+            if not elements:
+                continue
+            try:
+                scene_bp = self._scene_blueprint({**scene_data, "elements": elements}, expected)
+            except ValidationError:
+                continue
+            if scene_bp:
+                yield scene_bp
+    
+    def _save_failed_response(self, content: str):
+        """Save a failed response for debugging."""
+        try:
+            with open("output/failed_blueprint_response.txt", "w", encoding="utf-8") as f:
+                f.write(content or "No content available")
+            print(f"[DEBUG] Failed response saved to: output/failed_blueprint_response.txt")
+        except:
+            pass
     
     def save_blueprint(self, blueprint: VideoBlueprint, output_path: str):
         """Save blueprint to JSON file."""
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(blueprint.model_dump(), f, indent=2, ensure_ascii=False)
         print(f"[OK] Blueprint saved to: {output_path}")
+    
+    def load_blueprint(self, path: str) -> VideoBlueprint:
+        """Load a blueprint saved by save_blueprint."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return VideoBlueprint(**json.load(f))
 
 
 if __name__ == "__main__":
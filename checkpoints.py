@@ -0,0 +1,99 @@
+"""
+Stage checkpoints for resumable pipeline runs.
+Every finished stage records a hash of its inputs and of each file it wrote
+in the run's _results.json. A resumed run skips a stage when its inputs hash
+is unchanged and its files are still on disk with the recorded content.
+"""
+import os
+import json
+import hashlib
+import threading
+from typing import Dict, List, Optional
+
+
+def file_hash(path: str) -> Optional[str]:
+    """SHA-256 of a file's content, or None if it does not exist."""
+    if not path or not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def inputs_hash(*parts) -> str:
+    """Hash JSON-serializable stage inputs (upstream file hashes, settings, prompts)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageCheckpoints:
+    """Per-stage input and output hashes of one pipeline run."""
+    
+    def __init__(self, results_path: str, topic: str, resume: bool = False, merge: bool = False):
+        """
+        Initialize the checkpoints.
+        
+        Args:
+            results_path: The run's results JSON, where checkpoints are kept
+            topic: The run's topic (stored alongside the checkpoints)
+            resume: Load the checkpoints of an earlier run from results_path
+            merge: Update the stages recorded here in an existing results file,
+                keeping its other checkpoints and results (for partial runs such
+                as previews); otherwise the file is replaced
+        """
+        self.results_path = results_path
+        self.topic = topic
+        self.merge = merge
+        self.entries: Dict[str, dict] = {}
+        self.reused: List[str] = []
+        self._lock = threading.Lock()
+        if resume and os.path.exists(results_path):
+            with open(results_path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get("checkpoints", {})
+    
+    def reuse(self, stage: str, inputs: str) -> Optional[List[str]]:
+        """
+        Check whether a stage can be skipped.
+        
+        Returns:
+            The stage's recorded output files (in the order they were recorded)
+            if its inputs are unchanged and every file still has the recorded
+            content, otherwise None
+        """
+        entry = self.entries.get(stage)
+        if not entry or entry["inputs"] != inputs:
+            return None
+        for path, digest in entry["outputs"].items():
+            if file_hash(path) != digest:
+                return None
+        self.reused.append(stage)
+        print(f"  [OK] Resuming: {stage} inputs unchanged, reusing {len(entry['outputs'])} file(s)")
+        return list(entry["outputs"])
+    
+    def record(self, stage: str, inputs: str, outputs: List[str]):
+        """Record a finished stage and save the checkpoints to the results file."""
+        entry = {"inputs": inputs, "outputs": {path: file_hash(path) for path in outputs}}
+        with self._lock:
+            self.entries[stage] = entry
+            self._save()
+    
+    def output_hashes(self, stage: str) -> List[Optional[str]]:
+        """Recorded content hashes of a stage's outputs (empty if it has none)."""
+        entry = self.entries.get(stage)
+        return list(entry["outputs"].values()) if entry else []
+    
+    def _save(self):
+        # The full results replace this once the run finishes; until then the
+        # checkpoints alone let a failed run resume
+        results = {"topic": self.topic, "checkpoints": self.entries}
+        if self.merge and os.path.exists(self.results_path):
+            with open(self.results_path, 'r', encoding='utf-8') as f:
+                existing = json.load(f)
+            results = {**existing, "topic": self.topic,
+                       "checkpoints": {**existing.get("checkpoints", {}), **self.entries}}
+        tmp_path = self.results_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        os.replace(tmp_path, self.results_path)
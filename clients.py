@@ -0,0 +1,77 @@
+"""
+Process-wide API clients and concurrency budgets.
+One pooled OpenAI client is shared by every generator, so pipelines running
+side by side (e.g. a batch of topics) reuse HTTP connections. A budget per
+kind of work ("llm", "tts", "render") caps how many such calls run at once
+across all of them, on top of each stage's own worker limit.
+"""
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from openai import OpenAI
+from config import Config
+
+_lock = threading.Lock()
+_client = None
+_semaphores = {}
+
+
+def budget_limits() -> dict:
+    """Concurrent calls allowed per kind of work."""
+    return {
+        "llm": Config.LLM_CONCURRENCY,
+        "tts": Config.TTS_CONCURRENCY,
+        "render": Config.RENDER_WORKERS,
+    }
+
+
+def get_openai_client() -> OpenAI:
+    """
+    OpenAI-compatible client shared by the script, blueprint and TTS generators.
+    
+    The client keeps a thread-safe pool of keep-alive connections, so one
+    instance serves every thread instead of each generator opening its own.
+    """
+    global _client
+    # Pipelines starting together must still end up with the same client
+    with _lock:
+        if _client is None:
+            client_kwargs = {"api_key": Config.OPENAI_API_KEY}
+            if Config.OPENAI_BASE_URL:
+                client_kwargs["base_url"] = Config.OPENAI_BASE_URL
+            _client = OpenAI(**client_kwargs)
+        return _client
+
+
+def _semaphore(kind: str) -> threading.BoundedSemaphore:
+    with _lock:
+        if kind not in _semaphores:
+            limits = budget_limits()
+            if kind not in limits:
+                raise ValueError(f"Unknown budget '{kind}'. Available: {', '.join(limits)}")
+            _semaphores[kind] = threading.BoundedSemaphore(max(1, limits[kind]))
+        return _semaphores[kind]
+
+
+@contextmanager
+def budget(kind: str):
+    """Hold one of the process-wide slots for a kind of work ("llm", "tts" or "render")."""
+    semaphore = _semaphore(kind)
+    semaphore.acquire()
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+@asynccontextmanager
+async def budget_async(kind: str):
+    """Like budget(), but waits without blocking the event loop."""
+    semaphore = _semaphore(kind)
+    # Polling keeps cancellation safe: a cancelled waiter never holds a slot
+    while not semaphore.acquire(blocking=False):
+        await asyncio.sleep(0.05)
+    try:
+        yield
+    finally:
+        semaphore.release()
@@ -18,6 +18,33 @@ class Config:
     OPENAI_TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "tts-1")
     OPENAI_TTS_VOICE = os.getenv("OPENAI_TTS_VOICE", "alloy")
     
+    # Shared Clients and Concurrency Budgets (process-wide, across batch topics)
+    LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "4"))
+    BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))  # Topics in flight in batch mode
+    
+    # Instrumentation (a per-run report always goes into _results.json)
+    PIPELINE_TRACE = os.getenv("PIPELINE_TRACE", "0") == "1"  # Also write <output>_trace.json (Chrome trace)
+    
+    # Narration Synthesis
+    TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "4"))
+    TTS_MAX_RETRIES = int(os.getenv("TTS_MAX_RETRIES", "3"))
+    TTS_RETRY_BACKOFF = float(os.getenv("TTS_RETRY_BACKOFF", "1.0"))
+    TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "1") == "1"  # Reuse narration with unchanged text and voice
+    TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "output/cache/tts")
+    TTS_CACHE_MAX_MB = int(os.getenv("TTS_CACHE_MAX_MB", "512"))
+    TTS_CHUNK_CHARS = int(os.getenv("TTS_CHUNK_CHARS", "0"))  # Split long narration into parallel sentence chunks (0 = off)
+    WORD_TIMING = os.getenv("WORD_TIMING", "1") == "1"  # Show labelled elements when their label is spoken (needs word timings)
+    
+    # Blueprint Generation ("video" = one request, "scene" = one request per scene, streamed)
+    BLUEPRINT_MODE = os.getenv("BLUEPRINT_MODE", "video")
+    BLUEPRINT_WORKERS = int(os.getenv("BLUEPRINT_WORKERS", "4"))
+    
+    # LLM Response Cache ("readwrite", "readonly" for offline/CI runs, or "off")
+    LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "readwrite")
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "output/cache/llm_cache.sqlite")
+    LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+    
     # Style Profile Colors (from WebSockets video analysis)
     DARK_BG = "#1a1a1a"
     CLIENT_COLOR = "#00d4ff"
@@ -26,10 +53,28 @@ class Config:
     SECONDARY_TEXT = "#a0a0a0"
     
     # Video Settings
-    VIDEO_WIDTH = 1920
-    VIDEO_HEIGHT = 1080
-    VIDEO_FPS = 30
+    RENDER_PRESET = os.getenv("RENDER_PRESET", "")  # "draft", "preview" or "production" (see render_presets); empty = each renderer's default
+    VIDEO_WIDTH = int(os.getenv("VIDEO_WIDTH", "1920"))  # Production preset size and frame rate
+    VIDEO_HEIGHT = int(os.getenv("VIDEO_HEIGHT", "1080"))
+    VIDEO_FPS = int(os.getenv("VIDEO_FPS", "30"))
     DEFAULT_SCENE_DURATION = 8.0
+    NARRATION_TIMING = os.getenv("NARRATION_TIMING", "1") == "1"  # Scene length = measured narration length
+    FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+    NARRATION_LOUDNORM = os.getenv("NARRATION_LOUDNORM", "1") == "1"  # Loudness-normalize the narration track (EBU R128)
+    LAYOUT_SOLVER = os.getenv("LAYOUT_SOLVER", "1") == "1"  # Snap scenes to the grid and space them out (see layout_solver)
+    LAYOUT_CHECK = os.getenv("LAYOUT_CHECK", "fix")  # "fix", "warn" or "off" (see layout_check)
+    
+    # Simple (no-Manim) Renderer
+    SIMPLE_RENDER_BACKEND = os.getenv("SIMPLE_RENDER_BACKEND", "ffmpeg")  # "ffmpeg" (fast path) or "moviepy"
+    SIMPLE_FADE_SECONDS = float(os.getenv("SIMPLE_FADE_SECONDS", "0.5"))  # 0 = static scenes
+    
+    # Manim Rendering
+    RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", os.cpu_count() or 1))
+    RENDER_BACKEND = os.getenv("RENDER_BACKEND", "cli")  # "cli" or "direct" (warm in-process workers)
+    RENDER_TIMEOUT = int(os.getenv("RENDER_TIMEOUT", "120"))
+    RENDER_CACHE_ENABLED = os.getenv("RENDER_CACHE_ENABLED", "1") == "1"
+    RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "output/cache/renders")
+    RENDER_CACHE_MAX_MB = int(os.getenv("RENDER_CACHE_MAX_MB", "2048"))
     
     # Output Paths
     OUTPUT_DIR = "output"
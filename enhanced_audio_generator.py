@@ -1,17 +1,24 @@
 """
 Enhanced audio generator with natural human-like voices using Edge TTS.
-Falls back to gTTS if Edge TTS is unavailable.
+Falls back to gTTS if Edge TTS is unavailable. Edge TTS also reports when
+each word is spoken; the timings are saved next to each scene's audio.
 """
 import os
 from pathlib import Path
 from models_schemas import Script, Scene
 from config import Config
+from tts_batch import TTSJob, synthesize_async, synthesize_threaded, run_coroutine
+from tts_cache import get_tts_cache
+from tts_chunks import WordTiming
+
+# Edge TTS reports offsets and durations in 100-nanosecond ticks
+TICKS_PER_SECOND = 10_000_000
 
 
 class EnhancedAudioGenerator:
     """Generate natural-sounding narration audio using Edge TTS."""
     
-    def __init__(self, voice="en-US-GuyNeural"):
+    def __init__(self, voice="en-US-GuyNeural", rate: str = "+0%", chunk_chars: int = None):
         """
         Initialize audio generator.
         
@@ -21,8 +28,14 @@ class EnhancedAudioGenerator:
                 - en-US-JennyNeural (female, friendly)
                 - en-US-AriaNeural (female, news anchor)
                 - en-US-DavisNeural (male, deep)
+            rate: Edge TTS speaking rate, e.g. "+10%" or "-5%"
+            chunk_chars: Synthesize long narration in sentence chunks of about this
+                many characters, in parallel (default: Config.TTS_CHUNK_CHARS; 0 = off)
         """
         self.voice = voice
+        self.rate = rate
+        self.chunk_chars = Config.TTS_CHUNK_CHARS if chunk_chars is None else chunk_chars
+        self.cache = get_tts_cache()
         
         # Try to import edge-tts
         try:
@@ -49,40 +62,67 @@ class EnhancedAudioGenerator:
         
         print(f"[MIC] Generating narration audio with {self.voice}...")
         
-        audio_files = []
+        jobs = [
+            TTSJob(
+                scene_number=scene.scene_number,
+                text=scene.narration,
+                output_path=os.path.join(output_dir, f"scene_{scene.scene_number}_narration.mp3"),
+                cache_key=self.cache_key(scene.narration)
+            )
+            for scene in script.scenes
+        ]
         
-        for scene in script.scenes:
-            output_file = os.path.join(output_dir, f"scene_{scene.scene_number}_narration.mp3")
-            
-            if self.use_edge_tts:
-                self._generate_edge_tts(scene.narration, output_file)
-            else:
-                self._generate_gtts(scene.narration, output_file)
-            
-            audio_files.append(output_file)
-            print(f"  [OK] Scene {scene.scene_number} audio saved")
+        hits = self.cache.hits if self.cache else 0
+        if self.use_edge_tts:
+            # All scenes share one event loop instead of one loop per scene
+            audio_files = run_coroutine(synthesize_async(jobs, self._edge_tts_async, cache=self.cache,
+                                                            chunk_chars=self.chunk_chars))
+        else:
+            audio_files = synthesize_threaded(jobs, self._generate_gtts, cache=self.cache,
+                                              chunk_chars=self.chunk_chars)
         
-        print(f"[OK] Generated {len(audio_files)} audio files")
+        cached = f" ({self.cache.hits - hits} from cache)" if self.cache else ""
+        print(f"[OK] Generated {len(audio_files)} audio files{cached}")
         return audio_files
     
-    def _generate_edge_tts(self, text: str, output_path: str):
+    def cache_key(self, text: str):
+        """Narration cache key for a text with the current backend, voice and rate (None without a cache)."""
+        if not self.cache:
+            return None
+        options = {"chunk_chars": self.chunk_chars} if self.chunk_chars else {}
+        if self.use_edge_tts:
+            return self.cache.make_key("edge", self.voice, text, rate=self.rate, timings="word", **options)
+        return self.cache.make_key("gtts", "en", text, slow=False, **options)
+    
+    def _generate_edge_tts(self, text: str, output_path: str) -> list:
         """Generate audio using Edge TTS (natural voice)."""
-        import edge_tts
-        import asyncio
+        return run_coroutine(self._edge_tts_async(text, output_path))
+    
+    async def _edge_tts_async(self, text: str, output_path: str) -> list:
+        """
+        Synthesize one narration with Edge TTS on the running event loop.
         
-        async def generate():
-            communicate = edge_tts.Communicate(text, self.voice)
-            await communicate.save(output_path)
+        Returns:
+            List of WordTiming, in seconds from the start of this audio
+        """
+        import edge_tts
         
-        # Run async function
         try:
-            asyncio.run(generate())
-        except RuntimeError:
-            # If event loop already running, create new one
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(generate())
-            loop.close()
+            communicate = edge_tts.Communicate(text, self.voice, rate=self.rate, boundary="WordBoundary")
+        except TypeError:
+            # edge-tts < 7 always reports word boundaries
+            communicate = edge_tts.Communicate(text, self.voice, rate=self.rate)
+        
+        words = []
+        with open(output_path, "wb") as f:
+            async for chunk in communicate.stream():
+                if chunk["type"] == "audio":
+                    f.write(chunk["data"])
+                elif chunk["type"] == "WordBoundary":
+                    start = chunk["offset"] / TICKS_PER_SECOND
+                    words.append(WordTiming(word=chunk["text"], start=round(start, 3),
+                                            end=round(start + chunk["duration"] / TICKS_PER_SECOND, 3)))
+        return words
     
     def _generate_gtts(self, text: str, output_path: str):
         """Fallback to gTTS if Edge TTS unavailable."""
@@ -0,0 +1,129 @@
+"""
+Thin helpers around the ffmpeg command line.
+Used wherever video is encoded or joined without going through moviepy.
+"""
+import os
+import re
+import subprocess
+from typing import List, Optional
+from pydantic import BaseModel
+from config import Config
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+_VIDEO_RE = re.compile(
+    r"Video: (?P<codec>\w+)(?: \((?P<profile>[^)]+)\))?[^,]*, (?P<pix_fmt>\w+)(?:\([^)]*\))?, "
+    r"(?P<width>\d+)x(?P<height>\d+)"
+)
+_FPS_RE = re.compile(r"(\d+(?:\.\d+)?) fps")
+_AUDIO_RE = re.compile(r"Audio: (?P<codec>\w+)[^,]*, (?P<sample_rate>\d+) Hz, (?P<channels>[^,]+)")
+
+
+class MediaInfo(BaseModel):
+    """What ffmpeg reports about a media file's first video and audio streams."""
+    duration: Optional[float] = None
+    video_codec: Optional[str] = None
+    profile: Optional[str] = None
+    pix_fmt: Optional[str] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    audio_codec: Optional[str] = None
+    sample_rate: Optional[int] = None
+    channels: Optional[str] = None
+    
+    def video_params(self) -> tuple:
+        """Parameters that must match for video streams to be joined without re-encoding."""
+        return (self.video_codec, self.profile, self.pix_fmt, self.width, self.height, self.fps)
+
+
+def ffmpeg_command(*args: str) -> List[str]:
+    """Build an ffmpeg command line that only reports errors."""
+    return [Config.FFMPEG_BINARY, "-hide_banner", "-loglevel", "error", "-y", *args]
+
+
+def run_ffmpeg(*args: str) -> subprocess.CompletedProcess:
+    """
+    Run ffmpeg and wait for it to finish.
+    
+    Raises:
+        RuntimeError: If ffmpeg exits with an error (its last output lines are included)
+    """
+    result = subprocess.run(ffmpeg_command(*args), capture_output=True, text=True)
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"ffmpeg failed (exit {result.returncode}): {tail}")
+    return result
+
+
+def probe(path: str) -> Optional[MediaInfo]:
+    """
+    Read a media file's duration and stream parameters from ffmpeg's stream summary.
+    
+    Returns:
+        MediaInfo, or None if the file is missing
+    """
+    if not os.path.exists(path):
+        return None
+    result = subprocess.run(
+        [Config.FFMPEG_BINARY, "-hide_banner", "-i", path],
+        capture_output=True, text=True
+    )
+    info = MediaInfo()
+    match = _DURATION_RE.search(result.stderr)
+    if match:
+        hours, minutes, seconds = match.groups()
+        info.duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    for line in result.stderr.splitlines():
+        video = _VIDEO_RE.search(line)
+        if video and info.video_codec is None:
+            info.video_codec = video["codec"]
+            info.profile = video["profile"]
+            info.pix_fmt = video["pix_fmt"]
+            info.width, info.height = int(video["width"]), int(video["height"])
+            fps = _FPS_RE.search(line)
+            info.fps = float(fps.group(1)) if fps else None
+        audio = _AUDIO_RE.search(line)
+        if audio and info.audio_codec is None:
+            info.audio_codec = audio["codec"]
+            info.sample_rate = int(audio["sample_rate"])
+            info.channels = audio["channels"].strip()
+    return info
+
+
+def probe_duration(path: str) -> Optional[float]:
+    """
+    Read a media file's duration.
+    
+    Returns:
+        Duration in seconds, or None if it cannot be determined
+    """
+    info = probe(path)
+    return info.duration if info else None
+
+
+def write_concat_list(files: List[str], list_path: str):
+    """Write a file list for ffmpeg's concat demuxer (absolute, quoted paths)."""
+    with open(list_path, "w", encoding="utf-8") as f:
+        for path in files:
+            escaped = os.path.abspath(path).replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+
+
+def concat_copy(files: List[str], output_path: str, list_path: str, audio: str = None):
+    """
+    Join files with identical encoding settings without re-encoding them.
+    
+    Args:
+        files: Input files, in order
+        output_path: Joined output file
+        list_path: Where to write the concat demuxer's file list (removed afterwards)
+        audio: Audio track to mux in place of the files' own audio (also copied)
+    """
+    write_concat_list(files, list_path)
+    track = ["-i", audio, "-map", "0:v", "-map", "1:a"] if audio else []
+    try:
+        run_ffmpeg("-f", "concat", "-safe", "0", "-i", list_path, *track, "-c", "copy", output_path)
+    finally:
+        if os.path.exists(list_path):
+            os.remove(list_path)
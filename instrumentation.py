@@ -0,0 +1,266 @@
+"""
+Lightweight instrumentation for pipeline runs.
+Stages, LLM calls, TTS requests, renders, encodes and assembly steps are
+recorded as spans with wall time, CPU time, peak RSS, token counts, retries
+and bytes written. A RunRecorder collects the spans of one run; it is found
+through a context variable, so pipelines running side by side in a batch
+keep separate records. Without an active recorder, spans cost next to nothing.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS and child CPU are not reported
+    resource = None
+
+_recorder = contextvars.ContextVar("run_recorder", default=None)
+_stage = contextvars.ContextVar("pipeline_stage", default=None)
+
+# ru_maxrss is in kilobytes on Linux and bytes on macOS
+_RSS_PER_MB = 1024 * 1024 if sys.platform == "darwin" else 1024
+
+
+def _usage() -> tuple:
+    """(child CPU seconds, own peak RSS in MB, children's peak RSS in MB)."""
+    if resource is None:
+        return 0.0, None, None
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return (
+        children.ru_utime + children.ru_stime,
+        own.ru_maxrss / _RSS_PER_MB,
+        children.ru_maxrss / _RSS_PER_MB
+    )
+
+
+class Span:
+    """One timed operation. Counters added while it runs end up in the report."""
+    
+    def __init__(self, name: str, category: str, scene: Optional[int] = None, **attrs):
+        self.name = name
+        self.category = category
+        self.scene = scene
+        self.stage = _stage.get()
+        self.attrs = dict(attrs)
+    
+    def set(self, **attrs):
+        """Set attributes (e.g. cached=True, model=...)."""
+        self.attrs.update(attrs)
+    
+    def add(self, key: str, amount: float = 1):
+        """Increase a counter (e.g. retries, prompt_tokens)."""
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+    
+    def add_file(self, path: str):
+        """Count a written file towards bytes_written."""
+        if path and os.path.exists(path):
+            self.add("bytes_written", os.path.getsize(path))
+
+
+class RunRecorder:
+    """Collects the spans of one pipeline run."""
+    
+    def __init__(self, name: str):
+        """
+        Initialize the recorder.
+        
+        Args:
+            name: Run name (used as the process name in traces)
+        """
+        self.name = name
+        self.spans: List[dict] = []
+        self._origin = time.perf_counter()
+        self._started_at = time.time()
+        self._lock = threading.Lock()
+    
+    @contextmanager
+    def activate(self):
+        """Record spans from this context (and work it hands to in_context) here."""
+        token = _recorder.set(self)
+        try:
+            yield self
+        finally:
+            _recorder.reset(token)
+    
+    def add(self, span: Span, start: float, end: float, cpu: float, child_cpu: float,
+            peak_rss: Optional[float], children_rss: Optional[float]):
+        record = {
+            "name": span.name,
+            "category": span.category,
+            "stage": span.stage,
+            "scene": span.scene,
+            "thread": threading.current_thread().name,
+            "start": round(start - self._origin, 4),
+            "wall_seconds": round(end - start, 4),
+            "cpu_seconds": round(cpu, 4),
+            "child_cpu_seconds": round(child_cpu, 4),
+            "peak_rss_mb": round(peak_rss, 1) if peak_rss is not None else None,
+            "children_peak_rss_mb": round(children_rss, 1) if children_rss is not None else None,
+            **span.attrs
+        }
+        with self._lock:
+            self.spans.append(record)
+    
+    def report(self) -> dict:
+        """
+        Summarize the run per stage, per category and per scene.
+        
+        Stage wall/CPU times come from the stage spans; counters (tokens,
+        retries, bytes) are summed over every span recorded in the stage.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        
+        def totals(group: List[dict]) -> dict:
+            summary = {
+                "count": len(group),
+                "wall_seconds": round(sum(s["wall_seconds"] for s in group), 3),
+                "cpu_seconds": round(sum(s["cpu_seconds"] for s in group), 3),
+                "child_cpu_seconds": round(sum(s["child_cpu_seconds"] for s in group), 3),
+            }
+            for key in ("prompt_tokens", "completion_tokens", "retries", "bytes_written"):
+                value = sum(s.get(key, 0) for s in group)
+                if value:
+                    summary[key] = value
+            cached = sum(1 for s in group if s.get("cached"))
+            if cached:
+                summary["cached"] = cached
+            return summary
+        
+        stages = {}
+        for stage_span in (s for s in spans if s["category"] == "stage"):
+            inner = totals([s for s in spans if s["stage"] == stage_span["name"] and s["category"] != "stage"])
+            operations = inner.pop("count")
+            for key in ("wall_seconds", "cpu_seconds", "child_cpu_seconds"):
+                inner.pop(key)
+            # Child CPU is process-wide, so stages running side by side share it
+            stages[stage_span["name"]] = {
+                "wall_seconds": stage_span["wall_seconds"],
+                "cpu_seconds": round(stage_span["cpu_seconds"] + stage_span["child_cpu_seconds"], 3),
+                "peak_rss_mb": stage_span["peak_rss_mb"],
+                "operations": operations,
+                **inner
+            }
+        
+        categories = {}
+        scenes = {}
+        for record in spans:
+            if record["category"] != "stage":
+                categories.setdefault(record["category"], []).append(record)
+            if record["scene"] is not None:
+                scenes.setdefault(record["scene"], {}).setdefault(record["category"], []).append(record)
+        
+        own_peak = max((s["peak_rss_mb"] for s in spans if s["peak_rss_mb"] is not None), default=None)
+        children_peak = max((s["children_peak_rss_mb"] for s in spans if s["children_peak_rss_mb"] is not None), default=None)
+        leaves = [s for s in spans if s["category"] != "stage"]
+        return {
+            "wall_seconds": round(time.perf_counter() - self._origin, 3),
+            "peak_rss_mb": own_peak,
+            "children_peak_rss_mb": children_peak,
+            "totals": {key: value for key, value in totals(leaves).items() if key != "count"},
+            "stages": stages,
+            "categories": {name: totals(group) for name, group in categories.items()},
+            "scenes": {
+                str(number): {category: totals(group) for category, group in by_category.items()}
+                for number, by_category in sorted(scenes.items())
+            }
+        }
+    
+    def write_trace(self, path: str):
+        """
+        Write the spans as a Chrome trace (open in chrome://tracing or Perfetto).
+        
+        Each thread gets its own row; span attributes show up under "args".
+        """
+        with self._lock:
+            spans = list(self.spans)
+        threads = {}
+        events = [{"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.name}}]
+        for record in sorted(spans, key=lambda s: s["start"]):
+            tid = threads.setdefault(record["thread"], len(threads) + 1)
+            args = {key: value for key, value in record.items()
+                    if key not in ("name", "category", "thread", "start", "wall_seconds") and value is not None}
+            events.append({
+                "name": record["name"] if record["scene"] is None else f"{record['name']} #{record['scene']}",
+                "cat": record["category"],
+                "ph": "X",
+                "pid": 1,
+                "tid": tid,
+                "ts": round(record["start"] * 1e6),
+                "dur": round(record["wall_seconds"] * 1e6),
+                "args": args
+            })
+        events.extend(
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread}}
+            for thread, tid in threads.items()
+        )
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"run": self.name, "started_at": self._started_at}}, f)
+
+
+@contextmanager
+def span(name: str, category: str, scene: Optional[int] = None, **attrs):
+    """
+    Time a block of work for the active run (a no-op without one).
+    
+    Args:
+        name: Operation name, e.g. "tts" or "render"
+        category: "stage", "llm", "tts", "render", "encode" or "assembly"
+        scene: Scene number, for per-scene totals
+        **attrs: Extra attributes recorded with the span
+    
+    Yields:
+        The Span, for adding counters such as tokens or bytes written
+    """
+    current = Span(name, category, scene, **attrs)
+    recorder = _recorder.get()
+    if recorder is None:
+        yield current
+        return
+    child_cpu_start = _usage()[0]
+    cpu_start = time.thread_time()
+    start = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        end = time.perf_counter()
+        cpu = time.thread_time() - cpu_start
+        child_cpu_end, peak_rss, children_rss = _usage()
+        recorder.add(current, start, end, cpu, child_cpu_end - child_cpu_start, peak_rss, children_rss)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage; spans opened inside it are attributed to it."""
+    token = _stage.set(name)
+    try:
+        with span(name, "stage"):
+            yield
+    finally:
+        _stage.reset(token)
+
+
+def in_context(fn: Callable) -> Callable:
+    """
+    Bind fn to the caller's run and stage, for work handed to a thread pool.
+    
+    Thread pools do not carry context variables over to their workers, so
+    pool.submit(in_context(fn), ...) keeps spans attributed to this run.
+    """
+    context = contextvars.copy_context()
+    
+    def run(*args, **kwargs):
+        return context.copy().run(fn, *args, **kwargs)
+    
+    return run
@@ -0,0 +1,410 @@
+"""
+Geometric layout check for scene blueprints, run before anything is rendered.
+Every element is turned into approximate bounding boxes (shape, label and,
+for arrows, the line itself) using the geometry of the renderer that will
+draw it, with text extents estimated from the font size. Out-of-frame parts
+are found with vectorized NumPy comparisons and overlaps with a uniform-grid
+spatial index, so a bad layout is caught in milliseconds instead of after a
+Manim render. In "fix" mode free-standing text is moved off whatever it
+overlaps and the scene is scaled and shifted back into the frame; anything
+left is reported.
+"""
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel
+from config import Config
+from models_schemas import AnimationElement, SceneBlueprint
+
+# Rough Manim Text metrics in scene units per point of font size
+CHAR_WIDTH = 1 / 145
+LINE_HEIGHT = 1 / 96
+
+MODES = ("fix", "warn", "off")
+TOLERANCE = 0.02    # Overlaps shallower than this are ignored (scene units)
+FRAME_MARGIN = 0.1  # Kept free along the frame edges
+GAP = 0.15          # Clearance left by fixes
+ARROW_TIP = 0.1     # Half-width of an arrow tip
+
+
+class LayoutGeometry(BaseModel):
+    """Where a renderer puts shapes and labels (numbers mirror scene_styles.py and simple_video_generator.py)."""
+    frame_width: float = 14.22
+    frame_height: float = 8.0
+    scale: float = 1.0                    # Applied to positions and sizes
+    rect_label_size: float = 24           # Font sizes in Manim points
+    circle_label_size: float = 18
+    arrow_label_size: float = 20
+    text_size: Optional[float] = None     # Fixed size of text elements (None = their font_size)
+    rect_label: str = "center"            # "center" (inside) or "above" the rectangle
+    rect_label_shift: float = 0.0         # Moved up by this much (centered labels)
+    rect_label_size_per_width: Optional[float] = None
+    rect_label_fit: Optional[float] = None
+    circle_label_fit: Optional[float] = None
+    arrow_buff: float = 0.1               # Gap between an arrow and its endpoints
+    arrow_label_buff: float = 0.2         # Gap between an arrow and the label above it
+    label_gap: float = 0.11               # Gap between a rectangle and a label above it
+    label_pad: float = 0.0                # Backdrop around labels and text
+
+
+_POLISHED = dict(frame_width=18.0, rect_label_size=22, label_pad=0.15)
+
+GEOMETRY: Dict[str, LayoutGeometry] = {
+    # PIL renderer: a 14x8 frame, 32px/24px fonts at 1080p, labels above boxes
+    "simple": LayoutGeometry(
+        frame_width=14.0, rect_label_size=23, circle_label_size=17, arrow_label_size=17,
+        text_size=23, rect_label="above", arrow_label_buff=0.26, label_pad=0.04
+    ),
+    "default": LayoutGeometry(),
+    "fixed": LayoutGeometry(frame_width=16.0, frame_height=9.0, scale=0.7, rect_label_size=20,
+                            circle_label_size=16, arrow_label_size=18),
+    "enhanced": LayoutGeometry(**_POLISHED, arrow_buff=0.2, arrow_label_buff=0.4),
+    "best": LayoutGeometry(**{**_POLISHED, "rect_label_size": 20}, arrow_label_size=18,
+                           arrow_buff=0.3, arrow_label_buff=0.6),
+    "perfect": LayoutGeometry(**{**_POLISHED, "rect_label_size": 20}, circle_label_size=16, arrow_label_size=16,
+                              rect_label_size_per_width=8, rect_label_fit=0.85, circle_label_fit=0.7,
+                              arrow_buff=0.4, arrow_label_buff=0.8),
+    "ultimate": LayoutGeometry(**{**_POLISHED, "label_pad": 0.2}, arrow_label_size=18, rect_label_size_per_width=9,
+                               rect_label_fit=0.85, rect_label_shift=2.5, circle_label_fit=0.7,
+                               arrow_buff=0.3, arrow_label_buff=2.0),
+}
+
+
+def geometry_for(style: Optional[str]) -> LayoutGeometry:
+    """Geometry of a Manim style, or of the simple renderer for None."""
+    return GEOMETRY.get(style or "simple", GEOMETRY["default"])
+
+
+class LayoutIssue(BaseModel):
+    """An overlap or out-of-frame part found before rendering."""
+    scene_number: int
+    kind: str                   # "overlap" or "out_of_frame"
+    elements: List[int]         # Indices into the scene's elements
+    parts: List[str]            # "shape", "label" or "arrow", one per element
+    amount: float               # Overlap depth, length of arrow inside a box, or distance outside the frame
+    description: str
+
+
+def text_extent(text: str, font_size: float) -> Tuple[float, float]:
+    """Estimated (width, height) of a text in scene units."""
+    lines = text.split("\n")
+    return max(len(line) for line in lines) * font_size * CHAR_WIDTH, len(lines) * font_size * LINE_HEIGHT
+
+
+def scene_parts(scene_bp: SceneBlueprint, geometry: LayoutGeometry) -> Tuple[np.ndarray, np.ndarray, list, np.ndarray]:
+    """
+    Approximate bounding boxes of every part of every element.
+    
+    Returns:
+        (boxes (n, 4) as x0, y0, x1, y1; owning element index (n,); part kinds;
+        arrow line segments (n, 4), zero for parts that are not arrows)
+    """
+    g = geometry
+    boxes, owners, kinds, segments = [], [], [], []
+    
+    def add(index, kind, box, segment=(0.0, 0.0, 0.0, 0.0)):
+        boxes.append(box)
+        owners.append(index)
+        kinds.append(kind)
+        segments.append(segment)
+    
+    def label_box(cx, cy, width, height):
+        pad = g.label_pad
+        return (cx - width / 2 - pad, cy - height / 2 - pad, cx + width / 2 + pad, cy + height / 2 + pad)
+    
+    for index, elem in enumerate(scene_bp.elements):
+        pos, size = elem.position, elem.size
+        x, y = pos.get("x", 0) * g.scale, pos.get("y", 0) * g.scale
+        
+        if elem.element_type == "rectangle":
+            w, h = size.get("width", 2) * g.scale, size.get("height", 1.5) * g.scale
+            add(index, "shape", (x - w / 2, y - h / 2, x + w / 2, y + h / 2))
+            if elem.label:
+                font_size = g.rect_label_size
+                if g.rect_label_size_per_width:
+                    font_size = min(font_size, int(w * g.rect_label_size_per_width))
+                lw, lh = text_extent(elem.label, max(font_size, 1))
+                if g.rect_label_fit:
+                    lh *= w * g.rect_label_fit / lw
+                    lw = w * g.rect_label_fit
+                if g.rect_label == "above":
+                    add(index, "label", label_box(x, y + h / 2 + g.label_gap + lh / 2, lw, lh))
+                else:
+                    add(index, "label", label_box(x, y + g.rect_label_shift, lw, lh))
+        
+        elif elem.element_type == "circle":
+            r = size.get("radius", 0.5) * g.scale
+            add(index, "shape", (x - r, y - r, x + r, y + r))
+            if elem.label:
+                lw, lh = text_extent(elem.label, g.circle_label_size)
+                if g.circle_label_fit:
+                    lh *= 2 * r * g.circle_label_fit / lw
+                    lw = 2 * r * g.circle_label_fit
+                add(index, "label", label_box(x, y, lw, lh))
+        
+        elif elem.element_type == "arrow":
+            x0, y0 = pos.get("x_start", -2) * g.scale, pos.get("y_start", 0) * g.scale
+            x1, y1 = pos.get("x_end", 2) * g.scale, pos.get("y_end", 0) * g.scale
+            box = (min(x0, x1) - ARROW_TIP, min(y0, y1) - ARROW_TIP, max(x0, x1) + ARROW_TIP, max(y0, y1) + ARROW_TIP)
+            add(index, "arrow", box, (x0, y0, x1, y1))
+            if elem.label:
+                lw, lh = text_extent(elem.label, g.arrow_label_size)
+                add(index, "label", label_box((box[0] + box[2]) / 2, box[3] + g.arrow_label_buff + lh / 2, lw, lh))
+        
+        elif elem.element_type == "text" and elem.label:
+            font_size = g.text_size or size.get("font_size", 36) * g.scale
+            lw, lh = text_extent(elem.label, font_size)
+            add(index, "label", label_box(x, y, lw, lh))
+    
+    return (np.array(boxes, dtype=float).reshape(-1, 4), np.array(owners, dtype=int), kinds,
+            np.array(segments, dtype=float).reshape(-1, 4))
+
+
+def candidate_pairs(boxes: np.ndarray, cell: float = 1.0) -> np.ndarray:
+    """
+    Pairs of boxes that share a cell of a uniform grid (a cheap spatial index).
+    
+    Returns:
+        (m, 2) array of row indices, i < j
+    """
+    grid = defaultdict(list)
+    first = np.floor(boxes[:, :2] / cell).astype(int)
+    last = np.floor(boxes[:, 2:] / cell).astype(int)
+    for row, ((cx0, cy0), (cx1, cy1)) in enumerate(zip(first, last)):
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                grid[(cx, cy)].append(row)
+    pairs = {(a, b) for rows in grid.values() for i, a in enumerate(rows) for b in rows[i + 1:]}
+    return np.array(sorted(pairs), dtype=int).reshape(-1, 2)
+
+
+def _segment_inside(segments: np.ndarray, boxes: np.ndarray) -> np.ndarray:
+    """Length of each segment inside the matching box (slab clipping, vectorized)."""
+    start, delta = segments[:, :2], segments[:, 2:] - segments[:, :2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (boxes[:, :2] - start) / delta
+        t1 = (boxes[:, 2:] - start) / delta
+    near, far = np.minimum(t0, t1), np.maximum(t0, t1)
+    # Axis-parallel segments: inside the slab for all t, or never
+    parallel = delta == 0
+    inside_slab = (start >= boxes[:, :2]) & (start <= boxes[:, 2:])
+    near = np.where(parallel, np.where(inside_slab, -np.inf, np.inf), near)
+    far = np.where(parallel, np.where(inside_slab, np.inf, -np.inf), far)
+    enter = np.clip(near.max(axis=1), 0, 1)
+    leave = np.clip(far.min(axis=1), 0, 1)
+    return np.maximum(leave - enter, 0) * np.hypot(delta[:, 0], delta[:, 1])
+
+
+def find_issues(scene_bp: SceneBlueprint, geometry: LayoutGeometry) -> List[LayoutIssue]:
+    """Every out-of-frame part and every overlap between parts of different elements."""
+    boxes, owners, kinds, segments = scene_parts(scene_bp, geometry)
+    issues = []
+    if not len(boxes):
+        return issues
+    
+    # Out of frame: how far each part reaches past the nearest edge
+    half = np.array([geometry.frame_width / 2, geometry.frame_height / 2])
+    overflow = np.maximum(np.maximum(-half - boxes[:, :2], boxes[:, 2:] - half), 0).max(axis=1)
+    for row in np.flatnonzero(overflow > TOLERANCE):
+        index = owners[row]
+        issues.append(LayoutIssue(
+            scene_number=scene_bp.scene_number, kind="out_of_frame", elements=[int(index)], parts=[kinds[row]],
+            amount=round(float(overflow[row]), 3),
+            description=f"{_name(scene_bp.elements[index])} {kinds[row]} extends {overflow[row]:.2f} outside the frame"
+        ))
+    
+    pairs = candidate_pairs(boxes)
+    if not len(pairs):
+        return issues
+    pairs = pairs[owners[pairs[:, 0]] != owners[pairs[:, 1]]]
+    kind_array = np.array(kinds)
+    is_arrow = kind_array == "arrow"
+    # Arrow against arrow (crossings, shared endpoints) is allowed
+    pairs = pairs[~(is_arrow[pairs[:, 0]] & is_arrow[pairs[:, 1]])]
+    a, b = boxes[pairs[:, 0]], boxes[pairs[:, 1]]
+    
+    # Box against box: penetration depth along the shallower axis
+    depth = np.minimum(np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0]),
+                       np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1]))
+    # A shape containing another element's whole body (its first part) is a container, not an overlap
+    body_rows = np.unique(owners, return_index=True)[1]
+    body = np.zeros((owners.max() + 1, 4))
+    body[owners[body_rows]] = boxes[body_rows]
+    is_shape = kind_array == "shape"
+    nested = ((is_shape[pairs[:, 0]] & _contains(a, body[owners[pairs[:, 1]]])) |
+              (is_shape[pairs[:, 1]] & _contains(b, body[owners[pairs[:, 0]]])))
+    amount = np.where(nested, 0.0, depth)
+    
+    # Arrow against anything else: the arrow's line, minus the gaps at its ends
+    arrow_first = is_arrow[pairs[:, 0]]
+    arrow_rows = np.where(arrow_first, pairs[:, 0], pairs[:, 1])
+    other_rows = np.where(arrow_first, pairs[:, 1], pairs[:, 0])
+    with_arrow = is_arrow[pairs[:, 0]] | is_arrow[pairs[:, 1]]
+    if with_arrow.any():
+        lines = _shorten(segments[arrow_rows[with_arrow]], geometry.arrow_buff + 0.05)
+        amount[with_arrow] = np.where(nested[with_arrow], 0.0,
+                                      _segment_inside(lines, boxes[other_rows[with_arrow]]))
+    
+    # One issue per pair of elements: their deepest overlapping parts
+    deepest = {}
+    for (i, j), value in zip(pairs[amount > TOLERANCE], amount[amount > TOLERANCE]):
+        key = (owners[i], owners[j])
+        if key not in deepest or value > deepest[key][2]:
+            deepest[key] = (i, j, value)
+    for i, j, value in deepest.values():
+        first, second = scene_bp.elements[owners[i]], scene_bp.elements[owners[j]]
+        issues.append(LayoutIssue(
+            scene_number=scene_bp.scene_number, kind="overlap",
+            elements=[int(owners[i]), int(owners[j])], parts=[kinds[i], kinds[j]], amount=round(float(value), 3),
+            description=f"{_name(first)} {kinds[i]} overlaps {_name(second)} {kinds[j]} by {value:.2f}"
+        ))
+    return issues
+
+
+def fix_layout(scene_bp: SceneBlueprint, geometry: LayoutGeometry) -> List[str]:
+    """
+    Repair what can be repaired without breaking connections, in place.
+    
+    Free-standing text elements are moved vertically off whatever they overlap,
+    then the whole scene is scaled down (if too large) and shifted so every
+    part is inside the frame. Shapes and arrows keep their relative positions,
+    so arrows still connect the same boxes.
+    
+    Returns:
+        Descriptions of the changes made
+    """
+    fixes = []
+    half_height = geometry.frame_height / 2 - FRAME_MARGIN
+    
+    for index, elem in enumerate(scene_bp.elements):
+        if elem.element_type != "text" or not elem.label:
+            continue
+        boxes, owners, _, _ = scene_parts(scene_bp, geometry)
+        own = boxes[owners == index]
+        others = boxes[owners != index]
+        if not len(own) or not len(others):
+            continue
+        box = own[0]
+        hit = others[(np.minimum(box[2], others[:, 2]) - np.maximum(box[0], others[:, 0]) > TOLERANCE) &
+                     (np.minimum(box[3], others[:, 3]) - np.maximum(box[1], others[:, 1]) > TOLERANCE)]
+        if not len(hit):
+            continue
+        # Clear every box in the text's column, going whichever way is shorter and stays in frame
+        column = others[(others[:, 2] > box[0]) & (others[:, 0] < box[2])]
+        up = _clear_shift(box, column, +1)
+        down = _clear_shift(box, column, -1)
+        options = [shift for shift in (up, down) if -half_height <= box[1] + shift and box[3] + shift <= half_height]
+        shift = min(options, key=abs) if options else min((up, down), key=abs)
+        elem.position["y"] = round(elem.position.get("y", 0) + shift / geometry.scale, 2)
+        fixes.append(f"moved {_name(elem)} {'up' if shift > 0 else 'down'} {abs(shift):.2f}")
+    
+    for _ in range(3):
+        boxes, _, _, _ = scene_parts(scene_bp, geometry)
+        if not len(boxes):
+            break
+        low, high = boxes[:, :2].min(axis=0), boxes[:, 2:].max(axis=0)
+        limit = np.array([geometry.frame_width / 2, geometry.frame_height / 2]) - FRAME_MARGIN
+        factor = float(np.min(2 * limit / np.maximum(high - low, 1e-9)))
+        if factor < 1:
+            _scale_scene(scene_bp, factor)
+            fixes.append(f"scaled the scene by {factor:.2f} to fit the frame")
+            continue
+        # Centre the content's overflow back inside the frame
+        shift = np.clip(0, -limit - low, limit - high)
+        if np.abs(shift).max() <= TOLERANCE:
+            break
+        _shift_scene(scene_bp, shift / geometry.scale)
+        fixes.append(f"shifted the scene by ({shift[0]:+.2f}, {shift[1]:+.2f}) into the frame")
+        break
+    return fixes
+
+
+def check_scene(scene_bp: SceneBlueprint, style: str = None, mode: str = None) -> List[LayoutIssue]:
+    """
+    Check (and in "fix" mode repair) one scene, printing what was found.
+    
+    Args:
+        scene_bp: Scene blueprint; modified in place in "fix" mode
+        style: Manim style that will render it (None = simple renderer)
+        mode: "fix", "warn" or "off" (default: Config.LAYOUT_CHECK)
+    
+    Returns:
+        The issues left after any fixes
+    """
+    mode = mode or Config.LAYOUT_CHECK
+    if mode not in MODES:
+        raise ValueError(f"Layout check mode must be one of {MODES}, got '{mode}'")
+    if mode == "off":
+        return []
+    start = time.perf_counter()
+    geometry = geometry_for(style)
+    issues = find_issues(scene_bp, geometry)
+    if issues and mode == "fix":
+        for fix in fix_layout(scene_bp, geometry):
+            print(f"    [OK] Scene {scene_bp.scene_number} layout: {fix}")
+        issues = find_issues(scene_bp, geometry)
+    for issue in issues:
+        print(f"    [WARN] Scene {scene_bp.scene_number} layout: {issue.description}")
+    if issues:
+        print(f"    Layout check took {(time.perf_counter() - start) * 1000:.1f} ms")
+    return issues
+
+
+def _name(elem: AnimationElement) -> str:
+    return f"{elem.element_type} '{elem.label}'" if elem.label else elem.element_type
+
+
+def _contains(outer: np.ndarray, inner: np.ndarray) -> np.ndarray:
+    return ((outer[:, 0] <= inner[:, 0]) & (outer[:, 1] <= inner[:, 1]) &
+            (outer[:, 2] >= inner[:, 2]) & (outer[:, 3] >= inner[:, 3]))
+
+
+def _shorten(segments: np.ndarray, amount: float) -> np.ndarray:
+    """Trim each segment by amount at both ends (never past its midpoint)."""
+    start, end = segments[:, :2], segments[:, 2:]
+    length = np.hypot(*(end - start).T)[:, None]
+    trim = np.minimum(amount, length / 2) / np.maximum(length, 1e-9)
+    return np.hstack([start + (end - start) * trim, end - (end - start) * trim])
+
+
+def _clear_shift(box: np.ndarray, others: np.ndarray, direction: int) -> float:
+    """Smallest vertical move (up for +1, down for -1) after which box clears every box in others."""
+    shift = 0.0
+    for _ in range(len(others) + 1):
+        moved = box + np.array([0, shift, 0, shift])
+        blocking = others[(np.minimum(moved[3], others[:, 3]) - np.maximum(moved[1], others[:, 1])) > 0]
+        if not len(blocking):
+            return shift
+        if direction > 0:
+            shift += blocking[:, 3].max() - moved[1] + GAP
+        else:
+            shift -= moved[3] - blocking[:, 1].min() + GAP
+    return shift
+
+
+def _scale_scene(scene_bp: SceneBlueprint, factor: float):
+    for elem in scene_bp.elements:
+        for key in ("x", "y", "x_start", "y_start", "x_end", "y_end"):
+            if key in elem.position:
+                elem.position[key] = round(elem.position[key] * factor, 2)
+        if elem.element_type == "arrow":
+            # Missing endpoints default to -2/2; make them explicit before scaling
+            elem.position.setdefault("x_start", round(-2 * factor, 2))
+            elem.position.setdefault("x_end", round(2 * factor, 2))
+        for key in ("width", "height", "radius", "font_size"):
+            if key in elem.size:
+                elem.size[key] = round(elem.size[key] * factor, 2)
+
+
+def _shift_scene(scene_bp: SceneBlueprint, shift: np.ndarray):
+    dx, dy = float(shift[0]), float(shift[1])
+    for elem in scene_bp.elements:
+        if elem.element_type == "arrow":
+            elem.position["x_start"] = round(elem.position.get("x_start", -2) + dx, 2)
+            elem.position["x_end"] = round(elem.position.get("x_end", 2) + dx, 2)
+            elem.position["y_start"] = round(elem.position.get("y_start", 0) + dy, 2)
+            elem.position["y_end"] = round(elem.position.get("y_end", 0) + dy, 2)
+        else:
+            elem.position["x"] = round(elem.position.get("x", 0) + dx, 2)
+            elem.position["y"] = round(elem.position.get("y", 0) + dy, 2)
@@ -0,0 +1,339 @@
+"""
+Deterministic layout solver for scene blueprints.
+Shapes and text are snapped to the grid the prompts ask for (x in -4..4 in
+steps of 2, y in -2..2, titles at y=3), then spread just enough that nothing
+overlaps: elements sharing a row keep their order and a minimum gap (wider
+between elements joined by an arrow, so the arrow and its label fit), and
+rows keep clear of each other wherever their elements line up. Each set of
+spacing constraints is a chain, solved exactly as a least-squares isotonic
+regression (pool adjacent violators), so the result is as close to the grid
+as the constraints allow and is always the same for the same blueprint.
+Element extents include the labels of the renderer in use (see
+layout_check), arrows are re-routed between the edges of the elements they
+connect, and the whole layout is shrunk if it cannot fit the frame. A scene
+takes well under a millisecond per element.
+"""
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from models_schemas import SceneBlueprint
+from layout_check import (
+    ARROW_TIP, FRAME_MARGIN, LayoutGeometry, geometry_for, scene_parts, text_extent
+)
+
+GRID_X = (-4, -2, 0, 2, 4)
+GRID_Y = (-2, -1, 0, 1, 2)
+TITLE_Y = 3             # Text at or above TITLE_MIN_Y is a title, kept on its own row
+TITLE_MIN_Y = 2.5
+MIN_GAP = 0.5           # Between the extents (labels included) of neighbouring elements
+ARROW_MIN_LENGTH = 1.0  # Visible length of an arrow between neighbours
+ATTACH_DISTANCE = 1.0   # Arrow ends this close to an element are attached to it
+MAX_PASSES = 5          # Shrink-and-resolve passes when the layout does not fit
+
+
+def solve_scene(scene_bp: SceneBlueprint, style: str = None, geometry: LayoutGeometry = None) -> SceneBlueprint:
+    """
+    Lay a scene out on the grid without overlaps.
+    
+    Args:
+        scene_bp: Scene blueprint (left unchanged)
+        style: Manim style that will render it (None = simple renderer)
+        geometry: Renderer geometry (default: geometry_for(style))
+    
+    Returns:
+        A corrected copy of the scene blueprint
+    """
+    geometry = geometry or geometry_for(style)
+    solved = scene_bp.model_copy(deep=True)
+    if not solved.elements:
+        return solved
+    for _ in range(MAX_PASSES):
+        factor = _solve_once(solved, geometry)
+        if factor >= 1:
+            break
+        _scale_sizes(solved, factor)
+    return solved
+
+
+def solve_blueprint_scenes(scene_stream, style: str = None):
+    """Solve each scene of a stream as it arrives, printing what moved."""
+    for scene_bp in scene_stream:
+        start = time.perf_counter()
+        solved = solve_scene(scene_bp, style)
+        moved = sum(before.position != after.position or before.size != after.size
+                    for before, after in zip(scene_bp.elements, solved.elements))
+        if moved:
+            print(f"    [OK] Scene {scene_bp.scene_number} layout solved in "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms ({moved} elements adjusted)")
+        yield solved
+
+
+def isotonic(values: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Weighted least-squares non-decreasing fit (pool adjacent violators).
+    
+    Args:
+        values: Targets, in order
+        weights: Weight of each target
+    
+    Returns:
+        The closest non-decreasing sequence
+    """
+    means, totals, counts = [], [], []
+    for value, weight in zip(values, weights):
+        means.append(float(value))
+        totals.append(float(weight))
+        counts.append(1)
+        while len(means) > 1 and means[-2] > means[-1]:
+            weight = totals[-2] + totals[-1]
+            means[-2] = (means[-2] * totals[-2] + means[-1] * totals[-1]) / weight
+            totals[-2] = weight
+            counts[-2] += counts[-1]
+            del means[-1], totals[-1], counts[-1]
+    return np.repeat(means, counts)
+
+
+def solve_chain(targets: np.ndarray, gaps: np.ndarray, weights: np.ndarray = None) -> np.ndarray:
+    """
+    Positions closest to targets (least squares) with p[i+1] - p[i] >= gaps[i].
+    
+    Args:
+        targets: Wanted positions, in chain order
+        gaps: Minimum distance between consecutive positions (len(targets) - 1)
+        weights: Weight of each target (default: all 1)
+    """
+    offsets = np.concatenate([[0.0], np.cumsum(gaps)])
+    weights = np.ones(len(targets)) if weights is None else weights
+    return isotonic(np.asarray(targets) - offsets, weights) + offsets
+
+
+def _solve_once(scene_bp: SceneBlueprint, g: LayoutGeometry) -> float:
+    """
+    One solve in place (in render units, i.e. blueprint units times g.scale).
+    
+    Returns:
+        The factor sizes must shrink by for the layout to fit the frame (1 when it fits)
+    """
+    elements = scene_bp.elements
+    boxes, owners, _, _ = scene_parts(scene_bp, g)
+    
+    # Extents of each element (all its parts) around its position, and its body (first part)
+    centres, extents, bodies = {}, {}, {}
+    for index, elem in enumerate(elements):
+        parts = np.flatnonzero(owners == index)
+        if elem.element_type == "arrow" or not len(parts):
+            continue
+        centre = np.array([elem.position.get("x", 0), elem.position.get("y", 0)]) * g.scale
+        union = np.concatenate([boxes[parts, :2].min(axis=0), boxes[parts, 2:].max(axis=0)])
+        centres[index] = centre
+        extents[index] = np.array([centre[0] - union[0], union[2] - centre[0], centre[1] - union[1], union[3] - centre[1]])
+        bodies[index] = boxes[parts[0]]
+    
+    # An element lying wholly inside a (larger) shape moves with it
+    parents = {}
+    for index in centres:
+        inside = [other for other in centres if elements[other].element_type in ("rectangle", "circle")
+                  and _area(bodies[other]) > _area(bodies[index]) and _contains(bodies[other], bodies[index])]
+        if inside:
+            parents[index] = min(inside, key=lambda other: _area(bodies[other]))
+    free = [index for index in centres if index not in parents]
+    if not free:
+        return 1.0
+    
+    # Arrow ends attached to the nearest shape within ATTACH_DISTANCE
+    shapes = {index: body for index, body in bodies.items() if elements[index].element_type in ("rectangle", "circle")}
+    links = []
+    for index, elem in enumerate(elements):
+        if elem.element_type != "arrow":
+            continue
+        start = np.array([elem.position.get("x_start", -2), elem.position.get("y_start", 0)]) * g.scale
+        end = np.array([elem.position.get("x_end", 2), elem.position.get("y_end", 0)]) * g.scale
+        # Looking slightly behind the start and past the end settles ties between neighbours
+        step = (end - start) / max(np.hypot(*(end - start)), 1e-9) * 0.05
+        source, target = _attach(start - step, shapes), _attach(end + step, shapes)
+        label = text_extent(elem.label, g.arrow_label_size) if elem.label else None
+        links.append((index, source, target, start, end, label))
+    
+    # Grid targets; rows from the snapped y
+    targets, rows = {}, {}
+    for index in free:
+        x, y = (elements[index].position.get(key, 0) for key in ("x", "y"))
+        is_title = elements[index].element_type == "text" and y >= TITLE_MIN_Y
+        row = TITLE_Y if is_title else int(min(GRID_Y, key=lambda grid_y: (abs(grid_y - y), grid_y)))
+        column = min(GRID_X, key=lambda grid_x: (abs(grid_x - x), grid_x))
+        targets[index] = np.array([column, row], dtype=float) * g.scale
+        rows.setdefault(row, []).append(index)
+    for row in rows.values():
+        row.sort(key=lambda index: (targets[index][0], elements[index].position.get("x", 0), index))
+    
+    half_width = g.frame_width / 2 - FRAME_MARGIN
+    half_height = g.frame_height / 2 - FRAME_MARGIN
+    factor = 1.0
+    solved = {}
+    
+    # Horizontal: each row keeps its order, with room between neighbours
+    joined = _joined_pairs(links, g)
+    for row in rows.values():
+        gaps = np.array([extents[a][1] + extents[b][0] + max(MIN_GAP, joined.get(frozenset((a, b)), 0))
+                         for a, b in zip(row, row[1:])])
+        xs = solve_chain(np.array([targets[index][0] for index in row]), gaps)
+        low, high = xs[0] - extents[row[0]][0], xs[-1] + extents[row[-1]][1]
+        factor = min(factor, 2 * half_width / max(high - low, 1e-9))
+        xs += _into(low, high, half_width)
+        for index, x in zip(row, xs):
+            solved[index] = np.array([x, 0.0])
+    
+    # Vertical: rows top to bottom, clear of each other where their elements line up
+    order = sorted(rows, reverse=True)
+    items = {row: [(solved[index][0] - extents[index][0], solved[index][0] + extents[index][1],
+                    extents[index][2], extents[index][3]) for index in rows[row]] for row in order}
+    for row, (left, right, top) in _arrow_labels(links, rows, solved, g):
+        items[row].append((left, right, 0.0, top))
+    gaps = []
+    for upper, lower in zip(order, order[1:]):
+        needed = [a_bottom + b_top + MIN_GAP
+                  for a_left, a_right, a_bottom, _ in items[upper]
+                  for b_left, b_right, _, b_top in items[lower]
+                  if min(a_right, b_right) - max(a_left, b_left) > -MIN_GAP]
+        gaps.append(max(needed, default=0.0))
+    depths = solve_chain(np.array([-targets[rows[row][0]][1] for row in order]), np.array(gaps),
+                         np.array([len(rows[row]) for row in order], dtype=float))
+    ys = -depths
+    low = min(y - bottom for row, y in zip(order, ys) for _, _, bottom, _ in items[row])
+    high = max(y + top for row, y in zip(order, ys) for _, _, _, top in items[row])
+    factor = min(factor, 2 * half_height / max(high - low, 1e-9))
+    ys += _into(low, high, half_height)
+    for row, y in zip(order, ys):
+        for index in rows[row]:
+            solved[index][1] = y
+    
+    # Write back: free elements, then children by their offset from their parent
+    moves = {index: solved[index] - centres[index] for index in free}
+    for index in parents:
+        root = index
+        while root in parents:
+            root = parents[root]
+        moves[index] = moves[root]
+    for index, move in moves.items():
+        position = elements[index].position
+        position["x"] = round(float(centres[index][0] + move[0]) / g.scale, 2)
+        position["y"] = round(float(centres[index][1] + move[1]) / g.scale, 2)
+    
+    # Arrows run between the facing edges of the elements they connect; arrows
+    # joining the same pair are spread apart so their labels do not collide
+    offsets = _parallel_offsets(links, extents, g)
+    for index, source, target, start, end, _ in links:
+        if source is not None and target is not None and source != target:
+            a, b = centres[source] + moves[source], centres[target] + moves[target]
+            normal = np.array([a[1] - b[1], b[0] - a[0]]) / np.hypot(*(b - a))
+            a, b = a + normal * offsets.get(index, 0.0), b + normal * offsets.get(index, 0.0)
+            start = _edge_point(elements[source], a, b, extents[source], g)
+            end = _edge_point(elements[target], b, a, extents[target], g)
+        elif source is not None:
+            # Keep the loose end where it was relative to the element; the other end on its edge
+            start, end = start + moves[source], end + moves[source]
+            if source != target:
+                start = _edge_point(elements[source], centres[source] + moves[source], end, extents[source], g)
+        elif target is not None:
+            start, end = start + moves[target], end + moves[target]
+            end = _edge_point(elements[target], centres[target] + moves[target], start, extents[target], g)
+        position = elements[index].position
+        position["x_start"], position["y_start"] = (round(float(v) / g.scale, 2) for v in start)
+        position["x_end"], position["y_end"] = (round(float(v) / g.scale, 2) for v in end)
+    return factor
+
+
+def _joined_pairs(links, g: LayoutGeometry) -> Dict[frozenset, float]:
+    """Gap needed between each pair of elements joined by an arrow (the arrow plus its label)."""
+    joined = {}
+    for _, source, target, _, _, label in links:
+        if source is None or target is None or source == target:
+            continue
+        needed = ARROW_MIN_LENGTH + 2 * g.arrow_buff
+        if label:
+            needed = max(needed, label[0] + 2 * g.label_pad + MIN_GAP)
+        key = frozenset((source, target))
+        joined[key] = max(joined.get(key, 0), needed)
+    return joined
+
+
+def _arrow_labels(links, rows: Dict[int, List[int]], solved: Dict[int, np.ndarray], g: LayoutGeometry):
+    """(row, (left, right, top)) for labels of arrows between elements of the same row."""
+    row_of = {index: row for row, members in rows.items() for index in members}
+    for _, source, target, _, _, label in links:
+        if not label or source == target or source not in row_of or row_of.get(source) != row_of.get(target):
+            continue
+        middle = (solved[source][0] + solved[target][0]) / 2
+        half = label[0] / 2 + g.label_pad
+        yield row_of[source], (middle - half, middle + half, ARROW_TIP + g.arrow_label_buff + label[1] + 2 * g.label_pad)
+
+
+def _parallel_offsets(links, extents: Dict[int, np.ndarray], g: LayoutGeometry) -> Dict[int, float]:
+    """Sideways offset of each arrow sharing its pair of elements with other arrows."""
+    pairs = {}
+    for index, source, target, _, _, label in links:
+        if source is not None and target is not None and source != target:
+            pairs.setdefault(frozenset((source, target)), []).append((index, label))
+    offsets = {}
+    for pair, arrows in pairs.items():
+        if len(arrows) < 2:
+            continue
+        # Room for a label (above its arrow) between neighbouring arrows, within the smaller element
+        label_height = max((label[1] for _, label in arrows if label), default=0.0)
+        spacing = 2 * ARROW_TIP + g.arrow_label_buff + label_height + 2 * g.label_pad
+        room = min(min(extents[node][2], extents[node][3]) for node in pair) * 2 * 0.8
+        spacing = min(spacing, room / (len(arrows) - 1))
+        for position, (index, _) in enumerate(arrows):
+            offsets[index] = (position - (len(arrows) - 1) / 2) * spacing
+    return offsets
+
+
+def _attach(point: np.ndarray, shapes: Dict[int, np.ndarray]) -> Optional[int]:
+    """The shape nearest the point (smallest first on ties), if within ATTACH_DISTANCE."""
+    best, best_key = None, None
+    for index, box in shapes.items():
+        distance = np.hypot(*np.maximum(np.maximum(box[:2] - point, point - box[2:]), 0))
+        key = (round(float(distance), 6), round(_area(box), 6), index)
+        if distance <= ATTACH_DISTANCE and (best_key is None or key < best_key):
+            best, best_key = index, key
+    return best
+
+
+def _edge_point(elem, centre: np.ndarray, toward: np.ndarray, extent: np.ndarray, g: LayoutGeometry) -> np.ndarray:
+    """Where the line from centre toward another element leaves it (its label included)."""
+    direction = toward - centre
+    if not direction.any():
+        return centre
+    radius = elem.size.get("radius", 0.5) * g.scale
+    if elem.element_type == "circle" and extent.max() <= radius + 1e-6:
+        return centre + direction / np.hypot(*direction) * radius
+    # Distance to the extents box side the line heads for (left/right, bottom/top)
+    reach = np.where(direction < 0, extent[[0, 2]], extent[[1, 3]])
+    with np.errstate(divide="ignore"):
+        t = np.min(np.where(direction != 0, reach / np.abs(direction), np.inf))
+    return centre + direction * t
+
+
+def _into(low: float, high: float, half: float) -> float:
+    """Shift moving [low, high] inside [-half, half] (centring it when it is too wide)."""
+    if high - low > 2 * half:
+        return -(low + high) / 2
+    return float(np.clip(0.0, -half - low, half - high))
+
+
+def _contains(outer: np.ndarray, inner: np.ndarray) -> bool:
+    return bool(np.all(outer[:2] <= inner[:2]) and np.all(outer[2:] >= inner[2:]))
+
+
+def _area(box: np.ndarray) -> float:
+    return float((box[2] - box[0]) * (box[3] - box[1]))
+
+
+def _scale_sizes(scene_bp: SceneBlueprint, factor: float):
+    for elem in scene_bp.elements:
+        if elem.element_type == "text":
+            elem.size["font_size"] = round(float(elem.size.get("font_size", 36) * factor), 1)
+            continue
+        for key in ("width", "height", "radius"):
+            if key in elem.size:
+                elem.size[key] = round(float(elem.size[key] * factor), 2)
@@ -0,0 +1,251 @@
+"""
+Persistent on-disk cache for LLM chat completions.
+Responses are stored in SQLite keyed on the full request (model, messages,
+temperature, response format), with TTL and size limits.
+"""
+import os
+import json
+import time
+import sqlite3
+import queue
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from config import Config
+from clients import budget
+from instrumentation import in_context, span
+
+# Marks the end of a streamed response on the reader's queue
+_END = object()
+
+
+class LLMCache:
+    """SQLite-backed cache for chat completion responses."""
+    
+    MODES = ("readwrite", "readonly", "off")
+    
+    def __init__(self, path: str = None, ttl_hours: float = None,
+                 max_entries: int = None, mode: str = None):
+        """
+        Initialize the cache.
+        
+        Args:
+            path: SQLite database file (default: Config.LLM_CACHE_PATH)
+            ttl_hours: Entries older than this are treated as misses
+            max_entries: Least-recently-used entries beyond this are deleted
+            mode: "readwrite", "readonly" (serve hits, never store) or "off"
+        """
+        self.path = path or Config.LLM_CACHE_PATH
+        self.ttl_seconds = (ttl_hours or Config.LLM_CACHE_TTL_HOURS) * 3600
+        self.max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self.mode = mode or Config.LLM_CACHE_MODE
+        if self.mode not in self.MODES:
+            raise ValueError(f"LLM cache mode must be one of {self.MODES}, got '{self.mode}'")
+        
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+        
+        if self.mode != "off":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    """CREATE TABLE IF NOT EXISTS responses (
+                        key TEXT PRIMARY KEY,
+                        model TEXT,
+                        content TEXT NOT NULL,
+                        latency REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_used REAL NOT NULL
+                    )"""
+                )
+    
+    def complete(self, client, label: str = "llm", scene: int = None, attempt: int = 0, **request) -> str:
+        """
+        Return the completion text for a request, calling the API only on a miss.
+        
+        Args:
+            client: OpenAI-compatible client
+            label, scene, attempt: How the call is reported in the run's instrumentation
+            **request: Keyword arguments for client.chat.completions.create
+        """
+        with span(label, "llm", scene=scene, model=request.get("model"), retries=1 if attempt else 0) as call:
+            key = self.make_key(request)
+            content = self.get(key)
+            if content is not None:
+                call.set(cached=True)
+                return content
+            
+            start = time.perf_counter()
+            with budget("llm"):
+                response = client.chat.completions.create(**request)
+            latency = time.perf_counter() - start
+            _count_tokens(call, getattr(response, "usage", None))
+            
+            content = response.choices[0].message.content
+            self.put(key, request.get("model"), content, latency)
+            return content
+    
+    def stream(self, client, label: str = "llm", scene: int = None, attempt: int = 0, **request) -> Iterator[str]:
+        """
+        Yield the completion text as it streams in, calling the API only on a miss.
+        
+        A cached response is replayed as a single chunk. A fresh one is read on
+        a worker thread that holds the "llm" budget slot only until the API
+        has finished sending, so a caller that pauses between chunks (e.g. to
+        wait for narration) never keeps other LLM calls waiting. It is stored
+        only if the caller consumes the whole stream.
+        
+        Args:
+            client: OpenAI-compatible client
+            label, scene, attempt: How the call is reported in the run's instrumentation
+            **request: Keyword arguments for client.chat.completions.create
+        """
+        with span(label, "llm", scene=scene, model=request.get("model"), retries=1 if attempt else 0) as call:
+            key = self.make_key(request)
+            content = self.get(key)
+            if content is not None:
+                call.set(cached=True)
+                yield content
+                return
+            
+            chunks = queue.Queue()
+            abandoned = threading.Event()
+            latency = []
+            
+            def read():
+                """Read the whole response under the LLM budget, however slowly it is consumed."""
+                try:
+                    start = time.perf_counter()
+                    with budget("llm"):
+                        for event in client.chat.completions.create(stream=True, **request):
+                            if abandoned.is_set():
+                                break
+                            # Providers that report usage send it with the final event
+                            _count_tokens(call, getattr(event, "usage", None))
+                            if event.choices and event.choices[0].delta.content:
+                                chunks.put(event.choices[0].delta.content)
+                    latency.append(time.perf_counter() - start)
+                    chunks.put(_END)
+                except Exception as e:
+                    chunks.put(e)
+            
+            # The slot belongs to the request, not to whatever the caller does between
+            # chunks (e.g. waiting for narration), so it is released when the API is done
+            threading.Thread(target=in_context(read), name="llm-stream", daemon=True).start()
+            parts = []
+            try:
+                while True:
+                    item = chunks.get()
+                    if item is _END:
+                        break
+                    if isinstance(item, Exception):
+                        raise item
+                    parts.append(item)
+                    yield item
+            finally:
+                abandoned.set()
+            
+            self.put(key, request.get("model"), "".join(parts), latency[0])
+    
+    def make_key(self, request: dict) -> str:
+        """Hash the parts of a request that determine the response."""
+        keyed = {
+            "model": request.get("model"),
+            "messages": request.get("messages"),
+            "temperature": request.get("temperature"),
+            "response_format": request.get("response_format"),
+            "max_tokens": request.get("max_tokens"),
+        }
+        payload = json.dumps(keyed, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Look up a cached response, counting the hit or miss."""
+        row = None
+        if self.mode != "off":
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT content, latency, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row and time.time() - row[2] > self.ttl_seconds:
+                    if self.mode == "readwrite":
+                        conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    row = None
+                elif row and self.mode == "readwrite":
+                    conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+        
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_seconds += row[1]
+        return row[0]
+    
+    def put(self, key: str, model: str, content: str, latency: float):
+        """Store a response (no-op unless the cache is read-write)."""
+        if self.mode != "readwrite":
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, content, latency, now, now)
+            )
+            conn.execute(
+                """DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )""",
+                (self.max_entries,)
+            )
+    
+    def discard(self, **request):
+        """Drop a cached response, e.g. one that failed validation."""
+        if self.mode != "readwrite":
+            return
+        with self._connect() as conn:
+            conn.execute("DELETE FROM responses WHERE key = ?", (self.make_key(request),))
+    
+    def stats(self) -> dict:
+        """Hit/miss counts and API latency avoided so far."""
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "hits": self.hits,
+                "misses": self.misses,
+                "saved_seconds": round(self.saved_seconds, 2)
+            }
+    
+    @contextmanager
+    def _connect(self):
+        # One connection per operation keeps the cache safe to share across threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+
+def _count_tokens(call, usage):
+    """Add a response's token usage (if the provider reported it) to its span."""
+    if usage is not None:
+        call.add("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+        call.add("completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+
+
+_shared_lock = threading.Lock()
+_shared_cache = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Process-wide cache shared by the script and blueprint generators."""
+    global _shared_cache
+    # Batch pipelines are created concurrently and must share one instance
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCache()
+        return _shared_cache
@@ -2,9 +2,15 @@
 Command-line interface for the video generation system.
 """
 import argparse
+import os
 import sys
 from pipeline import VideoPipeline
 from config import Config
+from render_styles import STYLES
+from render_presets import PRESETS
+from video_assembler import FIT_MODES, assemble_results
+from batch_runner import BatchRunner, read_topics_file
+from preview import preview_blueprint
 
 
 def main():
@@ -17,16 +23,45 @@ Examples:
   python main.py --topic "How DNS works"
   python main.py --topic "How HTTPS works" --output my_video
   python main.py --topic "How WebSockets work" --openai-tts
+  python main.py --topic "How DNS works" --style ultimate
+  python main.py --topic "How DNS works" --style ultimate --resume
+  python main.py --topic "How DNS works" --style ultimate --preset production
+  python main.py --topic "How DNS works" --style fixed --preview
+  python main.py preview output/how_dns_works_video_blueprint.json --style perfect
+  python main.py --topics-file syllabus.txt --batch-workers 3
+  python main.py assemble output/how_dns_works_video_results.json --style ultimate
         """
     )
     
     parser.add_argument(
         "--topic",
         type=str,
-        required=True,
+        default=None,
         help="The topic to create a video about"
     )
     
+    parser.add_argument(
+        "--topics-file",
+        type=str,
+        default=None,
+        help="Generate every topic in this file (one per line, # for comments). "
+             "Finished topics are recorded in a manifest and skipped when the batch is rerun"
+    )
+    
+    parser.add_argument(
+        "--batch-workers",
+        type=int,
+        default=None,
+        help="Topics generated at the same time in batch mode. Default: BATCH_WORKERS or 2"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        default=None,
+        help="Batch progress manifest. Default: output/<topics file name>_manifest.json"
+    )
+    
     parser.add_argument(
         "--output",
         type=str,
@@ -34,14 +69,142 @@ Examples:
         help="Output filename (without extension). Default: auto-generated from topic"
     )
     
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse the script, narration, blueprint, scenes and video of an earlier run with the same "
+             "output name wherever their inputs are unchanged (checked against its _results.json)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write a Chrome trace (output/<name>_trace.json) of every stage, LLM call, TTS request, "
+             "render and encode. Default: PIPELINE_TRACE"
+    )
+    
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="Only generate the script and blueprint, render each scene's last frame and write "
+             "output/<name>_contact_sheet.png (no narration or video). A later --resume run reuses them"
+    )
+    
     parser.add_argument(
         "--openai-tts",
         action="store_true",
         help="Use OpenAI TTS for narration (requires API key). Default: use free gTTS"
     )
     
+    parser.add_argument(
+        "--blueprint-mode",
+        choices=["video", "scene"],
+        default=None,
+        help="'video': one streamed LLM request for the whole blueprint. 'scene': one request per scene, "
+             "generated in parallel. Scenes are rendered as each arrives. Default: BLUEPRINT_MODE or 'video'"
+    )
+    
+    parser.add_argument(
+        "--style",
+        choices=list(STYLES),
+        default=None,
+        help="Render with Manim in this style: " + "; ".join(f"{s.name}: {s.description}" for s in STYLES.values())
+             + ". Default: simple image-based renderer"
+    )
+    
+    parser.add_argument(
+        "--preset",
+        choices=list(PRESETS),
+        default=None,
+        help="Resolution, frame rate and encoder settings for every renderer: "
+             + "; ".join(f"{p.name}: {p.description}" for p in PRESETS.values())
+             + ". Default: RENDER_PRESET, else 'production' for the simple renderer and 'draft' for Manim styles"
+    )
+    
+    subparsers = parser.add_subparsers(dest="command")
+    assemble = subparsers.add_parser(
+        "assemble",
+        help="Re-assemble the final video of an earlier run from its results JSON"
+    )
+    assemble.add_argument("results", help="Results JSON written by a run, e.g. output/<name>_results.json")
+    assemble.add_argument(
+        "--style",
+        choices=list(STYLES),
+        default=None,
+        help="Use this style's rendered scenes. Default: the run's own scene files"
+    )
+    assemble.add_argument("--audio-dir", default=None, help="Narration directory. Default: the run's audio files")
+    assemble.add_argument("--output", default=None, help="Final video path. Default: the run's video (or <run>_<style>.mp4)")
+    assemble.add_argument(
+        "--fit",
+        choices=list(FIT_MODES),
+        default="freeze",
+        help="When narration outlasts a scene: hold the last frame, loop the scene, or keep the scene length"
+    )
+    assemble.add_argument(
+        "--render-missing",
+        action="store_true",
+        help="Render scenes without a video from the blueprint (requires --style and Manim)"
+    )
+    assemble.add_argument(
+        "--preset",
+        choices=list(PRESETS),
+        default=None,
+        help="Render preset for scenes that are rendered or encoded here. Default: RENDER_PRESET, else the renderer's own"
+    )
+    
+    preview = subparsers.add_parser(
+        "preview",
+        help="Render the last frame of every scene of a saved blueprint into a contact sheet"
+    )
+    preview.add_argument("blueprint", help="Blueprint JSON, e.g. output/<name>_blueprint.json")
+    preview.add_argument(
+        "--style",
+        choices=list(STYLES),
+        default=None,
+        help="Render the stills with Manim in this style. Default: simple image-based renderer"
+    )
+    preview.add_argument(
+        "--preset",
+        choices=list(PRESETS),
+        default=None,
+        help="Render preset for the stills. Default: RENDER_PRESET, else the renderer's own"
+    )
+    preview.add_argument("--output", default=None, help="Contact sheet path. Default: <name>_contact_sheet.png")
+    
     args = parser.parse_args()
     
+    if args.command == "preview":
+        result = preview_blueprint(args.blueprint, style=args.style, preset=args.preset, output_path=args.output)
+        if not result["contact_sheet"]:
+            print("\n[ERROR] No scene could be previewed")
+            sys.exit(1)
+        print(f"\n[DONE] Contact sheet: {result['contact_sheet']}")
+        return
+    
+    if args.command == "assemble":
+        try:
+            output_path = assemble_results(
+                args.results, style=args.style, audio_dir=args.audio_dir,
+                output_path=args.output, fit=args.fit, render_missing=args.render_missing,
+                preset=args.preset
+            )
+        except ValueError as e:
+            print(f"\n[ERROR] {e}")
+            sys.exit(1)
+        if not output_path:
+            print("\n[ERROR] No scenes could be assembled")
+            sys.exit(1)
+        print(f"\n[DONE] Assembled video: {output_path}")
+        return
+    
+    if not args.topic and not args.topics_file:
+        parser.error("--topic or --topics-file is required")
+    if args.topics_file and (args.topic or args.output):
+        parser.error("--topics-file cannot be combined with --topic or --output")
+    if args.topics_file and args.preview:
+        parser.error("--preview works on a single --topic")
+    
     # Validate configuration
     try:
         Config.validate()
@@ -51,12 +214,46 @@ Examples:
         print("  OPENAI_API_KEY=your_key_here")
         sys.exit(1)
     
+    if args.topics_file:
+        topics = read_topics_file(args.topics_file)
+        if not topics:
+            print(f"[ERROR] No topics found in {args.topics_file}")
+            sys.exit(1)
+        manifest_name = os.path.splitext(os.path.basename(args.topics_file))[0]
+        runner = BatchRunner(
+            manifest_path=args.manifest or os.path.join(Config.OUTPUT_DIR, f"{manifest_name}_manifest.json"),
+            max_workers=args.batch_workers,
+            trace=args.trace or None,
+            use_openai_tts=args.openai_tts,
+            blueprint_mode=args.blueprint_mode,
+            style=args.style,
+            preset=args.preset
+        )
+        records = runner.run(topics)
+        if any(record.status != "done" for record in records):
+            print("\n[ERROR] Some topics failed; rerun the same command to retry them")
+            sys.exit(1)
+        print("\n[DONE] Success! All videos have been generated.")
+        return
+    
     # Create pipeline
-    pipeline = VideoPipeline(use_openai_tts=args.openai_tts)
+    pipeline = VideoPipeline(use_openai_tts=args.openai_tts, blueprint_mode=args.blueprint_mode, style=args.style,
+                             preset=args.preset)
+    
+    if args.preview:
+        try:
+            results = pipeline.generate_preview(args.topic, args.output, resume=args.resume)
+        except Exception as e:
+            print(f"\n[ERROR] Error: {e}")
+            sys.exit(1)
+        if not results["contact_sheet"]:
+            sys.exit(1)
+        print(f"\n[DONE] Contact sheet: {results['contact_sheet']}")
+        return
     
     # Generate video
     try:
-        results = pipeline.generate_video(args.topic, args.output)
+        results = pipeline.generate_video(args.topic, args.output, resume=args.resume, trace=args.trace or None)
         print("\n[DONE] Success! Your video has been generated.")
         print(f"\n[FOLDER] Output location: {results['video']}")
     except Exception as e:
@@ -0,0 +1,224 @@
+"""
+Manim rendering engine shared by every visual style.
+Scenes are prepared from blueprints, rendered in parallel through the
+RenderScheduler (caching, CLI or warm-worker backends) and combined into
+the final video. The look is picked by name from render_styles.
+"""
+import os
+import json
+from typing import Dict, Iterable, List, Optional, Tuple
+from models_schemas import VideoBlueprint, SceneBlueprint
+from config import Config
+from render_scheduler import RenderScheduler, RenderJob
+from render_styles import get_style, style_fingerprint
+from video_assembler import VideoAssembler, AssemblyScene, narration_durations
+from ffmpeg_tools import concat_copy
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Script rendered by the manim CLI backend; all drawing code lives in scene_styles.py
+SCENE_STUB = '''"""Generated by manim_engine.py: scene {scene_number} in the "{style}" style."""
+import sys
+sys.path.insert(0, {repo_dir!r})
+from scene_styles import StyledScene
+
+
+class {scene_class}(StyledScene):
+    style_name = {style!r}
+    scene_json = {scene_json!r}
+'''
+
+
+class ManimEngine:
+    """Renders blueprints into animated scene videos in any registered style."""
+    
+    def __init__(self, style: str = "default", max_workers: int = None, backend: str = None,
+                 preset: str = None):
+        """
+        Initialize the engine.
+        
+        Args:
+            style: Registered style name (see render_styles.STYLES)
+            max_workers: Maximum scenes rendered in parallel (default: Config.RENDER_WORKERS)
+            backend: "cli" or "direct" (default: Config.RENDER_BACKEND)
+            preset: Render preset name (default: Config.RENDER_PRESET)
+        """
+        self.style = get_style(style)
+        self.output_dir = Config.OUTPUT_DIR
+        self.temp_dir = Config.TEMP_DIR
+        self.scheduler = RenderScheduler(max_workers=max_workers, backend=backend, preset=preset)
+        self.render_results = []
+    
+    def render_signature(self) -> dict:
+        """Settings that change the rendered output (used to validate resumed runs)."""
+        return {
+            "renderer": "manim",
+            "style": self.style.name,
+            "style_code": style_fingerprint(self.style.name),
+            "backend": self.scheduler.backend,
+            "preset": self.scheduler.preset.model_dump()
+        }
+    
+    def generate(self, blueprint: VideoBlueprint, output_path: str = None, audio_dir: str = None) -> List[str]:
+        """
+        Render every scene of a blueprint in parallel.
+        
+        Args:
+            blueprint: The animation blueprint
+            output_path: If given, the scenes are also combined into this video
+            audio_dir: Directory with scene narration. Each scene is then rendered
+                to its narration's length, so assembly only has to copy streams
+        
+        Returns:
+            Paths of the successfully rendered scene videos, in scene order
+        """
+        print(f"[VIDEO] Generating '{self.style.name}' video for: {blueprint.topic}")
+        print(f"  Style: {self.style.description}")
+        print(f"  Total scenes: {len(blueprint.scene_blueprints)}")
+        
+        durations = narration_durations({
+            scene_bp.scene_number: self.narration_path(audio_dir, scene_bp.scene_number)
+            for scene_bp in blueprint.scene_blueprints
+        }) if audio_dir else {}
+        
+        jobs = []
+        for scene_bp in blueprint.scene_blueprints:
+            try:
+                jobs.append(self.prepare_scene_job(scene_bp, target_duration=durations.get(scene_bp.scene_number)))
+            except Exception as e:
+                print(f"    [X] Error preparing scene {scene_bp.scene_number}: {e}")
+        
+        self.render_results = self.scheduler.run(jobs)
+        scene_files = [r.output_path for r in self.render_results if r.success]
+        print(f"\n[OK] Rendered {len(scene_files)} scenes")
+        
+        if output_path and scene_files:
+            if audio_dir:
+                self.compose_scenes(blueprint, scene_files, output_path, audio_dir)
+            else:
+                print(f"\n  Combining scenes into final video...")
+                self.combine_scenes(scene_files, output_path)
+        
+        return scene_files
+    
+    def render_previews(self, blueprint: VideoBlueprint) -> Dict[int, str]:
+        """
+        Render only the last frame of every scene, in parallel.
+        
+        Returns:
+            Scene number -> PNG path, in scene order (failed scenes are left out)
+        """
+        print(f"[PREVIEW] Rendering last frames in '{self.style.name}' style for: {blueprint.topic}")
+        jobs = [self.prepare_scene_job(scene_bp, still=True) for scene_bp in blueprint.scene_blueprints]
+        self.render_results = self.scheduler.run(jobs)
+        return {r.scene_number: r.output_path for r in self.render_results if r.success}
+    
+    def render_scene_stream(self, scene_blueprints: Iterable[SceneBlueprint]) -> Tuple[List[SceneBlueprint], List[str]]:
+        """
+        Render scene blueprints as they arrive (e.g. from a streaming generator).
+        
+        Returns:
+            (scene blueprints, rendered scene video paths), both in scene order
+        """
+        print(f"[VIDEO] Rendering scenes in '{self.style.name}' style as their blueprints arrive")
+        scene_bps = []
+        
+        def jobs():
+            for scene_bp in scene_blueprints:
+                scene_bps.append(scene_bp)
+                yield self.prepare_scene_job(scene_bp)
+        
+        self.render_results = self.scheduler.run_stream(jobs())
+        scene_bps.sort(key=lambda bp: bp.scene_number)
+        return scene_bps, [r.output_path for r in self.render_results if r.success]
+    
+    def prepare_scene_job(self, scene_bp: SceneBlueprint, topic: str = None,
+                          target_duration: float = None, still: bool = False) -> RenderJob:
+        """
+        Describe how to render a scene, writing its CLI script if that backend is used.
+        
+        Args:
+            scene_bp: The scene blueprint
+            topic: Unused, kept for the older generator signatures
+            target_duration: Hold the last frame until this length (e.g. the
+                narration's) instead of the blueprint duration
+            still: Render only the scene's last frame, to a PNG
+        """
+        scene_data = scene_bp.model_dump()
+        if target_duration:
+            scene_data["duration"] = target_duration
+        
+        script_path = ""
+        if self.scheduler.backend == "cli":
+            script_path = os.path.join(
+                self.output_dir, f"manim_scene_{scene_bp.scene_number}{self.style.suffix}.py"
+            )
+            with open(script_path, 'w', encoding='utf-8') as f:
+                f.write(SCENE_STUB.format(
+                    scene_number=scene_bp.scene_number,
+                    style=self.style.name,
+                    repo_dir=REPO_DIR,
+                    scene_class=self.style.scene_class,
+                    scene_json=json.dumps(scene_data, ensure_ascii=False)
+                ))
+        
+        return RenderJob(
+            scene_number=scene_bp.scene_number,
+            script_path=script_path,
+            scene_class=self.style.scene_class,
+            style=self.style.name,
+            output_path=self.still_output_path(scene_bp.scene_number) if still
+            else self.scene_output_path(scene_bp.scene_number),
+            scene_blueprint=scene_data,
+            still=still
+        )
+    
+    def render_scene(self, scene_bp: SceneBlueprint, topic: str = None) -> Optional[str]:
+        """Render a single scene, returning its video path (None on failure)."""
+        result = self.scheduler.render(self.prepare_scene_job(scene_bp, topic))
+        if not result.success:
+            print(f"    {result.error}")
+            return None
+        return result.output_path
+    
+    def scene_output_path(self, scene_number: int) -> str:
+        return os.path.join(self.output_dir, f"scene_{scene_number}{self.style.suffix}.mp4")
+    
+    def still_output_path(self, scene_number: int) -> str:
+        return os.path.join(self.output_dir, f"scene_{scene_number}{self.style.suffix}_last.png")
+    
+    @staticmethod
+    def narration_path(audio_dir: str, scene_number: int) -> str:
+        return os.path.join(audio_dir, f"scene_{scene_number}_narration.mp3")
+    
+    def compose_scenes(self, blueprint: VideoBlueprint, scene_files: list, output_path: str,
+                       audio_dir: str = None):
+        """Combine rendered scenes with their narration into the final video."""
+        print(f"\n  Composing final video...")
+        scenes = []
+        for scene_bp in blueprint.scene_blueprints:
+            video_path = self.scene_output_path(scene_bp.scene_number)
+            if video_path not in scene_files:
+                continue
+            audio_path = self.narration_path(audio_dir, scene_bp.scene_number) if audio_dir else None
+            scenes.append(AssemblyScene(scene_number=scene_bp.scene_number, video=video_path, audio=audio_path))
+        
+        try:
+            # Holds the last frame until each scene's narration finishes
+            if VideoAssembler(fit="freeze", temp_dir=self.temp_dir).assemble(scenes, output_path):
+                print(f"[OK] Video generation complete")
+                print(f"  Output: {output_path}")
+            else:
+                print(f"[X] No scenes could be composed")
+        except Exception as e:
+            print(f"[X] Error composing video: {e}")
+            print(f"  Scene videos saved in: {self.output_dir}")
+    
+    def combine_scenes(self, scene_files: list, output_path: str):
+        """Combine multiple scene videos into one."""
+        try:
+            concat_copy(scene_files, output_path, os.path.join(self.output_dir, "concat_list.txt"))
+            print(f"  [OK] Combined video: {output_path}")
+        except Exception as e:
+            print(f"  [WARN] Scene combination failed: {e}")
+            print(f"  Individual scene files are available")
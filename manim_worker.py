@@ -0,0 +1,132 @@
+"""
+Long-lived Manim render workers.
+Each worker process imports Manim once, then renders any number of scenes
+straight from their blueprints: no generated source files, no interpreter
+start-up and no Manim import per scene.
+"""
+import shutil
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from config import Config
+
+
+def _warm_up():
+    """Worker initializer: pay the Manim import once per process."""
+    try:
+        import scene_styles  # noqa: F401
+    except ImportError:
+        # A failing initializer breaks the whole pool; let render_blueprint
+        # raise the ImportError for the scene instead
+        pass
+
+
+def render_blueprint(scene_data: dict, style: str, output_path: str, media_dir: str,
+                     video_config: dict, still: bool = False) -> str:
+    """
+    Render one scene inside a worker process.
+    
+    Args:
+        scene_data: SceneBlueprint as a dict (plain data crosses process boundaries)
+        style: Registered render style name
+        output_path: Where to copy the finished MP4
+        media_dir: Manim media directory for this scene only
+        video_config: Resolution and frame rate as Manim config options
+            (RenderPreset.manim_config())
+        still: Save only the last frame as a PNG instead of writing the movie
+    
+    Returns:
+        output_path
+    """
+    from manim import tempconfig
+    from scene_styles import StyledScene
+    
+    options = {
+        "media_dir": media_dir,
+        **video_config,
+        "format": "png" if still else "mp4",
+        "disable_caching": True,
+        "write_to_movie": not still,
+        "save_last_frame": still,
+        "progress_bar": "none",
+        "verbosity": "WARNING",
+        "output_file": f"scene_{scene_data['scene_number']}",
+    }
+    # tempconfig restores Manim's global config, so the next scene starts clean
+    with tempconfig(options):
+        scene = StyledScene(style, scene_data)
+        scene.render()
+        writer = scene.renderer.file_writer
+        rendered_path = str(writer.image_file_path if still else writer.movie_file_path)
+    
+    shutil.copy(rendered_path, output_path)
+    return output_path
+
+
+class RenderWorkerPool:
+    """Pool of warm Manim processes, started on first use."""
+    
+    def __init__(self, max_workers: int = None):
+        """
+        Initialize the pool.
+        
+        Args:
+            max_workers: Number of worker processes (default: Config.RENDER_WORKERS)
+        """
+        self.max_workers = max(1, max_workers or Config.RENDER_WORKERS)
+        self._pool = None
+        self._lock = threading.Lock()
+        # Pools stopped because a render on them timed out
+        self._terminated = weakref.WeakSet()
+    
+    def render(self, scene_data: dict, style: str, output_path: str, media_dir: str,
+               video_config: dict, still: bool = False, timeout: float = None) -> str:
+        """Render a scene on a worker, blocking until it finishes."""
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_up)
+            pool = self._pool
+        
+        future = pool.submit(render_blueprint, scene_data, style, output_path, media_dir, video_config, still)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            if not future.cancel():
+                # Already running: stop it, so it cannot write output_path after the
+                # timeout is reported or hold a worker that later scenes queue behind
+                self._recycle(pool, terminate=True)
+            raise
+        except BrokenProcessPool:
+            if pool in self._terminated:
+                # Stopped for another scene's timeout, not this one: render on fresh workers
+                return self.render(scene_data, style, output_path, media_dir, video_config, still, timeout)
+            # A worker died (e.g. a Cairo crash); start fresh workers next time
+            self._recycle(pool)
+            raise
+    
+    def _recycle(self, pool: ProcessPoolExecutor, terminate: bool = False):
+        """Stop handing out a pool; with terminate, also kill its workers mid-render."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        if terminate:
+            self._terminated.add(pool)
+            # ProcessPoolExecutor has no public way to kill a running task (before 3.14)
+            for process in list((pool._processes or {}).values()):
+                process.terminate()
+        pool.shutdown(wait=False)
+    
+    def shutdown(self):
+        """Stop the worker processes."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+
+@lru_cache(maxsize=1)
+def get_worker_pool() -> RenderWorkerPool:
+    """Process-wide pool, so warm workers are reused across scenes and videos."""
+    return RenderWorkerPool()
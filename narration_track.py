@@ -0,0 +1,82 @@
+"""
+One continuous narration track for the final video.
+Every scene's narration is decoded, padded with silence (or cut) to the
+length of its video segment, joined, loudness-normalized and encoded to AAC
+in a single ffmpeg filter graph. The assemblers mux the finished track with
+stream copy, so no MP3 is decoded more than once and no scene gets its own
+AAC encode.
+"""
+import os
+from typing import List, Optional
+from pydantic import BaseModel
+from config import Config
+from ffmpeg_tools import run_ffmpeg
+from instrumentation import span
+
+SAMPLE_RATE = 44100
+# EBU R128 targets for speech: integrated loudness, true peak and loudness range
+LOUDNORM = "loudnorm=I=-16:TP=-1.5:LRA=11"
+
+
+class TrackPart(BaseModel):
+    """A stretch of the narration track: one scene's narration, padded to its segment."""
+    scene_number: int
+    audio: Optional[str] = None     # Narration file (None = silence)
+    duration: float                 # Length of the scene's video segment
+
+
+def track_filter(parts: List[TrackPart], normalize: bool = None) -> tuple:
+    """
+    Build the ffmpeg inputs and filter graph for a narration track.
+    
+    Args:
+        parts: Track parts, in playback order
+        normalize: Apply loudness normalization (default: Config.NARRATION_LOUDNORM)
+    
+    Returns:
+        (input arguments, filter graph); the graph's output is labelled [narration]
+    """
+    normalize = Config.NARRATION_LOUDNORM if normalize is None else normalize
+    layout = f"aformat=sample_fmts=fltp:sample_rates={SAMPLE_RATE}:channel_layouts=stereo"
+    inputs = []
+    chains = []
+    for index, part in enumerate(parts):
+        if part.audio and os.path.exists(part.audio):
+            inputs += ["-i", part.audio]
+            source = f"[{len(inputs) // 2 - 1}:a]aresample={SAMPLE_RATE},{layout},apad"
+        else:
+            source = f"anullsrc=r={SAMPLE_RATE}:cl=stereo,{layout}"
+        # Cut to the segment's exact length, so the track stays in sync scene after scene
+        chains.append(f"{source},atrim=duration={part.duration:.3f}[p{index}]")
+    
+    joined = "".join(f"[p{index}]" for index in range(len(parts)))
+    output = f"{joined}concat=n={len(parts)}:v=0:a=1"
+    if normalize:
+        # loudnorm works at 192 kHz internally
+        output += f",{LOUDNORM},aresample={SAMPLE_RATE}"
+    return inputs, ";".join(chains + [f"{output}[narration]"])
+
+
+def build_narration_track(parts: List[TrackPart], output_path: str, normalize: bool = None) -> str:
+    """
+    Encode the narration of every scene into one AAC track in one ffmpeg pass.
+    
+    Args:
+        parts: Track parts, in playback order
+        output_path: The track (.m4a)
+        normalize: Apply loudness normalization (default: Config.NARRATION_LOUDNORM)
+    
+    Returns:
+        output_path
+    """
+    if not parts:
+        raise ValueError("No scenes to build a narration track from")
+    inputs, graph = track_filter(parts, normalize)
+    with span("narration_track", "assembly", scenes=len(parts)) as call:
+        run_ffmpeg(
+            *inputs, "-filter_complex", graph, "-map", "[narration]",
+            "-c:a", "aac", "-b:a", "192k", "-ar", str(SAMPLE_RATE), "-ac", "2",
+            output_path
+        )
+        call.add_file(output_path)
+    return output_path
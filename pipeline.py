@@ -3,82 +3,245 @@ Main pipeline orchestrating the entire video generation process.
 """
 import os
 import json
+from concurrent.futures import Future
 from pathlib import Path
+from typing import Dict, List
 from script_generator import ScriptGenerator
 from blueprint_generator import BlueprintGenerator
 from simple_video_generator import SimpleVideoGenerator
+from manim_engine import ManimEngine
 from audio_generator import AudioGenerator
 from config import Config
+from stage_executor import StageExecutor
+from models_schemas import SceneBlueprint
+from video_assembler import narration_durations
+from tts_chunks import WordTiming, load_word_timings, first_spoken
+from checkpoints import StageCheckpoints, file_hash, inputs_hash
+from instrumentation import RunRecorder
+from preview import render_preview
+from layout_check import check_scene
+from layout_solver import solve_blueprint_scenes
+from prompts import SCRIPT_GENERATION_PROMPT, BLUEPRINT_GENERATION_PROMPT, SCENE_BLUEPRINT_PROMPT
 
 
 class VideoPipeline:
     """Orchestrates the complete video generation workflow."""
     
-    def __init__(self, use_openai_tts: bool = False):
+    # Overridden by pipeline variants
+    title = "STARTING VIDEO GENERATION PIPELINE"
+    audio_step = "STEP 3: AUDIO NARRATION GENERATION"
+    audio_dir_suffix = "_audio"
+    
+    def __init__(self, use_openai_tts: bool = False, blueprint_mode: str = None, style: str = None,
+                 scene_dir: str = None, preset: str = None):
         """
         Initialize the pipeline.
         
         Args:
             use_openai_tts: Whether to use OpenAI TTS (True) or free gTTS (False)
+            blueprint_mode: "video" (one streamed LLM request) or "scene" (one request
+                per scene). Either way each scene is rendered as soon as its
+                blueprint arrives. Default: Config.BLUEPRINT_MODE
+            style: Manim render style (see render_styles). None uses the
+                simple image-based renderer
+            scene_dir: Where per-scene files and temporary segments go (default:
+                Config.OUTPUT_DIR). Pipelines running at the same time need their own
+            preset: Render preset: "draft", "preview" or "production" (see
+                render_presets). Default: Config.RENDER_PRESET
         """
         self.script_gen = ScriptGenerator()
         self.blueprint_gen = BlueprintGenerator()
-        self.video_gen = SimpleVideoGenerator()
+        self.style = style
+        self.video_gen = ManimEngine(style=style, preset=preset) if style else SimpleVideoGenerator(preset=preset)
         self.audio_gen = AudioGenerator(use_openai_tts=use_openai_tts)
+        self.blueprint_mode = blueprint_mode or Config.BLUEPRINT_MODE
+        if self.blueprint_mode not in ("video", "scene"):
+            raise ValueError(f"blueprint_mode must be 'video' or 'scene', got '{self.blueprint_mode}'")
+        
+        if scene_dir:
+            self.video_gen.output_dir = scene_dir
+            self.video_gen.temp_dir = os.path.join(scene_dir, "temp")
         
-        # Create output directory
+        # Create output directories
         Path(Config.OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
+        Path(self.video_gen.output_dir).mkdir(parents=True, exist_ok=True)
     
-    def generate_video(self, topic: str, output_filename: str = None) -> dict:
+    def generate_video(self, topic: str, output_filename: str = None, resume: bool = False,
+                       trace: bool = None) -> dict:
         """
         Generate a complete video from a topic.
         
         Args:
             topic: The topic to create a video about
             output_filename: Optional custom output filename
+            resume: Reuse the files of an earlier run with the same output filename
+                for every stage whose inputs are unchanged (checked against the
+                content hashes recorded in its _results.json)
+            trace: Also write a Chrome trace of every stage, LLM call, TTS request,
+                render and encode to <output>_trace.json (default: Config.PIPELINE_TRACE)
             
         Returns:
             Dictionary with paths to generated files
         """
         print("="*70)
-        print(f"[>>] STARTING VIDEO GENERATION PIPELINE")
+        print(f"[>>] {self.title}")
         print(f"[NOTE] Topic: {topic}")
         print("="*70)
         
-        # Sanitize topic for filename
-        safe_topic = topic.lower().replace(" ", "_").replace("/", "_")
         if not output_filename:
-            output_filename = f"{safe_topic}_video"
+            output_filename = self.output_name(topic)
         
-        # Step 1: Generate Script
-        print("\n" + "-"*70)
-        print("STEP 1: SCRIPT GENERATION")
-        print("-"*70)
-        script = self.script_gen.generate(topic)
         script_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_script.json")
-        self.script_gen.save_script(script, script_path)
-        
-        # Step 2: Generate Blueprint
-        print("\n" + "-"*70)
-        print("STEP 2: ANIMATION BLUEPRINT GENERATION")
-        print("-"*70)
-        blueprint = self.blueprint_gen.generate(script)
         blueprint_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_blueprint.json")
-        self.blueprint_gen.save_blueprint(blueprint, blueprint_path)
-        
-        # Step 3: Generate Audio
-        print("\n" + "-"*70)
-        print("STEP 3: AUDIO NARRATION GENERATION")
-        print("-"*70)
-        audio_dir = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_audio")
-        audio_files = self.audio_gen.generate_narration(script, audio_dir)
-        
-        # Step 4: Generate Video
-        print("\n" + "-"*70)
-        print("STEP 4: VIDEO ANIMATION GENERATION")
-        print("-"*70)
+        audio_dir = os.path.join(Config.OUTPUT_DIR, f"{output_filename}{self.audio_dir_suffix}")
         video_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}.mp4")
-        scene_files = self.video_gen.generate(blueprint, video_path)
+        results_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_results.json")
+        
+        # Each stage is recorded as it finishes, so even a failed run can be resumed
+        checkpoints = StageCheckpoints(results_path, topic, resume=resume)
+        
+        def script_stage():
+            print("\n" + "-"*70)
+            print("STEP 1: SCRIPT GENERATION")
+            print("-"*70)
+            inputs = self._script_inputs(topic)
+            if checkpoints.reuse("script", inputs):
+                return self.script_gen.load_script(script_path)
+            script = self.script_gen.generate(topic)
+            self.script_gen.save_script(script, script_path)
+            checkpoints.record("script", inputs, [script_path])
+            return script
+        
+        # Narration lengths and word timings, published by the audio stage for the renderer
+        narration = Future()
+        
+        def audio_stage(script):
+            print("\n" + "-"*70)
+            print(self.audio_step)
+            print("-"*70)
+            try:
+                inputs = inputs_hash(checkpoints.output_hashes("script"), self._audio_signature())
+                audio_files = checkpoints.reuse("audio", inputs)
+                if audio_files is None:
+                    audio_files = self.audio_gen.generate_narration(script, audio_dir)
+                    checkpoints.record("audio", inputs, audio_files)
+                audio_paths = {
+                    scene.scene_number: os.path.join(audio_dir, f"scene_{scene.scene_number}_narration.mp3")
+                    for scene in script.scenes
+                }
+                words = {number: load_word_timings(path) for number, path in audio_paths.items()}
+                narration.set_result((narration_durations(audio_paths),
+                                      {number: timings for number, timings in words.items() if timings}))
+            except BaseException as e:
+                narration.set_exception(e)
+                raise
+            return audio_files
+        
+        def timed(scene_stream):
+            """Give each scene its narration's exact length before it is rendered."""
+            durations = None
+            for scene_bp in scene_stream:
+                if durations is None:
+                    # TTS is usually done before the first blueprint scene streams in
+                    durations, words = narration.result()
+                if Config.WORD_TIMING and scene_bp.scene_number in words:
+                    self._apply_word_timing(scene_bp, words[scene_bp.scene_number])
+                self._apply_narration_timing(scene_bp, durations)
+                yield scene_bp
+        
+        # Filled in by saved() once the last scene blueprint has arrived
+        blueprints = []
+        # Layout problems the check could not fix, by scene number
+        layout_issues = {}
+        
+        def saved(script, scene_stream, inputs):
+            """Pass scenes through, saving the blueprint as soon as the last one arrives."""
+            scene_bps = []
+            for scene_bp in scene_stream:
+                scene_bps.append(scene_bp)
+                yield scene_bp
+            # Saved before rendering finishes, so a failed render does not cost the LLM calls
+            blueprint = self.blueprint_gen.build_video_blueprint(script, scene_bps)
+            self.blueprint_gen.save_blueprint(blueprint, blueprint_path)
+            checkpoints.record("blueprint", inputs, [blueprint_path])
+            blueprints.append(blueprint)
+        
+        def blueprint_render_stage(script):
+            print("\n" + "-"*70)
+            print("STEP 2+4: STREAMING SCENE BLUEPRINTS INTO THE RENDERER")
+            print("-"*70)
+            blueprint_inputs = self._blueprint_inputs(checkpoints)
+            reused = checkpoints.reuse("blueprint", blueprint_inputs)
+            if reused:
+                scene_stream = iter(self.blueprint_gen.load_blueprint(blueprint_path).scene_blueprints)
+            elif self.blueprint_mode == "scene":
+                scene_stream = self.blueprint_gen.iter_scene_blueprints(script)
+            else:
+                scene_stream = self.blueprint_gen.iter_blueprint_scenes(script)
+            if Config.NARRATION_TIMING:
+                scene_stream = timed(scene_stream)
+            scene_stream = saved(script, scene_stream, blueprint_inputs)
+            scene_stream = self._checked_layout(scene_stream, layout_issues)
+            
+            if reused:
+                # Re-timed to the current narration; if nothing changed the saved
+                # blueprint is identical and the earlier renders are reused too
+                scene_bps = list(scene_stream)
+                render_inputs = inputs_hash(checkpoints.output_hashes("blueprint"), self.video_gen.render_signature(),
+                                            self._layout_signature())
+                scene_files = checkpoints.reuse("render", render_inputs)
+                if scene_files is None:
+                    scene_bps, scene_files = self.video_gen.render_scene_stream(iter(scene_bps))
+            else:
+                scene_bps, scene_files = self.video_gen.render_scene_stream(scene_stream)
+                render_inputs = inputs_hash(checkpoints.output_hashes("blueprint"), self.video_gen.render_signature(),
+                                            self._layout_signature())
+            
+            # Only a complete set of scenes is worth resuming from
+            if len(scene_files) == len(scene_bps) and "render" not in checkpoints.reused:
+                checkpoints.record("render", render_inputs, scene_files)
+            return blueprints[0], scene_files
+        
+        def compose_stage(rendered, audio_files):
+            blueprint, scene_files = rendered
+            if not scene_files:
+                return video_path
+            inputs = inputs_hash(
+                [file_hash(path) for path in scene_files],
+                [file_hash(path) for path in audio_files],
+                self.video_gen.render_signature(), {"loudnorm": Config.NARRATION_LOUDNORM}
+            )
+            if checkpoints.reuse("compose", inputs):
+                return video_path
+            if os.path.exists(video_path):
+                os.remove(video_path)   # An older video must not pass for this run's
+            self.video_gen.compose_scenes(blueprint, scene_files, video_path, audio_dir)
+            if os.path.exists(video_path):
+                checkpoints.record("compose", inputs, [video_path])
+            return video_path
+        
+        # Audio only needs the script, so it overlaps blueprint generation; each
+        # scene waits for the measured narration lengths just before rendering
+        executor = StageExecutor()
+        executor.add("script", script_stage)
+        executor.add("audio", audio_stage, deps=["script"])
+        executor.add("blueprint_render", blueprint_render_stage, deps=["script"])
+        executor.add("compose", compose_stage, deps=["blueprint_render", "audio"])
+        recorder = RunRecorder(output_filename)
+        trace_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_trace.json")
+        if trace is None:
+            trace = Config.PIPELINE_TRACE
+        try:
+            with recorder.activate():
+                stage_results = executor.run()
+        finally:
+            # Written even when a stage fails, which is when it is most useful
+            if trace:
+                recorder.write_trace(trace_path)
+        
+        audio_files = stage_results["audio"]
+        blueprint, scene_files = stage_results["blueprint_render"]
+        timing = executor.report()
         
         # Summary
         print("\n" + "="*70)
@@ -91,22 +254,204 @@ class VideoPipeline:
             "blueprint": blueprint_path,
             "audio_files": audio_files,
             "video": video_path,
-            "scene_files": scene_files
+            "scene_files": scene_files,
+            "llm_cache": self.script_gen.cache.stats(),
+            "tts_cache": self.audio_gen.cache.stats() if getattr(self.audio_gen, "cache", None) else None,
+            "timing": timing,
+            "resumed_stages": checkpoints.reused,
+            "instrumentation": recorder.report(),
+            "trace": trace_path if trace else None,
+            "checkpoints": checkpoints.entries,
+            "layout_issues": layout_issues,
+            **self._extra_results()
         }
         
         # Save results summary
-        results_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_results.json")
         with open(results_path, 'w') as f:
             json.dump(results, f, indent=2)
         
         print(f"\n[STATS] Results Summary:")
         print(f"  Script: {script_path}")
         print(f"  Blueprint: {blueprint_path}")
-        print(f"  Audio files: {len(audio_files)}")
+        print(f"  Audio files: {len(audio_files)}{self._audio_note()}")
         print(f"  Video: {video_path}")
+        cache_stats = results["llm_cache"]
+        print(f"  LLM cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['saved_seconds']}s saved")
+        if results["tts_cache"]:
+            print(f"  TTS cache: {results['tts_cache']['hits']} hits, {results['tts_cache']['misses']} misses")
+        print(f"  Pipeline time: {timing['total_seconds']:.1f}s "
+              f"({timing['saved_seconds']:.1f}s saved by overlapping stages)")
+        print(f"  Critical path: {' -> '.join(timing['critical_path'])}")
+        if checkpoints.reused:
+            print(f"  Resumed (unchanged): {', '.join(checkpoints.reused)}")
+        if layout_issues:
+            count = sum(len(issues) for issues in layout_issues.values())
+            print(f"  Layout: {count} unresolved issues in scenes {', '.join(map(str, layout_issues))}")
+        usage = results["instrumentation"]
+        if usage["peak_rss_mb"] is not None:
+            print(f"  Peak memory: {usage['peak_rss_mb']:.0f} MB (subprocesses: {usage['children_peak_rss_mb']:.0f} MB)")
+        if trace:
+            print(f"  Trace: {trace_path}")
         print(f"  Full results: {results_path}")
         
         return results
+    
+    def generate_preview(self, topic: str, output_filename: str = None, resume: bool = False) -> dict:
+        """
+        Generate the script and blueprint, then render only each scene's last frame.
+        
+        No narration or video is produced; the stills are tiled into
+        <output>_contact_sheet.png for checking layout and overlap. The script
+        and blueprint are checkpointed as in generate_video, so a later full
+        run with resume=True reuses them.
+        
+        Args:
+            topic: The topic to preview
+            output_filename: Optional custom output filename
+            resume: Reuse the script and blueprint of an earlier run if their inputs are unchanged
+        
+        Returns:
+            Dictionary with the script, blueprint, scene stills and contact sheet paths
+        """
+        print("="*70)
+        print(f"[>>] LAYOUT PREVIEW")
+        print(f"[NOTE] Topic: {topic}")
+        print("="*70)
+        
+        if not output_filename:
+            output_filename = self.output_name(topic)
+        script_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_script.json")
+        blueprint_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_blueprint.json")
+        results_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_results.json")
+        # Merged into an earlier full run's record: its narration, render and
+        # compose checkpoints (validated against the script and blueprint
+        # hashes) and its results are kept
+        checkpoints = StageCheckpoints(results_path, topic, resume=resume, merge=True)
+        
+        inputs = self._script_inputs(topic)
+        if checkpoints.reuse("script", inputs):
+            script = self.script_gen.load_script(script_path)
+        else:
+            script = self.script_gen.generate(topic)
+            self.script_gen.save_script(script, script_path)
+            checkpoints.record("script", inputs, [script_path])
+        
+        inputs = self._blueprint_inputs(checkpoints)
+        if checkpoints.reuse("blueprint", inputs):
+            scene_stream = iter(self.blueprint_gen.load_blueprint(blueprint_path).scene_blueprints)
+        elif self.blueprint_mode == "scene":
+            scene_stream = self.blueprint_gen.iter_scene_blueprints(script)
+        else:
+            scene_stream = self.blueprint_gen.iter_blueprint_scenes(script)
+        blueprint = self.blueprint_gen.build_video_blueprint(script, list(scene_stream))
+        self.blueprint_gen.save_blueprint(blueprint, blueprint_path)
+        checkpoints.record("blueprint", inputs, [blueprint_path])
+        
+        # Previewed as it would be rendered
+        layout_issues = {}
+        scene_bps = list(self._checked_layout(blueprint.scene_blueprints, layout_issues))
+        sheet_path = os.path.join(Config.OUTPUT_DIR, f"{output_filename}_contact_sheet.png")
+        preview = render_preview(blueprint.model_copy(update={"scene_blueprints": scene_bps}), self.video_gen, sheet_path)
+        return {"topic": topic, "script": script_path, "blueprint": blueprint_path,
+                "layout_issues": layout_issues, **preview}
+    
+    def _checked_layout(self, scene_stream, issues: Dict[int, list]):
+        """
+        Solve and check each scene's layout before it reaches the renderer.
+        
+        Corrected copies are passed on: saved blueprints keep the LLM's layout,
+        which is solved the same way on every run, for the style being rendered.
+        
+        Args:
+            scene_stream: Scene blueprints, in order
+            issues: Filled with the issues left in each scene, by scene number
+        """
+        if Config.LAYOUT_SOLVER:
+            scene_stream = solve_blueprint_scenes(scene_stream, self.style)
+        else:
+            scene_stream = (scene_bp.model_copy(deep=True) for scene_bp in scene_stream)
+        for scene_bp in scene_stream:
+            found = check_scene(scene_bp, self.style)
+            if found:
+                issues[scene_bp.scene_number] = [issue.model_dump() for issue in found]
+            yield scene_bp
+    
+    @staticmethod
+    def output_name(topic: str) -> str:
+        """Default output filename (without extension) for a topic."""
+        safe_topic = topic.lower().replace(" ", "_").replace("/", "_")
+        return f"{safe_topic}_video"
+    
+    @staticmethod
+    def _apply_word_timing(scene_bp: SceneBlueprint, words: List[WordTiming], lead: float = 0.3):
+        """
+        Time each labelled element to the moment its label is first spoken.
+        
+        Elements whose label is never spoken keep the blueprint's timing.
+        
+        Args:
+            scene_bp: Scene blueprint (changed in place)
+            words: The scene narration's word timings
+            lead: Seconds an element appears before its word, so its entrance
+                animation has finished when the word is heard
+        """
+        for elem in scene_bp.elements:
+            if not elem.label:
+                continue
+            start = first_spoken(elem.label, words)
+            if start is not None:
+                elem.timing = round(max(0.0, start - lead), 2)
+    
+    @staticmethod
+    def _apply_narration_timing(scene_bp: SceneBlueprint, durations: Dict[int, float]):
+        """
+        Set a scene's duration to its narration length.
+        
+        Element timings are compressed when the narration is shorter than the
+        blueprint's animation, so every element still appears.
+        """
+        duration = durations.get(scene_bp.scene_number)
+        if not duration:
+            return
+        last_timing = max((elem.timing for elem in scene_bp.elements), default=0.0)
+        # Leave a second after the last entrance for its animation to play
+        if last_timing > 0 and last_timing > duration - 1.0:
+            factor = max(0.0, duration - 1.0) / last_timing
+            for elem in scene_bp.elements:
+                elem.timing = round(elem.timing * factor, 2)
+        scene_bp.duration = round(duration, 3)
+    
+    def _script_inputs(self, topic: str) -> str:
+        """Inputs hash of the script stage."""
+        return inputs_hash(topic, self.script_gen.model, SCRIPT_GENERATION_PROMPT)
+    
+    def _blueprint_inputs(self, checkpoints: StageCheckpoints) -> str:
+        """Inputs hash of the blueprint stage (after the script stage has been recorded)."""
+        return inputs_hash(
+            checkpoints.output_hashes("script"), self.blueprint_mode, self.blueprint_gen.model,
+            BLUEPRINT_GENERATION_PROMPT, SCENE_BLUEPRINT_PROMPT
+        )
+    
+    @staticmethod
+    def _layout_signature() -> dict:
+        """Layout settings that change what is rendered from a blueprint (used to validate resumed runs)."""
+        return {"solver": Config.LAYOUT_SOLVER, "check": Config.LAYOUT_CHECK}
+    
+    def _audio_signature(self) -> dict:
+        """Narration settings that change the audio (used to validate resumed runs)."""
+        settings = {"generator": type(self.audio_gen).__name__}
+        for name in ("use_openai_tts", "model", "voice", "rate", "chunk_chars"):
+            if hasattr(self.audio_gen, name):
+                settings[name] = getattr(self.audio_gen, name)
+        return settings
+    
+    def _extra_results(self) -> dict:
+        """Additional fields for the results summary."""
+        return {}
+    
+    def _audio_note(self) -> str:
+        return ""
 
 
 if __name__ == "__main__":
@@ -0,0 +1,142 @@
+"""
+Layout previews: the final frame of every scene, tiled into a contact sheet.
+Only each scene's last frame is rendered (Manim's save-last-frame path or the
+PIL renderer), in parallel, so layout and overlap can be checked in seconds
+without encoding any video.
+"""
+import os
+import json
+import math
+import time
+from typing import Dict, List, Tuple
+from PIL import Image, ImageDraw, ImageFont
+from config import Config
+from models_schemas import VideoBlueprint
+from layout_check import check_scene
+from layout_solver import solve_blueprint_scenes
+
+SHEET_BACKGROUND = (10, 10, 10)
+LABEL_HEIGHT = 36
+MARGIN = 12
+
+
+def contact_sheet(stills: List[Tuple[int, str]], output_path: str, columns: int = None,
+                  thumb_width: int = 640) -> str:
+    """
+    Tile scene stills into one image, each labelled with its scene number.
+    
+    Args:
+        stills: (scene number, image path) pairs, in display order
+        output_path: Where to save the sheet (PNG)
+        columns: Thumbnails per row (default: a roughly square grid)
+        thumb_width: Width of each thumbnail in pixels
+    
+    Returns:
+        output_path
+    """
+    if not stills:
+        raise ValueError("No scene stills to put on a contact sheet")
+    columns = columns or math.ceil(math.sqrt(len(stills)))
+    rows = math.ceil(len(stills) / columns)
+    with Image.open(stills[0][1]) as first:
+        thumb_height = round(thumb_width * first.height / first.width)
+    
+    cell_width = thumb_width + MARGIN
+    cell_height = thumb_height + LABEL_HEIGHT + MARGIN
+    sheet = Image.new("RGB", (columns * cell_width + MARGIN, rows * cell_height + MARGIN), SHEET_BACKGROUND)
+    draw = ImageDraw.Draw(sheet)
+    font = _label_font()
+    
+    for index, (scene_number, path) in enumerate(stills):
+        x = MARGIN + (index % columns) * cell_width
+        y = MARGIN + (index // columns) * cell_height
+        with Image.open(path) as still:
+            thumb = still.convert("RGB").resize((thumb_width, thumb_height), Image.LANCZOS)
+        sheet.paste(thumb, (x, y + LABEL_HEIGHT))
+        draw.text((x, y + 6), f"Scene {scene_number}", fill=(255, 255, 255), font=font)
+    
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    sheet.save(output_path)
+    return output_path
+
+
+def _label_font():
+    try:
+        return ImageFont.truetype("arial.ttf", 22)
+    except OSError:
+        return ImageFont.load_default()
+
+
+def render_preview(blueprint: VideoBlueprint, video_gen, sheet_path: str) -> dict:
+    """
+    Render the last frame of every scene and tile them into a contact sheet.
+    
+    Args:
+        blueprint: The animation blueprint
+        video_gen: SimpleVideoGenerator or ManimEngine (anything with render_previews)
+        sheet_path: Where to save the contact sheet
+    
+    Returns:
+        Dictionary with the scene stills, the contact sheet path and the time taken
+    """
+    start = time.perf_counter()
+    stills: Dict[int, str] = video_gen.render_previews(blueprint)
+    missing = [scene_bp.scene_number for scene_bp in blueprint.scene_blueprints
+               if scene_bp.scene_number not in stills]
+    if stills:
+        contact_sheet(list(stills.items()), sheet_path)
+    seconds = round(time.perf_counter() - start, 2)
+    
+    if stills:
+        print(f"[OK] Preview of {len(stills)} scenes in {seconds:.1f}s: {sheet_path}")
+    else:
+        print(f"[X] No scene could be previewed")
+    if missing:
+        print(f"  [WARN] Scenes without a preview: {', '.join(map(str, missing))}")
+    return {
+        "stills": {str(number): path for number, path in stills.items()},
+        "contact_sheet": sheet_path if stills else None,
+        "missing_scenes": missing,
+        "seconds": seconds
+    }
+
+
+def preview_blueprint(blueprint_path: str, style: str = None, preset: str = None,
+                      output_path: str = None) -> dict:
+    """
+    Preview a saved blueprint without regenerating or encoding anything.
+    
+    Args:
+        blueprint_path: Blueprint JSON, e.g. output/<name>_blueprint.json
+        style: Manim render style (None uses the simple image-based renderer)
+        preset: Render preset for the stills (default: Config.RENDER_PRESET)
+        output_path: Contact sheet path (default: <name>[_<style>]_contact_sheet.png
+            next to the blueprint)
+    
+    Returns:
+        See render_preview
+    """
+    from simple_video_generator import SimpleVideoGenerator
+    from manim_engine import ManimEngine
+    
+    with open(blueprint_path, encoding="utf-8") as f:
+        blueprint = VideoBlueprint(**json.load(f))
+    # Shows the layout as it would be rendered (the file is left unchanged)
+    scene_bps = blueprint.scene_blueprints
+    if Config.LAYOUT_SOLVER:
+        scene_bps = list(solve_blueprint_scenes(scene_bps, style))
+    for scene_bp in scene_bps:
+        check_scene(scene_bp, style)
+    blueprint = blueprint.model_copy(update={"scene_blueprints": scene_bps})
+    name = os.path.basename(blueprint_path).replace("_blueprint.json", "").replace(".json", "")
+    if style:
+        name = f"{name}_{style}"
+    
+    video_gen = ManimEngine(style=style, preset=preset) if style else SimpleVideoGenerator(preset=preset)
+    # Stills go to their own directory so a run's scene files are left alone
+    video_gen.output_dir = os.path.join(Config.OUTPUT_DIR, f"{name}_preview")
+    os.makedirs(video_gen.output_dir, exist_ok=True)
+    
+    sheet_path = output_path or os.path.join(os.path.dirname(blueprint_path) or Config.OUTPUT_DIR,
+                                             f"{name}_contact_sheet.png")
+    return render_preview(blueprint, video_gen, sheet_path)
@@ -37,14 +37,7 @@ Return a JSON object with this structure:
 Make it engaging, clear, and visually descriptive!"""
 
 
-BLUEPRINT_GENERATION_PROMPT = """You are a SENIOR EDUCATIONAL MOTION DESIGNER and MANIM ENGINEER.
-Your task is to generate PROFESSIONAL, CONCEPT-FIRST educational animations,
-similar in style to ByteByteGo, Fireship (calm scenes), and modern explainer videos.
-
-Script to Visualize:
-{script_json}
-
-STRICT DESIGN PRINCIPLES (DO NOT VIOLATE):
+BLUEPRINT_DESIGN_RULES = """STRICT DESIGN PRINCIPLES (DO NOT VIOLATE):
 
 1. TEACH IDEAS, NOT RAW DATA
    - Never dump full technical structures at once.
@@ -162,7 +155,17 @@ CRITICAL ANTI-OVERLAP RULES (MANDATORY):
     - For text inside rectangles: center it, scale to 70% width
     - For text labels: position ABOVE container (y + height/2 + 0.5)
     - For arrow labels: position FAR above arrow (y + 1.0 minimum)
-    - For scene titles: position at top (y = 3.0 or higher)
+    - For scene titles: position at top (y = 3.0 or higher)"""
+
+
+BLUEPRINT_GENERATION_PROMPT = """You are a SENIOR EDUCATIONAL MOTION DESIGNER and MANIM ENGINEER.
+Your task is to generate PROFESSIONAL, CONCEPT-FIRST educational animations,
+similar in style to ByteByteGo, Fireship (calm scenes), and modern explainer videos.
+
+Script to Visualize:
+{script_json}
+
+""" + BLUEPRINT_DESIGN_RULES + """
 
 Return a JSON object with this structure:
 {{
@@ -248,6 +251,51 @@ The result must look like a PROFESSIONAL YOUTUBE EXPLAINER FRAME with ZERO OVERL
 not a classroom chalkboard!"""
 
 
+SCENE_BLUEPRINT_PROMPT = """You are a SENIOR EDUCATIONAL MOTION DESIGNER and MANIM ENGINEER.
+Your task is to generate the animation blueprint for ONE scene of a PROFESSIONAL,
+CONCEPT-FIRST educational video about: {topic}
+
+Full script (for context only - keep the visual system consistent across scenes):
+{script_json}
+
+Scene to Visualize (scene {scene_number} of {scene_count}):
+{scene_json}
+
+""" + BLUEPRINT_DESIGN_RULES + """
+
+Return a JSON object for THIS SCENE ONLY, with this structure:
+{{
+  "scene_number": {scene_number},
+  "duration": {duration},
+  "background_color": "#0F172A",
+  "narration_text": "Voice-over text",
+  "elements": [
+    {{
+      "element_type": "rectangle",
+      "label": "Concept Card",
+      "color": "#FF6B35",
+      "position": {{"x": 0, "y": 0}},
+      "size": {{"width": 3, "height": 2}},
+      "animation": "FadeIn",
+      "timing": 0.0
+    }},
+    {{
+      "element_type": "arrow",
+      "label": "Flow",
+      "color": "#FFFFFF",
+      "position": {{"x_start": -2, "y_start": 0, "x_end": 2, "y_end": 0}},
+      "size": {{}},
+      "animation": "FadeIn",
+      "timing": 1.0
+    }}
+  ],
+  "transitions": ["FadeOut"]
+}}
+
+element_type is one of: rectangle, circle, arrow, text. Use 3-5 elements, ZERO OVERLAP,
+grid-aligned positions and the dark background (#0F172A)."""
+
+
 STYLE_ANALYSIS_SUMMARY = """
 Visual Style: Professional YouTube Explainer (ByteByteGo/Fireship Style)
 
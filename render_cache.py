@@ -0,0 +1,105 @@
+"""
+Content-addressed cache for rendered Manim scenes.
+Finished scene MP4s (and last-frame PNGs) are stored under a hash of
+everything that affects the render.
+"""
+import os
+import shutil
+import hashlib
+import uuid
+from functools import lru_cache
+from typing import List
+from config import Config
+
+# Cached media types; an entry's extension is that of the file it was rendered to
+MEDIA_EXTENSIONS = (".mp4", ".png")
+
+
+@lru_cache(maxsize=1)
+def manim_version() -> str:
+    """Installed Manim version (part of the cache key)."""
+    try:
+        from importlib.metadata import version
+        return version("manim")
+    except Exception:
+        return "unknown"
+
+
+class RenderCache:
+    """Stores finished scene videos keyed by source, style, video settings and Manim version."""
+    
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        """
+        Initialize the render cache.
+        
+        Args:
+            cache_dir: Directory holding cached renders (default: Config.RENDER_CACHE_DIR)
+            max_bytes: Size limit before least-recently-used entries are evicted
+        """
+        self.cache_dir = cache_dir or Config.RENDER_CACHE_DIR
+        self.max_bytes = max_bytes or Config.RENDER_CACHE_MAX_MB * 1024 * 1024
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def make_key(self, scene_source: str, style: str, video_args: List[str]) -> str:
+        """Hash every input that changes the rendered pixels (video_args: resolution and frame rate options)."""
+        digest = hashlib.sha256()
+        for part in (scene_source, style, " ".join(video_args), manim_version()):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def restore(self, key: str, output_path: str) -> bool:
+        """
+        Copy a cached render to output_path.
+        
+        The entry's media type is taken from output_path's extension. An entry
+        evicted by a concurrent put() while being copied counts as a miss.
+        
+        Returns:
+            False on a cache miss
+        """
+        path = self._path(key, output_path)
+        try:
+            # Touch so eviction treats this entry as recently used
+            os.utime(path, None)
+            shutil.copy(path, output_path)
+        except FileNotFoundError:
+            return False
+        return True
+    
+    def put(self, key: str, media_path: str) -> str:
+        """Copy a freshly rendered video or still into the cache."""
+        path = self._path(key, media_path)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        shutil.copy(media_path, tmp_path)
+        os.replace(tmp_path, path)
+        self.evict()
+        return path
+    
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits its size limit."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(MEDIA_EXTENSIONS):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                # Already gone, or (on Windows) open in a concurrent restore(): skip it
+                pass
+    
+    def _path(self, key: str, media_path: str) -> str:
+        extension = os.path.splitext(media_path)[1].lower() or ".mp4"
+        return os.path.join(self.cache_dir, f"{key}{extension}")
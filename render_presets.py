@@ -0,0 +1,82 @@
+"""
+Named render presets.
+A preset fixes the resolution, frame rate and encoder settings used by every
+renderer: Manim (CLI and warm workers), the simple PIL renderer and the
+ffmpeg encoders. Scenes are rendered at the frame rate they are delivered
+at, so nothing is converted later.
+"""
+from typing import Dict, List
+from pydantic import BaseModel
+from config import Config
+
+
+class RenderPreset(BaseModel):
+    """Output resolution, frame rate and encoder settings."""
+    name: str
+    description: str
+    width: int
+    height: int
+    fps: int
+    crf: int                # x264 constant rate factor (lower = better, larger)
+    x264_preset: str        # x264 speed/compression trade-off
+    
+    @property
+    def scale(self) -> float:
+        """Size relative to 1080p, for pixel sizes designed at full HD (fonts, strokes)."""
+        return self.height / 1080
+    
+    def manim_cli_args(self) -> List[str]:
+        """Manim CLI options rendering at this preset's resolution and frame rate."""
+        return ["--resolution", f"{self.width},{self.height}", "--frame_rate", str(self.fps)]
+    
+    def manim_config(self) -> dict:
+        """The same settings as Manim config options (for tempconfig)."""
+        return {"pixel_width": self.width, "pixel_height": self.height, "frame_rate": self.fps}
+    
+    def x264_args(self, fps: float = None) -> List[str]:
+        """ffmpeg output options encoding H.264 video with this preset (at fps, if given)."""
+        return [
+            "-c:v", "libx264", "-preset", self.x264_preset, "-crf", str(self.crf),
+            "-pix_fmt", "yuv420p", "-r", f"{fps or self.fps:g}"
+        ]
+
+
+PRESETS: Dict[str, RenderPreset] = {}
+
+
+def register_preset(preset: RenderPreset):
+    """Add (or replace) a preset so every renderer and the CLI can use it."""
+    PRESETS[preset.name] = preset
+
+
+def get_preset(name: str = None, default: str = "draft") -> RenderPreset:
+    """
+    Look up a preset by name.
+    
+    Args:
+        name: Preset name (default: Config.RENDER_PRESET)
+        default: The renderer's own preset when neither is set (Manim renders
+            drafts, as its -ql used to; the simple renderer renders production)
+    """
+    name = name or Config.RENDER_PRESET or default
+    if name not in PRESETS:
+        raise ValueError(f"Unknown render preset '{name}'. Available: {', '.join(PRESETS)}")
+    return PRESETS[name]
+
+
+register_preset(RenderPreset(
+    name="draft",
+    description="480p at 15 fps, fastest encode: for iterating on scripts and layouts",
+    width=854, height=480, fps=15, crf=28, x264_preset="veryfast"
+))
+register_preset(RenderPreset(
+    name="preview",
+    description="720p at 30 fps: for reviewing timing and animation",
+    width=1280, height=720, fps=30, crf=23, x264_preset="faster"
+))
+register_preset(RenderPreset(
+    name="production",
+    description="VIDEO_WIDTH x VIDEO_HEIGHT at VIDEO_FPS (1080p30): for publishing",
+    width=Config.VIDEO_WIDTH, height=Config.VIDEO_HEIGHT, fps=Config.VIDEO_FPS,
+    crf=18, x264_preset="medium"
+))
@@ -0,0 +1,272 @@
+"""
+Parallel render scheduler for Manim scenes.
+Runs each scene in its own Manim CLI process, or on a warm in-process
+worker when the "direct" backend is selected, bounded by a worker limit.
+"""
+import os
+import json
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from typing import Iterable, List, Optional
+from pydantic import BaseModel
+from config import Config
+from render_cache import RenderCache
+from manim_worker import get_worker_pool
+from render_styles import style_fingerprint
+from render_presets import get_preset
+from clients import budget
+from instrumentation import in_context, span
+
+# Scenes rendered by the CLI write Manim's own movie path to this file (see StyledScene.render)
+MOVIE_PATH_ENV = "MANIM_MOVIE_PATH_FILE"
+
+
+class RenderJob(BaseModel):
+    """A single Manim scene render request."""
+    scene_number: int
+    script_path: str
+    scene_class: str
+    output_path: str
+    style: str = "default"
+    scene_blueprint: Optional[dict] = None  # Blueprint data; the direct backend renders from it alone
+    still: bool = False                     # Save only the last frame as a PNG (layout previews)
+
+
+class RenderResult(BaseModel):
+    """Outcome of a single scene render."""
+    scene_number: int
+    success: bool
+    output_path: Optional[str] = None
+    render_time: float = 0.0
+    cached: bool = False
+    error: Optional[str] = None
+
+
+class RenderScheduler:
+    """Renders Manim scenes concurrently, returning results in scene order."""
+    
+    BACKENDS = ("cli", "direct")
+    
+    def __init__(self, max_workers: int = None, timeout: int = None, use_cache: bool = None,
+                 backend: str = None, preset: str = None):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            max_workers: Maximum concurrent Manim processes (default: Config.RENDER_WORKERS)
+            timeout: Per-scene timeout in seconds (default: Config.RENDER_TIMEOUT)
+            use_cache: Reuse previously rendered scenes (default: Config.RENDER_CACHE_ENABLED)
+            backend: "cli" (one manim process per generated script) or "direct"
+                (warm workers build scenes from the blueprint). Default: Config.RENDER_BACKEND
+            preset: Render preset name (see render_presets). Default: Config.RENDER_PRESET
+        """
+        self.max_workers = max(1, max_workers or Config.RENDER_WORKERS)
+        self.backend = backend or Config.RENDER_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Render backend must be one of {self.BACKENDS}, got '{self.backend}'")
+        self.timeout = timeout or Config.RENDER_TIMEOUT
+        self.preset = get_preset(preset)
+        if use_cache is None:
+            use_cache = Config.RENDER_CACHE_ENABLED
+        self.cache = RenderCache() if use_cache else None
+    
+    def run(self, jobs: List[RenderJob]) -> List[RenderResult]:
+        """
+        Render all jobs concurrently.
+        
+        Each job is a separate Manim process, so worker threads only wait on
+        subprocesses; the worker limit bounds how many run at once.
+        
+        Returns:
+            List of RenderResult in the same order as jobs
+        """
+        if not jobs:
+            return []
+        
+        workers = min(self.max_workers, len(jobs))
+        print(f"  Rendering {len(jobs)} scenes with {workers} parallel workers...")
+        
+        results = [None] * len(jobs)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(in_context(self.render), job): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                self._report(result)
+        
+        return results
+    
+    def run_stream(self, jobs: Iterable[RenderJob]) -> List[RenderResult]:
+        """
+        Render jobs as they arrive from an iterator (e.g. streamed blueprints).
+        
+        Each job is submitted the moment it is yielded, so rendering overlaps
+        whatever produces the jobs.
+        
+        Returns:
+            List of RenderResult sorted by scene number
+        """
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(in_context(self.render), job) for job in jobs]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                self._report(result)
+        return sorted(results, key=lambda r: r.scene_number)
+    
+    def uses_direct(self, job: RenderJob) -> bool:
+        """Whether a job goes to the warm workers instead of the Manim CLI."""
+        return self.backend == "direct" and job.scene_blueprint is not None
+    
+    def render(self, job: RenderJob) -> RenderResult:
+        """Render a single job in its own isolated media directory."""
+        with span("render", "render", scene=job.scene_number, style=job.style) as call:
+            result = self._render(job)
+            call.set(cached=result.cached, success=result.success)
+            if result.success:
+                call.add_file(result.output_path)
+            return result
+    
+    def _render(self, job: RenderJob) -> RenderResult:
+        start = time.perf_counter()
+        media_dir = self.media_dir_for(job)
+        direct = self.uses_direct(job)
+        
+        cache_key = None
+        if self.cache:
+            if job.scene_blueprint is not None:
+                # Generated stubs only reference the blueprint; key on it and the style code
+                source = "blueprint:" + json.dumps(job.scene_blueprint, sort_keys=True) + style_fingerprint(job.style)
+            else:
+                with open(job.script_path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+            cache_key = self.cache.make_key(source, job.style, self._manim_args(job))
+            if self.cache.restore(cache_key, job.output_path):
+                return RenderResult(
+                    scene_number=job.scene_number,
+                    success=True,
+                    output_path=job.output_path,
+                    render_time=time.perf_counter() - start,
+                    cached=True
+                )
+        
+        # Stale output from an earlier run must not be mistaken for this one
+        shutil.rmtree(media_dir, ignore_errors=True)
+        
+        # Cache hits are free; actual renders share the process-wide budget
+        with budget("render"):
+            if direct:
+                return self._render_direct(job, start, media_dir, cache_key)
+            return self._render_cli(job, start, media_dir, cache_key)
+    
+    def _render_cli(self, job: RenderJob, start: float, media_dir: str, cache_key: Optional[str]) -> RenderResult:
+        """Render a job's generated script with the Manim CLI."""
+        script_path = os.path.abspath(job.script_path)
+        movie_path_file = os.path.join(media_dir, "movie_path.txt")
+        os.makedirs(media_dir, exist_ok=True)
+        cmd = [
+            "manim",
+            *self._manim_args(job),
+            "--disable_caching",
+            "--media_dir", media_dir,
+            script_path,
+            job.scene_class
+        ]
+        
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                cwd=os.path.dirname(script_path),
+                env={**os.environ, MOVIE_PATH_ENV: movie_path_file},
+                timeout=self.timeout
+            )
+        except subprocess.TimeoutExpired:
+            return self._failed(job, start, f"Manim rendering timed out after {self.timeout}s")
+        except FileNotFoundError:
+            return self._failed(job, start, "Manim not found. Install with: pip install manim")
+        
+        if result.returncode != 0:
+            return self._failed(job, start, f"Manim error: {result.stderr.strip()[-500:]}")
+        
+        rendered = self._reported_movie(movie_path_file)
+        if not rendered:
+            return self._failed(job, start, f"Manim did not report a rendered file ({movie_path_file})")
+        
+        shutil.copy(rendered, job.output_path)
+        if cache_key:
+            self.cache.put(cache_key, rendered)
+        return RenderResult(
+            scene_number=job.scene_number,
+            success=True,
+            output_path=job.output_path,
+            render_time=time.perf_counter() - start
+        )
+    
+    def _render_direct(self, job: RenderJob, start: float, media_dir: str, cache_key: Optional[str]) -> RenderResult:
+        """Render a job from its blueprint on a warm worker process."""
+        try:
+            get_worker_pool().render(
+                job.scene_blueprint,
+                job.style,
+                os.path.abspath(job.output_path),
+                media_dir,
+                self.preset.manim_config(),
+                still=job.still,
+                timeout=self.timeout
+            )
+        except FutureTimeout:
+            return self._failed(job, start, f"Manim rendering timed out after {self.timeout}s")
+        except ImportError:
+            return self._failed(job, start, "Manim not found. Install with: pip install manim")
+        except Exception as e:
+            return self._failed(job, start, f"Manim error: {e}")
+        
+        if cache_key:
+            self.cache.put(cache_key, job.output_path)
+        return RenderResult(
+            scene_number=job.scene_number,
+            success=True,
+            output_path=job.output_path,
+            render_time=time.perf_counter() - start
+        )
+    
+    def _manim_args(self, job: RenderJob) -> List[str]:
+        """Manim CLI output options for a job (also part of its cache key)."""
+        output = ["--save_last_frame"] if job.still else ["--format=mp4"]
+        return [*self.preset.manim_cli_args(), *output]
+    
+    def media_dir_for(self, job: RenderJob) -> str:
+        """Per-scene media directory so parallel renders never share paths."""
+        source = job.output_path if self.uses_direct(job) else job.script_path
+        stem = os.path.splitext(os.path.basename(source))[0]
+        # Next to the scene files, so runs with their own scene directory never collide
+        return os.path.abspath(os.path.join(os.path.dirname(source) or Config.OUTPUT_DIR, "media", stem))
+    
+    def _reported_movie(self, movie_path_file: str) -> Optional[str]:
+        """The movie (or last-frame image) path Manim reported for a CLI render, if the file exists."""
+        if not os.path.exists(movie_path_file):
+            return None
+        with open(movie_path_file, 'r', encoding='utf-8') as f:
+            path = f.read().strip()
+        return path if os.path.exists(path) else None
+    
+    def _report(self, result: RenderResult):
+        if result.cached:
+            print(f"    [OK] Scene {result.scene_number} reused from render cache")
+        elif result.success:
+            print(f"    [OK] Scene {result.scene_number} rendered in {result.render_time:.1f}s")
+        else:
+            print(f"    [X] Scene {result.scene_number} failed after {result.render_time:.1f}s: {result.error}")
+    
+    def _failed(self, job: RenderJob, start: float, error: str) -> RenderResult:
+        return RenderResult(
+            scene_number=job.scene_number,
+            success=False,
+            render_time=time.perf_counter() - start,
+            error=error
+        )
@@ -0,0 +1,99 @@
+"""
+Registry of Manim render styles.
+Kept free of Manim imports so the CLI can list styles; the Mobject
+builders themselves live in scene_styles.py and are loaded lazily.
+"""
+import importlib
+import importlib.util
+import hashlib
+from functools import lru_cache
+from typing import Dict, List
+from pydantic import BaseModel
+
+
+class RenderStyle(BaseModel):
+    """A named look for rendered scenes."""
+    name: str
+    description: str
+    builder: str            # "module:Class" building the scene's Mobjects
+    scene_class: str        # Scene class name in generated CLI scripts
+    suffix: str = ""        # Appended to scene file names, e.g. "_fixed"
+
+
+STYLES: Dict[str, RenderStyle] = {}
+
+
+def register_style(style: RenderStyle):
+    """Add (or replace) a style so every generator and the CLI can use it."""
+    STYLES[style.name] = style
+
+
+def get_style(name: str) -> RenderStyle:
+    """Look up a style by name."""
+    if name not in STYLES:
+        raise ValueError(f"Unknown render style '{name}'. Available: {', '.join(STYLES)}")
+    return STYLES[name]
+
+
+def style_names() -> List[str]:
+    return list(STYLES)
+
+
+def load_style(name: str):
+    """Import a style's builder class (requires Manim)."""
+    module_name, class_name = get_style(name).builder.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+@lru_cache(maxsize=None)
+def style_fingerprint(name: str) -> str:
+    """Hash of the builder module's source, so render cache keys change with the style code."""
+    module_name = get_style(name).builder.split(":")[0]
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin:
+        return "unknown"
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+register_style(RenderStyle(
+    name="default",
+    description="Plain shapes on the blueprint background",
+    builder="scene_styles:SceneStyle",
+    scene_class="DynamicScene"
+))
+register_style(RenderStyle(
+    name="fixed",
+    description="Wider camera frame, elements scaled to avoid cropping",
+    builder="scene_styles:FixedStyle",
+    scene_class="FixedScene",
+    suffix="_fixed"
+))
+register_style(RenderStyle(
+    name="enhanced",
+    description="Rounded corners, shadows, label backdrops",
+    builder="scene_styles:EnhancedStyle",
+    scene_class="EnhancedScene",
+    suffix="_enhanced"
+))
+register_style(RenderStyle(
+    name="best",
+    description="Bolder shapes, plain-text labels, dynamic animations",
+    builder="scene_styles:BestStyle",
+    scene_class="BestScene",
+    suffix="_best"
+))
+register_style(RenderStyle(
+    name="perfect",
+    description="Vibrant colours, labels fitted inside shapes",
+    builder="scene_styles:PerfectStyle",
+    scene_class="PerfectScene",
+    suffix="_perfect"
+))
+register_style(RenderStyle(
+    name="ultimate",
+    description="Dark gradient background, subtle fills, Calibri text",
+    builder="scene_styles:UltimateStyle",
+    scene_class="UltimateScene",
+    suffix="_ultimate"
+))
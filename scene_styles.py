@@ -0,0 +1,425 @@
+"""
+Manim scene styles: build Mobjects directly from a SceneBlueprint.
+Only imported inside render processes (manim_worker.py workers or the
+generated CLI stubs), so the rest of the pipeline does not need Manim.
+Styles are registered by name in render_styles.py.
+"""
+import os
+import json
+from manim import (
+    Arrow, BackgroundRectangle, Circle, Create, FadeIn, GrowFromCenter, Rectangle,
+    RoundedRectangle, Scene, Text, VGroup, Write, config, BLACK, BOLD, DOWN, NORMAL, RIGHT, UP, WHITE
+)
+from models_schemas import SceneBlueprint, AnimationElement
+
+
+class SceneStyle:
+    """Default look: plain shapes on the blueprint's background colour."""
+    
+    frame_width = None          # Camera frame override (Manim default is 14.22)
+    frame_height = None
+    background = None           # None = use the blueprint's background colour
+    scale = 1.0                 # Applied to positions, sizes and text font sizes
+    rect_label_size = 24
+    circle_label_size = 18
+    arrow_label_size = 20
+    
+    # Entry animation name -> (factory, run time in seconds)
+    animations = {
+        "FadeIn": (FadeIn, 0.5),
+        "Write": (Write, 0.8),
+        "Create": (Create, 0.6),
+        "GrowFromCenter": (GrowFromCenter, 0.5),
+    }
+    fallback_animation = "FadeIn"
+    
+    def build(self, scene: Scene, scene_bp: SceneBlueprint):
+        """Add every element to the scene on its timeline and hold to the scene duration."""
+        self.setup(scene, scene_bp)
+        
+        timeline = []
+        for elem in scene_bp.elements:
+            mob = self.element(elem)
+            if mob is not None:
+                timeline.append((mob, self.animation_name(elem), elem.timing))
+        timeline.sort(key=lambda item: item[2])
+        
+        current_time = 0
+        for mob, anim_type, timing in timeline:
+            if timing > current_time:
+                scene.wait(timing - current_time)
+                current_time = timing
+            factory, run_time = self.animations.get(anim_type, self.animations[self.fallback_animation])
+            try:
+                scene.play(factory(mob), run_time=run_time)
+                current_time += run_time
+            except Exception as e:
+                print(f"Animation error: {e}")
+        
+        # Hold final frame
+        remaining = scene_bp.duration - current_time
+        if remaining > 0:
+            scene.wait(remaining)
+    
+    def setup(self, scene: Scene, scene_bp: SceneBlueprint):
+        """Camera frame and background."""
+        if self.frame_width:
+            scene.camera.frame_width = self.frame_width
+        if self.frame_height:
+            scene.camera.frame_height = self.frame_height
+        scene.camera.background_color = self.background or scene_bp.background_color
+    
+    def animation_name(self, elem: AnimationElement) -> str:
+        return elem.animation or "FadeIn"
+    
+    def color(self, color: str) -> str:
+        return color
+    
+    def label_text(self, text: str) -> str:
+        return text
+    
+    def element(self, elem: AnimationElement):
+        """Create the Mobject for one element (None for unknown types)."""
+        builders = {
+            "rectangle": self.rectangle,
+            "circle": self.circle,
+            "arrow": self.arrow,
+            "text": self.text,
+        }
+        builder = builders.get(elem.element_type)
+        return builder(elem) if builder else None
+    
+    def point(self, elem: AnimationElement, x_key: str = "x", y_key: str = "y", x_default: float = 0):
+        return [elem.position.get(x_key, x_default) * self.scale, elem.position.get(y_key, 0) * self.scale, 0]
+    
+    def rectangle(self, elem: AnimationElement):
+        shape = Rectangle(
+            width=elem.size.get("width", 2) * self.scale,
+            height=elem.size.get("height", 1.5) * self.scale,
+            color=self.color(elem.color), fill_opacity=0.2, stroke_width=3
+        ).move_to(self.point(elem))
+        if not elem.label:
+            return shape
+        label = Text(self.label_text(elem.label), font_size=self.rect_label_size, color=WHITE).move_to(shape)
+        return VGroup(shape, label)
+    
+    def circle(self, elem: AnimationElement):
+        shape = Circle(
+            radius=elem.size.get("radius", 0.5) * self.scale,
+            color=self.color(elem.color), fill_opacity=0.3, stroke_width=3
+        ).move_to(self.point(elem))
+        if not elem.label:
+            return shape
+        label = Text(self.label_text(elem.label), font_size=self.circle_label_size, color=WHITE).move_to(shape)
+        return VGroup(shape, label)
+    
+    def arrow(self, elem: AnimationElement):
+        arrow = Arrow(
+            start=self.point(elem, "x_start", "y_start", -2),
+            end=self.point(elem, "x_end", "y_end", 2),
+            color=self.color(elem.color), stroke_width=4, buff=0.1
+        )
+        if not elem.label:
+            return arrow
+        label = Text(self.label_text(elem.label), font_size=self.arrow_label_size, color=WHITE)
+        label.next_to(arrow, UP, buff=0.2)
+        return VGroup(arrow, label)
+    
+    def text(self, elem: AnimationElement):
+        text = Text(
+            self.label_text(elem.label or ""),
+            font_size=elem.size.get("font_size", 36) * self.scale,
+            color=self.color(elem.color)
+        )
+        return text.move_to(self.point(elem))
+
+
+class FixedStyle(SceneStyle):
+    """Wider camera frame and 70% scale so nothing is cropped."""
+    
+    frame_width = 16
+    frame_height = 9
+    scale = 0.7
+    rect_label_size = 20
+    circle_label_size = 16
+    arrow_label_size = 18
+    animations = {
+        "FadeIn": (FadeIn, 0.5),
+        "Write": (Write, 0.8),
+        "Create": (Create, 0.6),
+    }
+
+
+class PolishedStyle(SceneStyle):
+    """
+    Shared look of the enhanced, best, perfect and ultimate styles: rounded
+    boxes with drop shadows and labels on dark backdrops. Subclasses only
+    change the numbers.
+    """
+    
+    frame_width = 18
+    background = "#1a1a1a"
+    animations = FixedStyle.animations
+    plain_arrows = False        # Replace arrow glyphs in labels with "to"
+    
+    corner_radius = 0.25
+    rect_fill = 0.4
+    rect_stroke = 4
+    shadow_color = BLACK        # None = the element's own colour
+    shadow_opacity = 0.3
+    shadow_offset = 0.08
+    rect_label_size = 22
+    rect_label_size_per_width = None  # Cap label size at int(width * this)
+    rect_label_fit = None       # Scale label to this fraction of the box width
+    rect_label_shift = 0
+    
+    circle_fill = 0.3
+    circle_stroke = 4
+    circle_shadow = False
+    circle_label_size = 18
+    circle_label_fit = None
+    circle_label_font = None
+    
+    arrow_stroke = 6
+    arrow_buff = 0.2
+    arrow_tip_ratio = 0.2
+    arrow_label_size = 20
+    arrow_label_buff = 0.4
+    label_bg = (BLACK, 0.7, 0.15, 0.1)      # colour, opacity, buff, corner radius
+    
+    text_bg = (BLACK, 0.5, 0.2, 0.15)
+    label_font = None
+    label_weight = BOLD
+    
+    def label_text(self, text: str) -> str:
+        if self.plain_arrows:
+            text = text.replace("→", "to").replace("â†'", "to")
+        return text
+    
+    def label(self, text: str, font_size: float, font: str = None, weight=None, color=WHITE):
+        kwargs = {"font": font} if font else {}
+        return Text(self.label_text(text), font_size=font_size, weight=weight or self.label_weight,
+                    color=color, **kwargs)
+    
+    def backdrop(self, mob, spec):
+        color, opacity, buff, corner_radius = spec
+        return BackgroundRectangle(mob, color=color, fill_opacity=opacity, buff=buff, corner_radius=corner_radius)
+    
+    def shadow(self, shape, color: str):
+        shadow = shape.copy()
+        shadow.set_fill(self.shadow_color or color, opacity=self.shadow_opacity)
+        shadow.set_stroke(opacity=0)
+        shadow.shift(DOWN * self.shadow_offset + RIGHT * self.shadow_offset)
+        return shadow
+    
+    def rectangle(self, elem: AnimationElement):
+        color = self.color(elem.color)
+        width = elem.size.get("width", 2)
+        rect = RoundedRectangle(
+            width=width, height=elem.size.get("height", 1.5),
+            corner_radius=self.corner_radius,
+            color=color, fill_opacity=self.rect_fill, stroke_width=self.rect_stroke
+        ).move_to(self.point(elem))
+        shadow = self.shadow(rect, color)
+        if not elem.label:
+            return VGroup(shadow, rect)
+        
+        font_size = self.rect_label_size
+        if self.rect_label_size_per_width:
+            font_size = min(font_size, int(width * self.rect_label_size_per_width))
+        label = self.label(elem.label, font_size, font=self.label_font)
+        if self.rect_label_fit:
+            label.scale_to_fit_width(rect.width * self.rect_label_fit)
+        label.move_to(rect)
+        if self.rect_label_shift:
+            label.shift(UP * self.rect_label_shift)
+        return VGroup(shadow, rect, label)
+    
+    def circle(self, elem: AnimationElement):
+        color = self.color(elem.color)
+        circle = Circle(
+            radius=elem.size.get("radius", 0.5),
+            color=color, fill_opacity=self.circle_fill, stroke_width=self.circle_stroke
+        ).move_to(self.point(elem))
+        parts = [self.shadow(circle, color), circle] if self.circle_shadow else [circle]
+        if elem.label:
+            label = self.label(elem.label, self.circle_label_size, font=self.circle_label_font)
+            if self.circle_label_fit:
+                label.scale_to_fit_width(circle.width * self.circle_label_fit)
+            parts.append(label.move_to(circle))
+        return VGroup(*parts) if len(parts) > 1 else circle
+    
+    def arrow(self, elem: AnimationElement):
+        arrow = Arrow(
+            start=self.point(elem, "x_start", "y_start", -2),
+            end=self.point(elem, "x_end", "y_end", 2),
+            color=self.color(elem.color),
+            stroke_width=self.arrow_stroke,
+            buff=self.arrow_buff,
+            max_tip_length_to_length_ratio=self.arrow_tip_ratio
+        )
+        if not elem.label:
+            return arrow
+        label = self.label(elem.label, self.arrow_label_size, font=self.label_font)
+        label.next_to(arrow, UP, buff=self.arrow_label_buff)
+        return VGroup(arrow, self.backdrop(label, self.label_bg), label)
+    
+    def text(self, elem: AnimationElement):
+        text = self.label(
+            elem.label or "", elem.size.get("font_size", 36),
+            font=self.label_font, weight=BOLD, color=self.color(elem.color)
+        ).move_to(self.point(elem))
+        return VGroup(self.backdrop(text, self.text_bg), text)
+
+
+class EnhancedStyle(PolishedStyle):
+    """Rounded corners, drop shadows and label backdrops."""
+
+
+class BestStyle(PolishedStyle):
+    """Bolder shapes, plain-text labels and GrowFromCenter entrances."""
+    
+    plain_arrows = True
+    corner_radius = 0.3
+    rect_fill = 0.5
+    rect_stroke = 5
+    shadow_opacity = 0.4
+    shadow_offset = 0.1
+    rect_label_size = 20
+    circle_fill = 0.4
+    circle_stroke = 5
+    arrow_stroke = 7
+    arrow_buff = 0.3
+    arrow_tip_ratio = 0.25
+    arrow_label_size = 18
+    arrow_label_buff = 0.6
+    label_bg = (BLACK, 0.8, 0.2, 0.15)
+    text_bg = (BLACK, 0.6, 0.25, 0.2)
+    animations = {
+        "GrowFromCenter": (GrowFromCenter, 0.6),
+        "Write": (Write, 0.8),
+        "Create": (Create, 0.7),
+        "FadeIn": (lambda mob: FadeIn(mob, shift=UP * 0.5), 0.5),
+    }
+    fallback_animation = "GrowFromCenter"
+    
+    def animation_name(self, elem: AnimationElement) -> str:
+        return "GrowFromCenter" if elem.animation == "FadeIn" else elem.animation
+
+
+class PerfectStyle(PolishedStyle):
+    """Vibrant colours with labels scaled to fit inside their shapes."""
+    
+    background = "#0a0a0a"
+    plain_arrows = True
+    corner_radius = 0.3
+    rect_fill = 0.6
+    rect_stroke = 6
+    shadow_color = None
+    shadow_opacity = 0.2
+    shadow_offset = 0.12
+    rect_label_size = 20
+    rect_label_size_per_width = 8
+    rect_label_fit = 0.85
+    circle_fill = 0.5
+    circle_stroke = 6
+    circle_label_size = 16
+    circle_label_fit = 0.7
+    arrow_stroke = 8
+    arrow_buff = 0.4
+    arrow_tip_ratio = 0.3
+    arrow_label_size = 16
+    arrow_label_buff = 0.8
+    label_bg = ("#000000", 0.85, 0.25, 0.2)
+    text_bg = ("#000000", 0.7, 0.3, 0.25)
+    animations = {
+        "GrowFromCenter": (GrowFromCenter, 0.6),
+        "Write": (Write, 0.8),
+    }
+    fallback_animation = "GrowFromCenter"
+    
+    VIBRANT = {
+        "#ff6b35": "#FF6B35",  # Vibrant orange
+        "#00d4ff": "#00E5FF",  # Bright cyan
+        "#ffffff": "#FFFFFF",  # White
+    }
+    
+    def animation_name(self, elem: AnimationElement) -> str:
+        return elem.animation if elem.animation == "Write" else "GrowFromCenter"
+    
+    def color(self, color: str) -> str:
+        return self.VIBRANT.get(color.lower(), color)
+
+
+class UltimateStyle(PolishedStyle):
+    """Dark gradient background, thin strokes, subtle fills and Calibri text."""
+    
+    background = "#0F172A"
+    plain_arrows = True
+    rect_fill = 0.18
+    rect_stroke = 1.2
+    shadow_opacity = 0.25
+    rect_label_size_per_width = 9
+    rect_label_fit = 0.85
+    rect_label_shift = 2.5
+    circle_fill = 0.18
+    circle_stroke = 1.2
+    circle_shadow = True
+    circle_label_fit = 0.7
+    circle_label_font = "Inter"
+    arrow_stroke = 2.5
+    arrow_buff = 0.3
+    arrow_tip_ratio = 0.25
+    arrow_label_size = 18
+    arrow_label_buff = 2.0
+    label_bg = ("#020617", 0.9, 0.2, 0.15)
+    text_bg = ("#020617", 0.85, 0.25, 0.2)
+    label_font = "Calibri"
+    label_weight = NORMAL
+    animations = {
+        "FadeIn": (lambda mob: FadeIn(mob, shift=UP * 0.3), 0.6),
+        "Write": (Write, 0.8),
+    }
+    
+    def setup(self, scene: Scene, scene_bp: SceneBlueprint):
+        super().setup(scene, scene_bp)
+        bg = Rectangle(20, 12).set_fill(color=["#0F172A", "#020617"], opacity=1).set_stroke(width=0)
+        scene.add(bg)
+    
+    def animation_name(self, elem: AnimationElement) -> str:
+        return "Write" if elem.animation == "Write" else "FadeIn"
+    
+    def color(self, color: str) -> str:
+        return color.upper()
+
+
+class StyledScene(Scene):
+    """
+    Scene rendered from blueprint data in a registered style.
+    
+    Subclasses set style_name and scene_json (the CLI backend writes one
+    such subclass per scene); the direct backend passes both to __init__.
+    """
+    
+    style_name = "default"
+    scene_json = None
+    
+    def __init__(self, style_name: str = None, scene_data: dict = None, **kwargs):
+        self.style_name = style_name or self.style_name
+        self.scene_data = scene_data or json.loads(self.scene_json)
+        super().__init__(**kwargs)
+    
+    def construct(self):
+        from render_styles import load_style
+        load_style(self.style_name)().build(self, SceneBlueprint(**self.scene_data))
+    
+    def render(self, *args, **kwargs):
+        result = super().render(*args, **kwargs)
+        # The CLI backend asks where Manim wrote the movie (or the last frame,
+        # with --save_last_frame) instead of guessing its media directory layout
+        path_file = os.environ.get("MANIM_MOVIE_PATH_FILE")  # render_scheduler.MOVIE_PATH_ENV
+        if path_file:
+            writer = self.renderer.file_writer
+            with open(path_file, 'w', encoding='utf-8') as f:
+                f.write(str(writer.image_file_path if config.save_last_frame else writer.movie_file_path))
+        return result
@@ -2,10 +2,11 @@
 AI-powered script generator using OpenAI GPT-4.
 """
 import json
-from openai import OpenAI
 from config import Config
 from prompts import SCRIPT_GENERATION_PROMPT
 from models_schemas import Script
+from llm_cache import get_llm_cache
+from clients import get_openai_client
 
 
 class ScriptGenerator:
@@ -13,11 +14,9 @@ class ScriptGenerator:
     
     def __init__(self):
         """Initialize the script generator with OpenAI client."""
-        client_kwargs = {"api_key": Config.OPENAI_API_KEY}
-        if Config.OPENAI_BASE_URL:
-            client_kwargs["base_url"] = Config.OPENAI_BASE_URL
-        self.client = OpenAI(**client_kwargs)
+        self.client = get_openai_client()
         self.model = Config.OPENAI_MODEL
+        self.cache = get_llm_cache()
     
     def generate(self, topic: str) -> Script:
         """
@@ -36,7 +35,7 @@ class ScriptGenerator:
         
         # Call GPT-4
         try:
-            response = self.client.chat.completions.create(
+            request = dict(
                 model=self.model,
                 messages=[
                     {
@@ -51,12 +50,15 @@ class ScriptGenerator:
                 temperature=0.7,
                 response_format={"type": "json_object"}
             )
+            content = self.cache.complete(self.client, label="script", **request)
             
-            # Parse the response
-            script_data = json.loads(response.choices[0].message.content)
-            
-            # Validate and create Script object
-            script = Script(**script_data)
+            # Parse the response (a cached response that no longer parses is dropped)
+            try:
+                script_data = json.loads(content)
+                script = Script(**script_data)
+            except Exception:
+                self.cache.discard(**request)
+                raise
             
             print(f"[OK] Generated script with {len(script.scenes)} scenes")
             print(f"  Total duration: {script.total_duration}s")
@@ -72,6 +74,11 @@ class ScriptGenerator:
         with open(output_path, 'w', encoding='utf-8') as f:
             json.dump(script.model_dump(), f, indent=2, ensure_ascii=False)
         print(f"[OK] Script saved to: {output_path}")
+    
+    def load_script(self, path: str) -> Script:
+        """Load a script saved by save_script."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return Script(**json.load(f))
 
 
 if __name__ == "__main__":
@@ -1,33 +1,82 @@
 """
-Simple video generator using PIL for images and moviepy for video composition.
+Simple video generator using PIL for images and ffmpeg for video encoding.
 This creates actual MP4 files without requiring Manim.
+
+Each scene is encoded as its own segment: only the frames in which elements
+fade in are computed (with NumPy) and piped to ffmpeg, which holds the last
+frame for the rest of the scene. The segments are then joined without
+re-encoding and muxed with one continuous narration track (see
+narration_track). moviepy remains available as SIMPLE_RENDER_BACKEND=moviepy.
 """
 import os
 import json
+import math
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
 from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 from models_schemas import VideoBlueprint, SceneBlueprint, AnimationElement
 from config import Config
+from render_presets import get_preset
+from ffmpeg_tools import ffmpeg_command, concat_copy, probe_duration
+from narration_track import TrackPart, build_narration_track
+from audio_probe import audio_duration
+from clients import budget
+from instrumentation import in_context, span
 
 
 class SimpleVideoGenerator:
-    """Generates MP4 videos using PIL and moviepy."""
+    """Generates MP4 videos using PIL and ffmpeg."""
     
-    def __init__(self):
-        """Initialize the simple video generator."""
+    def __init__(self, preset: str = None):
+        """
+        Initialize the simple video generator.
+        
+        Args:
+            preset: Render preset name (default: Config.RENDER_PRESET, else production)
+        """
         self.output_dir = Config.OUTPUT_DIR
-        self.width = 1920
-        self.height = 1080
-        self.fps = 30
+        self.temp_dir = Config.TEMP_DIR
+        self.preset = get_preset(preset, default="production")
+        self.width = self.preset.width
+        self.height = self.preset.height
+        self.fps = self.preset.fps
+        self.fade_seconds = Config.SIMPLE_FADE_SECONDS
+        self._fonts = None
     
-    def generate(self, blueprint: VideoBlueprint, output_path: str):
+    def render_signature(self) -> dict:
+        """Settings that change the rendered output (used to validate resumed runs)."""
+        return {
+            "renderer": "simple",
+            "preset": self.preset.name,
+            "size": [self.width, self.height],
+            "fps": self.fps,
+            "fade_seconds": self.fade_seconds,
+            "backend": Config.SIMPLE_RENDER_BACKEND
+        }
+    
+    def generate(self, blueprint: VideoBlueprint, output_path: str, audio_dir: str = None):
         """
         Generate a video from a blueprint.
         
         Args:
             blueprint: The animation blueprint
             output_path: Path to save the final video
+            audio_dir: Directory with scene narration (default: derived from topic)
         """
+        scene_files = self.render_scenes(blueprint)
+        
+        # Combine scenes with their narration
+        if scene_files:
+            self.compose_scenes(blueprint, scene_files, output_path, audio_dir)
+        
+        return scene_files
+    
+    def render_scenes(self, blueprint: VideoBlueprint) -> list:
+        """Render every scene as an image (no audio needed)."""
         print(f"[VIDEO] Generating video for: {blueprint.topic}")
         print(f"  Total scenes: {len(blueprint.scene_blueprints)}")
         print(f"  Using simple image-based renderer")
@@ -45,48 +94,118 @@ class SimpleVideoGenerator:
             except Exception as e:
                 print(f"    [X] Error creating scene {scene_bp.scene_number}: {e}")
         
-        # Combine scenes with audio using moviepy
-        if scene_files:
-            print(f"\n  Composing final video...")
+        return scene_files
+    
+    def render_previews(self, blueprint: VideoBlueprint) -> Dict[int, str]:
+        """
+        Draw every scene's final frame, in parallel.
+        
+        Returns:
+            Scene number -> PNG path, in scene order (failed scenes are left out)
+        """
+        print(f"[PREVIEW] Drawing last frames for: {blueprint.topic}")
+        
+        def draw(scene_bp: SceneBlueprint) -> Optional[str]:
             try:
-                self.compose_video(blueprint, scene_files, output_path)
-                print(f"[OK] Video generation complete")
-                print(f"  Output: {output_path}")
+                return self.render_scene_image(scene_bp)
             except Exception as e:
-                print(f"[X] Error composing video: {e}")
-                print(f"  Scene images saved in: {self.output_dir}")
+                print(f"    [X] Error creating scene {scene_bp.scene_number}: {e}")
+                return None
         
-        return scene_files
+        workers = max(1, min(len(blueprint.scene_blueprints), Config.RENDER_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            images = list(executor.map(in_context(draw), blueprint.scene_blueprints))
+        return {
+            scene_bp.scene_number: image
+            for scene_bp, image in zip(blueprint.scene_blueprints, images) if image
+        }
+    
+    def render_scene_stream(self, scene_blueprints) -> tuple:
+        """
+        Render scene blueprints as they arrive (e.g. from a streaming generator).
+        
+        Returns:
+            (scene blueprints, scene image paths), both in scene order
+        """
+        rendered = []
+        for scene_bp in scene_blueprints:
+            try:
+                scene_file = self.render_scene_image(scene_bp)
+                rendered.append((scene_bp, scene_file))
+                print(f"    [OK] Scene {scene_bp.scene_number} image created")
+            except Exception as e:
+                rendered.append((scene_bp, None))
+                print(f"    [X] Error creating scene {scene_bp.scene_number}: {e}")
+        
+        rendered.sort(key=lambda item: item[0].scene_number)
+        scene_bps = [scene_bp for scene_bp, _ in rendered]
+        scene_files = [scene_file for _, scene_file in rendered if scene_file]
+        return scene_bps, scene_files
+    
+    def compose_scenes(self, blueprint: VideoBlueprint, scene_files: list, output_path: str,
+                       audio_dir: str = None):
+        """Compose rendered scene images and narration into the final video."""
+        print(f"\n  Composing final video...")
+        try:
+            if Config.SIMPLE_RENDER_BACKEND == "moviepy":
+                self.compose_video(blueprint, scene_files, output_path, audio_dir)
+            else:
+                try:
+                    self.encode_video(blueprint, scene_files, output_path, audio_dir)
+                except FileNotFoundError:
+                    print(f"  [WARN] ffmpeg not found ({Config.FFMPEG_BINARY}), falling back to moviepy")
+                    self.compose_video(blueprint, scene_files, output_path, audio_dir)
+            print(f"[OK] Video generation complete")
+            print(f"  Output: {output_path}")
+        except Exception as e:
+            print(f"[X] Error composing video: {e}")
+            print(f"  Scene images saved in: {self.output_dir}")
     
     def render_scene_image(self, scene_bp: SceneBlueprint) -> str:
         """Render a single scene as a static image."""
+        with span("draw", "render", scene=scene_bp.scene_number) as call:
+            img = self._draw_scene(scene_bp, scene_bp.elements)
+            
+            # Save image
+            output_file = self.scene_image_path(scene_bp.scene_number)
+            img.save(output_file)
+            call.add_file(output_file)
+        
+        return output_file
+    
+    def scene_image_path(self, scene_number: int) -> str:
+        return os.path.join(self.output_dir, f"scene_{scene_number}.png")
+    
+    def _draw_scene(self, scene_bp: SceneBlueprint, elements: List[AnimationElement]) -> Image.Image:
+        """Draw the given elements on the scene background."""
         # Create image with dark background
         bg_color = self._hex_to_rgb(scene_bp.background_color)
         img = Image.new('RGB', (self.width, self.height), bg_color)
         draw = ImageDraw.Draw(img)
         
-        # Try to load a font, fallback to default
-        try:
-            font_large = ImageFont.truetype("arial.ttf", 48)
-            font_medium = ImageFont.truetype("arial.ttf", 32)
-            font_small = ImageFont.truetype("arial.ttf", 24)
-        except:
-            font_large = ImageFont.load_default()
-            font_medium = ImageFont.load_default()
-            font_small = ImageFont.load_default()
+        font_medium, font_small = self._load_fonts()
         
         # Center point
         cx, cy = self.width // 2, self.height // 2
         
         # Draw elements
-        for elem in scene_bp.elements:
+        for elem in elements:
             self._draw_element(draw, elem, cx, cy, font_medium, font_small)
         
-        # Save image
-        output_file = os.path.join(self.output_dir, f"scene_{scene_bp.scene_number}.png")
-        img.save(output_file)
-        
-        return output_file
+        return img
+    
+    def _load_fonts(self) -> tuple:
+        """Load the label fonts once, falling back to PIL's default font."""
+        if self._fonts is None:
+            try:
+                self._fonts = (ImageFont.truetype("arial.ttf", self._px(32)), ImageFont.truetype("arial.ttf", self._px(24)))
+            except OSError:
+                self._fonts = (ImageFont.load_default(), ImageFont.load_default())
+        return self._fonts
+    
+    def _px(self, size: float) -> int:
+        """Scale a pixel size designed for 1080p to the current frame height."""
+        return max(1, round(size * self.height / 1080))
     
     def _draw_element(self, draw, elem: AnimationElement, cx, cy, font_medium, font_small):
         """Draw a single element on the image."""
@@ -116,7 +235,7 @@ class SimpleVideoGenerator:
             right = px + pw/2
             bottom = py + ph/2
             
-            draw.rectangle([left, top, right, bottom], outline=color, width=5)
+            draw.rectangle([left, top, right, bottom], outline=color, width=self._px(5))
             
             # Draw label ABOVE the rectangle (anti-overlap rule)
             if elem.label:
@@ -138,7 +257,7 @@ class SimpleVideoGenerator:
                 
                 # Position label ABOVE the rectangle (y - height/2 - spacing)
                 label_x = px - text_w/2
-                label_y = top - text_h - 15  # 15px spacing above rectangle
+                label_y = top - text_h - self._px(15)  # 15px (at 1080p) spacing above rectangle
                 draw.text((label_x, label_y), elem.label, fill=(255, 255, 255), font=font_label)
         
         elif elem.element_type == "circle":
@@ -151,7 +270,7 @@ class SimpleVideoGenerator:
             pr = r * scale_x
             
             # Draw circle
-            draw.ellipse([px-pr, py-pr, px+pr, py+pr], outline=color, width=5)
+            draw.ellipse([px-pr, py-pr, px+pr, py+pr], outline=color, width=self._px(5))
             
             # Draw label
             if elem.label:
@@ -172,12 +291,11 @@ class SimpleVideoGenerator:
             py2 = cy - (y_end * scale_y)
             
             # Draw line
-            draw.line([px1, py1, px2, py2], fill=color, width=5)
+            draw.line([px1, py1, px2, py2], fill=color, width=self._px(5))
             
             # Draw arrowhead (simple triangle)
-            import math
             angle = math.atan2(py2 - py1, px2 - px1)
-            arrow_size = 20
+            arrow_size = self._px(20)
             
             p1 = (px2, py2)
             p2 = (px2 - arrow_size * math.cos(angle - math.pi/6),
@@ -190,13 +308,13 @@ class SimpleVideoGenerator:
             # Draw label FAR ABOVE the arrow (anti-overlap rule)
             if elem.label:
                 mid_x = (px1 + px2) / 2
-                mid_y = (py1 + py2) / 2 - 60  # Increased from 30 to 60 for better spacing
+                mid_y = (py1 + py2) / 2 - self._px(60)  # Increased from 30 to 60 for better spacing
                 bbox = draw.textbbox((0, 0), elem.label, font=font_small)
                 text_w = bbox[2] - bbox[0]
                 text_h = bbox[3] - bbox[1]
                 
                 # Add background for better visibility
-                padding = 5
+                padding = self._px(5)
                 bg_left = mid_x - text_w/2 - padding
                 bg_top = mid_y - padding
                 bg_right = mid_x + text_w/2 + padding
@@ -221,8 +339,173 @@ class SimpleVideoGenerator:
                 text_h = bbox[3] - bbox[1]
                 draw.text((px - text_w/2, py - text_h/2), elem.label, fill=color, font=font_medium)
     
-    def compose_video(self, blueprint: VideoBlueprint, scene_images: list, output_path: str):
-        """Compose final video from scene images and audio."""
+    def encode_video(self, blueprint: VideoBlueprint, scene_images: list, output_path: str,
+                     audio_dir: str = None):
+        """
+        Encode each scene straight to an ffmpeg segment, then join the segments
+        with one continuous narration track.
+        
+        Args:
+            blueprint: The animation blueprint
+            scene_images: Rendered scene images (scenes without one are skipped)
+            output_path: Path to save the final video
+            audio_dir: Directory with scene narration (default: derived from topic)
+        """
+        if not audio_dir:
+            audio_dir = os.path.join(self.output_dir, f"{blueprint.topic.lower().replace(' ', '_')}_video_audio")
+        
+        scenes = []
+        for scene_bp in blueprint.scene_blueprints:
+            img_path = self.scene_image_path(scene_bp.scene_number)
+            if img_path not in scene_images:
+                continue
+            audio_path = os.path.join(audio_dir, f"scene_{scene_bp.scene_number}_narration.mp3")
+            scenes.append((scene_bp, img_path, audio_path if os.path.exists(audio_path) else None))
+        
+        os.makedirs(self.temp_dir, exist_ok=True)
+        segments = [
+            os.path.join(self.temp_dir, f"scene_{scene_bp.scene_number}_segment.mp4")
+            for scene_bp, _, _ in scenes
+        ]
+        
+        def encode(args):
+            scene_bp, segment_path = args[0], args[3]
+            # Encoders share the process-wide render budget with other runs
+            with budget("render"), span("encode", "encode", scene=scene_bp.scene_number) as call:
+                duration = self.encode_scene(*args)
+                call.add_file(segment_path)
+            return duration
+        
+        workers = max(1, min(len(scenes), Config.RENDER_WORKERS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            durations = list(executor.map(
+                in_context(encode),
+                [(scene_bp, img_path, audio_path, segment)
+                 for (scene_bp, img_path, audio_path), segment in zip(scenes, segments)]
+            ))
+        
+        track_path = None
+        if any(audio_path for _, _, audio_path in scenes):
+            # One narration track for the whole video, cut to the segments' measured
+            # lengths (or the length they were cut to, if ffmpeg reports none)
+            track_path = os.path.join(self.temp_dir, "narration.m4a")
+            build_narration_track([
+                TrackPart(scene_number=scene_bp.scene_number, audio=audio_path,
+                          duration=probe_duration(segment) or duration)
+                for (scene_bp, _, audio_path), segment, duration in zip(scenes, segments, durations)
+            ], track_path)
+        
+        with span("concat", "assembly") as call:
+            concat_copy(segments, output_path, os.path.join(self.temp_dir, "segments.txt"), audio=track_path)
+            call.add_file(output_path)
+        for path in segments + ([track_path] if track_path else []):
+            os.remove(path)
+    
+    def encode_scene(self, scene_bp: SceneBlueprint, img_path: str, audio_path: Optional[str],
+                     segment_path: str) -> float:
+        """
+        Encode one scene as an H.264 segment (video only).
+        
+        The scene lasts as long as its narration (or its blueprint duration
+        without one); the narration itself goes into the continuous track.
+        Elements fade in at their blueprint timing; when fades are disabled
+        the finished image is looped as a still.
+        
+        Returns:
+            The length the segment was cut to, in seconds
+        """
+        duration = (audio_duration(audio_path) if audio_path else None) or scene_bp.duration
+        total_frames = max(1, round(duration * self.fps))
+        
+        if self.fade_seconds > 0 and scene_bp.elements:
+            frames = self._fade_frames(scene_bp, total_frames)
+            video_input = [
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{self.width}x{self.height}",
+                "-framerate", str(self.fps), "-i", "-"
+            ]
+            tune = []
+        else:
+            frames = None
+            video_input = ["-framerate", str(self.fps), "-i", img_path]
+            tune = ["-tune", "stillimage"]
+        # Only the animated frames (or the single still) are sent; ffmpeg clones
+        # the last one, after colour conversion so each copy costs only the encoder
+        video_filter = ["-vf", f"format=yuv420p,tpad=stop_mode=clone:stop_duration={duration:.3f}", *tune]
+        
+        cmd = ffmpeg_command(
+            *video_input,
+            "-map", "0:v", *video_filter,
+            *self.preset.x264_args(fps=self.fps),
+            "-an",
+            "-t", f"{duration:.3f}",
+            segment_path
+        )
+        process = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE if frames is not None else subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+        try:
+            if frames is not None:
+                for frame in frames:
+                    process.stdin.write(frame)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its error is reported below
+        stderr = process.communicate()[1]  # also closes stdin, ending the frame stream
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"ffmpeg failed on scene {scene_bp.scene_number}: {stderr.decode(errors='replace').strip()}"
+            )
+        return duration
+    
+    def _fade_frames(self, scene_bp: SceneBlueprint, total_frames: int):
+        """
+        Yield raw RGB frames until the last element has faded in.
+        
+        Elements sharing a timing are drawn as one layer. A layer keeps only
+        its bounding box: the finished pixels (baked into one running settled
+        frame once its fade ends) and the change it fades in.
+        """
+        elements = sorted(scene_bp.elements, key=lambda e: e.timing)
+        drawn = []
+        previous = np.asarray(self._draw_scene(scene_bp, []), dtype=np.uint8)
+        settled = previous.copy()
+        layers = []  # (start time, bbox slices, finished pixels within bbox, delta within bbox)
+        for timing, group in groupby(elements, key=lambda e: e.timing):
+            drawn.extend(group)
+            current = np.asarray(self._draw_scene(scene_bp, drawn), dtype=np.uint8)
+            changed = np.any(current != previous, axis=2)
+            rows, cols = np.any(changed, axis=1), np.any(changed, axis=0)
+            if rows.any():
+                y0, y1 = np.argmax(rows), len(rows) - np.argmax(rows[::-1])
+                x0, x1 = np.argmax(cols), len(cols) - np.argmax(cols[::-1])
+                box = (slice(y0, y1), slice(x0, x1))
+                patch = current[box].copy()
+                layers.append((max(0.0, timing), box, patch, patch.astype(np.int16) - previous[box]))
+            previous = current
+        
+        done = 0
+        end = layers[-1][0] + self.fade_seconds if layers else 0
+        anim_frames = min(total_frames, max(1, math.ceil(end * self.fps) + 1))
+        for index in range(anim_frames):
+            t = index / self.fps
+            # Layers finish in start order; each one only changes its own box
+            while done < len(layers) and t >= layers[done][0] + self.fade_seconds:
+                _, box, patch, _ = layers[done]
+                settled[box] = patch
+                done += 1
+            frame = settled
+            active = [layer for layer in layers[done:] if layer[0] <= t]
+            if active:
+                frame = settled.astype(np.int16)
+                for start, box, _, delta in active:
+                    alpha = (t - start) / self.fade_seconds
+                    frame[box] += (delta * alpha).astype(np.int16)
+                frame = np.clip(frame, 0, 255).astype(np.uint8)
+            yield frame.tobytes()
+    
+    def compose_video(self, blueprint: VideoBlueprint, scene_images: list, output_path: str,
+                      audio_dir: str = None):
+        """Compose final video from scene images and audio (moviepy fallback)."""
         try:
             try:
                 from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips, CompositeAudioClip
@@ -230,7 +513,8 @@ class SimpleVideoGenerator:
                 from moviepy import ImageClip, AudioFileClip, concatenate_videoclips, CompositeAudioClip
                 
             clips = []
-            audio_dir = os.path.join(self.output_dir, f"{blueprint.topic.lower().replace(' ', '_')}_video_audio")
+            if not audio_dir:
+                audio_dir = os.path.join(self.output_dir, f"{blueprint.topic.lower().replace(' ', '_')}_video_audio")
             
             for i, (scene_bp, img_path) in enumerate(zip(blueprint.scene_blueprints, scene_images)):
                 # Add audio if available and set duration based on audio length
@@ -259,15 +543,19 @@ class SimpleVideoGenerator:
             final_clip = concatenate_videoclips(clips, method="compose")
             
             # Write video file
-            final_clip.write_videofile(
-                output_path,
-                fps=self.fps,
-                codec='libx264',
-                audio_codec='aac',
-                temp_audiofile='temp-audio.m4a',
-                remove_temp=True,
-                logger=None  # Suppress moviepy output
-            )
+            with span("moviepy_encode", "encode") as call:
+                final_clip.write_videofile(
+                    output_path,
+                    fps=self.fps,
+                    codec='libx264',
+                    preset=self.preset.x264_preset,
+                    ffmpeg_params=["-crf", str(self.preset.crf)],
+                    audio_codec='aac',
+                    temp_audiofile='temp-audio.m4a',
+                    remove_temp=True,
+                    logger=None  # Suppress moviepy output
+                )
+                call.add_file(output_path)
             
             # Clean up
             final_clip.close()
@@ -0,0 +1,111 @@
+"""
+DAG-based stage executor for the video pipeline.
+Stages run as soon as their dependencies finish, so independent work
+(e.g. narration and blueprint generation) overlaps.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from instrumentation import in_context, stage
+
+
+class StageExecutor:
+    """Runs named pipeline stages concurrently, respecting dependencies."""
+    
+    def __init__(self, max_workers: int = 4):
+        """
+        Initialize the executor.
+        
+        Args:
+            max_workers: Maximum stages running at the same time
+        """
+        self.max_workers = max_workers
+        self.stages: Dict[str, Tuple[Callable, Tuple[str, ...]]] = {}
+        self.results: Dict[str, Any] = {}
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self._origin = None
+    
+    def add(self, name: str, fn: Callable, deps: Sequence[str] = ()):
+        """
+        Register a stage.
+        
+        Args:
+            name: Unique stage name
+            fn: Called with the results of deps, in order
+            deps: Names of stages that must finish first
+        """
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' already registered")
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self.stages[name] = (fn, tuple(deps))
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Execute all stages.
+        
+        Returns:
+            Mapping of stage name to its return value
+        """
+        self._origin = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                for name in [n for n, (_, deps) in pending.items()
+                             if all(d in self.results for d in deps)]:
+                    fn, deps = pending.pop(name)
+                    args = [self.results[d] for d in deps]
+                    running[pool.submit(in_context(self._timed), name, fn, args)] = name
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except Exception:
+                        # Don't start anything new; let in-flight stages finish
+                        for other in running:
+                            other.cancel()
+                        raise
+        
+        return self.results
+    
+    def _timed(self, name: str, fn: Callable, args: List[Any]) -> Any:
+        start = time.perf_counter()
+        try:
+            with stage(name):
+                return fn(*args)
+        finally:
+            end = time.perf_counter()
+            self.timings[name] = {
+                "start": round(start - self._origin, 3),
+                "end": round(end - self._origin, 3),
+                "wall": round(end - start, 3)
+            }
+    
+    def critical_path(self) -> List[str]:
+        """Chain of stages that determined the total run time."""
+        if not self.timings:
+            return []
+        path = [max(self.timings, key=lambda n: self.timings[n]["end"])]
+        while True:
+            deps = self.stages[path[-1]][1]
+            if not deps:
+                break
+            path.append(max(deps, key=lambda d: self.timings[d]["end"]))
+        return list(reversed(path))
+    
+    def report(self) -> dict:
+        """Per-stage wall times, the critical path and the time saved by overlap."""
+        total = max((t["end"] for t in self.timings.values()), default=0.0)
+        serial = sum(t["wall"] for t in self.timings.values())
+        return {
+            "stages": self.timings,
+            "critical_path": self.critical_path(),
+            "total_seconds": round(total, 3),
+            "sequential_seconds": round(serial, 3),
+            "saved_seconds": round(serial - total, 3)
+        }
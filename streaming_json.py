@@ -0,0 +1,199 @@
+"""
+Incremental, tolerant JSON parser for streamed LLM output.
+Text is fed chunk by chunk as tokens arrive; every object is reported as
+soon as its closing brace is read, and truncated output is repaired from
+the parser's own stack rather than by counting characters.
+"""
+import re
+import html
+import json
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",:]}"
+_LITERALS = {"true": True, "false": False, "null": None}
+_PLAIN_STRING = re.compile(r'[^"\\]*')
+_STRING_DECODER = json.JSONDecoder(strict=False)
+
+
+class StreamingJSONParser:
+    """
+    Single-pass JSON object parser that accepts partial input.
+    
+    Tolerates what models commonly get wrong: prose or markdown fences
+    around the object, trailing commas, HTML entities inside strings and
+    responses cut off part-way. Each character is examined once, so parsing
+    a response chunk by chunk costs no more than parsing it whole.
+    """
+    
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.root: Optional[dict] = None
+        self.done = False
+        # Open containers, innermost last: [container, pending dict key, path]
+        self._stack: List[list] = []
+        self._chunks: List[str] = []
+        self._token = None  # None, "string" or "scalar"
+        self._buf: List[str] = []
+        self._escape = False
+    
+    @property
+    def text(self) -> str:
+        """Everything fed so far (for debugging failed responses)."""
+        return "".join(self._chunks)
+    
+    def feed(self, chunk: str) -> List[Tuple[tuple, dict]]:
+        """
+        Consume the next piece of text.
+        
+        Args:
+            chunk: Any slice of the response, e.g. one streamed token delta
+        
+        Returns:
+            (path, object) for every object closed by this chunk, innermost
+            first. path holds the keys and indices from the root, e.g.
+            ("scene_blueprints", 0, "elements", 2).
+        """
+        self._chunks.append(chunk)
+        completed = []
+        i, n = 0, len(chunk)
+        while i < n and not self.done:
+            if self._token == "string":
+                i = self._read_string(chunk, i)
+                continue
+            
+            ch = chunk[i]
+            if self._token == "scalar":
+                if ch not in _DELIMITERS:
+                    self._buf.append(ch)
+                    i += 1
+                    continue
+                self._finish_scalar()
+            
+            if not self._stack:
+                # Skip anything before the root object (prose, ``` fences)
+                if ch == "{":
+                    self._open({})
+            elif ch == "{":
+                self._open({})
+            elif ch == "[":
+                self._open([])
+            elif ch in "}]":
+                # Trailing commas need no handling: separators are never required
+                closed = self._close()
+                if closed:
+                    completed.append(closed)
+            elif ch == '"':
+                self._token = "string"
+                self._buf = []
+            elif ch not in _WHITESPACE and ch not in ",:":
+                self._token = "scalar"
+                self._buf = [ch]
+            i += 1
+        return completed
+    
+    def close(self) -> dict:
+        """
+        Finish parsing and return the root object.
+        
+        If the input was cut off, the unfinished string or number and any key
+        still waiting for its value are dropped, and every open container is
+        closed where it stands.
+        
+        Raises:
+            json.JSONDecodeError: If no JSON object was found at all
+        """
+        if self.root is None:
+            raise json.JSONDecodeError("No JSON object found", self.text, 0)
+        if not self.done:
+            # Containers are attached to their parents when opened, so
+            # closing them is just forgetting the partial token and stack
+            self._token = None
+            self._buf = []
+            self._stack = []
+            self.done = True
+        return self.root
+    
+    def _read_string(self, chunk: str, i: int) -> int:
+        n = len(chunk)
+        if self._escape:
+            self._buf.append(chunk[i])
+            self._escape = False
+            i += 1
+        while i < n:
+            j = _PLAIN_STRING.match(chunk, i).end()
+            self._buf.append(chunk[i:j])
+            if j == n:
+                return n
+            if chunk[j] == "\\":
+                self._buf.append("\\")
+                if j + 1 == n:
+                    self._escape = True
+                    return n
+                self._buf.append(chunk[j + 1])
+                i = j + 2
+                continue
+            # Closing quote
+            self._token = None
+            self._add(self._decode_string("".join(self._buf)))
+            return j + 1
+        return n
+    
+    def _decode_string(self, raw: str) -> str:
+        try:
+            value = _STRING_DECODER.decode(f'"{raw}"')
+        except ValueError:
+            value = raw
+        if "&" in value:
+            value = html.unescape(value)
+        return value
+    
+    def _finish_scalar(self):
+        raw = "".join(self._buf)
+        self._token = None
+        if raw in _LITERALS:
+            self._add(_LITERALS[raw])
+            return
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            raise json.JSONDecodeError(f"Invalid literal {raw!r}", self.text, len(self.text))
+        self._add(value)
+    
+    def _add(self, value: Any):
+        frame = self._stack[-1]
+        container = frame[0]
+        if isinstance(container, list):
+            container.append(value)
+        elif frame[1] is None:
+            if isinstance(value, str):
+                frame[1] = value
+        else:
+            container[frame[1]] = value
+            frame[1] = None
+    
+    def _open(self, container):
+        if not self._stack:
+            self.root = container
+            path = ()
+        else:
+            parent = self._stack[-1]
+            key = len(parent[0]) if isinstance(parent[0], list) else parent[1]
+            path = parent[2] + (key,)
+            self._add(container)
+        self._stack.append([container, None, path])
+    
+    def _close(self) -> Optional[Tuple[tuple, dict]]:
+        container, _, path = self._stack.pop()
+        if not self._stack:
+            self.done = True
+        if isinstance(container, dict):
+            return path, container
+        return None
+
+
+def parse_json_tolerant(content: str) -> dict:
+    """Parse a complete (possibly fenced, truncated or sloppy) JSON object."""
+    parser = StreamingJSONParser()
+    parser.feed(content)
+    return parser.close()
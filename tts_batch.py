@@ -0,0 +1,190 @@
+"""
+Concurrent batch synthesis of scene narration.
+Async backends (Edge TTS) share one event loop; blocking backends (gTTS,
+OpenAI TTS) run on a thread pool. Both cap concurrency, retry with
+exponential backoff and return audio paths in scene order. Every request
+also takes a slot from the process-wide "tts" budget, so concurrent runs
+share one limit. Jobs with a cache key are served from the narration cache
+(see tts_cache) when possible, and stored in it after synthesis.
+With chunking on, long narration is split at sentence boundaries and the
+chunks are synthesized concurrently, then joined gaplessly (see tts_chunks).
+Word timings returned by the backend are saved as a sidecar to the audio.
+"""
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Optional, Tuple
+from pydantic import BaseModel
+from config import Config
+from clients import budget, budget_async
+from instrumentation import in_context, span
+from tts_cache import TTSCache, discard
+from tts_chunks import (WordTiming, split_sentences, chunk_path, join_chunks, offset_words,
+                        word_timings_path, save_word_timings)
+
+# synthesize(text, output_path) may return the word timings of what it spoke
+Words = Optional[List[WordTiming]]
+
+
+class TTSJob(BaseModel):
+    """Narration for one scene."""
+    scene_number: int
+    text: str
+    output_path: str
+    cache_key: Optional[str] = None     # Narration cache key (see TTSCache.make_key)
+
+
+def _restored(job: TTSJob, cache: Optional[TTSCache], call) -> bool:
+    """Serve a job from the narration cache, if it is there."""
+    if not (cache and job.cache_key and cache.restore(job.cache_key, job.output_path)):
+        return False
+    call.set(cached=True)
+    print(f"  [OK] Scene {job.scene_number} audio reused from cache")
+    return True
+
+
+def _chunks(job: TTSJob, chunk_chars: Optional[int]) -> List[Tuple[str, str]]:
+    """(text, path) of each chunk to synthesize; the job's own path if it is not split."""
+    texts = split_sentences(job.text, chunk_chars)
+    if len(texts) == 1:
+        return [(job.text, job.output_path)]
+    return [(text, chunk_path(job.output_path, index)) for index, text in enumerate(texts)]
+
+
+def _prepare(job: TTSJob, chunks: List[Tuple[str, str]], call):
+    """Remove the job's earlier audio and word timings before synthesis."""
+    discard(job.output_path)
+    discard(word_timings_path(job.output_path))
+    if len(chunks) > 1:
+        call.set(chunks=len(chunks))
+
+
+def _finish(job: TTSJob, chunks: List[Tuple[str, str]], chunk_words: List[Words],
+            cache: Optional[TTSCache], call):
+    """Join the chunks, write the word timings and store the result in the cache."""
+    paths = [path for _, path in chunks]
+    words = offset_words(chunk_words, paths) if any(chunk_words) else None
+    join_chunks(paths, job.output_path)
+    if words:
+        save_word_timings(words, job.output_path)
+    call.add_file(job.output_path)
+    if cache and job.cache_key:
+        cache.put(job.cache_key, job.output_path)
+
+
+def _saved_note(chunks: List[Tuple[str, str]]) -> str:
+    return f" ({len(chunks)} chunks)" if len(chunks) > 1 else ""
+
+
+def synthesize_threaded(jobs: List[TTSJob], synthesize: Callable[[str, str], Words],
+                        concurrency: int = None, max_retries: int = None,
+                        backoff: float = None, cache: TTSCache = None,
+                        chunk_chars: int = None) -> List[str]:
+    """
+    Run a blocking synthesize(text, output_path) for every job on a thread pool.
+    
+    Args:
+        cache: Narration cache for jobs with a cache_key (None = always synthesize)
+        chunk_chars: Split narration into sentence chunks of about this many
+            characters, synthesized in parallel (default: Config.TTS_CHUNK_CHARS; 0 = off)
+    
+    Returns:
+        Audio file paths in the same order as jobs
+    """
+    concurrency = concurrency or Config.TTS_CONCURRENCY
+    max_retries = Config.TTS_MAX_RETRIES if max_retries is None else max_retries
+    backoff = Config.TTS_RETRY_BACKOFF if backoff is None else backoff
+    
+    def run_chunk(job: TTSJob, text: str, output_path: str, call) -> Words:
+        for attempt in range(max_retries + 1):
+            try:
+                with budget("tts"):
+                    return synthesize(text, output_path)
+            except Exception as e:
+                if attempt == max_retries:
+                    raise
+                call.add("retries")
+                delay = backoff * (2 ** attempt)
+                print(f"  [WARN] Scene {job.scene_number} TTS failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+    
+    def run_one(job: TTSJob) -> str:
+        with span("tts", "tts", scene=job.scene_number, characters=len(job.text)) as call:
+            if _restored(job, cache, call):
+                return job.output_path
+            chunks = _chunks(job, chunk_chars)
+            _prepare(job, chunks, call)
+            if len(chunks) == 1:
+                chunk_words = [run_chunk(job, *chunks[0], call)]
+            else:
+                # Chunks get their own pool: waiting on them from this one could deadlock
+                chunk_words = list(chunk_pool.map(in_context(lambda chunk: run_chunk(job, *chunk, call)), chunks))
+            _finish(job, chunks, chunk_words, cache, call)
+        print(f"  [OK] Scene {job.scene_number} audio saved{_saved_note(chunks)}")
+        return job.output_path
+    
+    if not jobs:
+        return []
+    with ThreadPoolExecutor(max_workers=concurrency) as chunk_pool:
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(jobs))) as pool:
+            return list(pool.map(in_context(run_one), jobs))
+
+
+async def synthesize_async(jobs: List[TTSJob], synthesize: Callable[[str, str], Awaitable[Words]],
+                           concurrency: int = None, max_retries: int = None,
+                           backoff: float = None, cache: TTSCache = None,
+                           chunk_chars: int = None) -> List[str]:
+    """
+    Await synthesize(text, output_path) for every job on the current event loop.
+    
+    Args:
+        cache: Narration cache for jobs with a cache_key (None = always synthesize)
+        chunk_chars: Split narration into sentence chunks of about this many
+            characters, synthesized in parallel (default: Config.TTS_CHUNK_CHARS; 0 = off)
+    
+    Returns:
+        Audio file paths in the same order as jobs
+    """
+    concurrency = concurrency or Config.TTS_CONCURRENCY
+    max_retries = Config.TTS_MAX_RETRIES if max_retries is None else max_retries
+    backoff = Config.TTS_RETRY_BACKOFF if backoff is None else backoff
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_chunk(job: TTSJob, text: str, output_path: str, call) -> Words:
+        async with semaphore:
+            for attempt in range(max_retries + 1):
+                try:
+                    async with budget_async("tts"):
+                        return await synthesize(text, output_path)
+                except Exception as e:
+                    if attempt == max_retries:
+                        raise
+                    call.add("retries")
+                    delay = backoff * (2 ** attempt)
+                    print(f"  [WARN] Scene {job.scene_number} TTS failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+    
+    async def run_one(job: TTSJob) -> str:
+        with span("tts", "tts", scene=job.scene_number, characters=len(job.text)) as call:
+            if _restored(job, cache, call):
+                return job.output_path
+            chunks = _chunks(job, chunk_chars)
+            _prepare(job, chunks, call)
+            chunk_words = await asyncio.gather(*(run_chunk(job, text, path, call) for text, path in chunks))
+            # Joining runs ffmpeg, so it is kept off the event loop
+            await asyncio.to_thread(_finish, job, chunks, list(chunk_words), cache, call)
+        print(f"  [OK] Scene {job.scene_number} audio saved{_saved_note(chunks)}")
+        return job.output_path
+    
+    return list(await asyncio.gather(*(run_one(job) for job in jobs)))
+
+
+def run_coroutine(coro):
+    """Run a coroutine to completion, even if this thread already has a running loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # A loop is already running here (e.g. Jupyter); use a fresh loop on a worker thread
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(in_context(asyncio.run), coro).result()
@@ -0,0 +1,164 @@
+"""
+Content-addressed cache for synthesized narration.
+Audio is stored under a hash of the TTS backend, voice, backend options
+(rate, language, model) and the normalized narration text, and hard-linked
+(or copied) into each run's audio directory, so unchanged narration is never
+synthesized twice. Word timing sidecars (see tts_chunks) are cached with
+their audio.
+"""
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+import unicodedata
+import uuid
+from typing import Optional
+from config import Config
+from tts_chunks import word_timings_path
+
+
+def normalize_text(text: str) -> str:
+    """Narration text as it matters to the voice: Unicode NFC, whitespace collapsed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class TTSCache:
+    """Stores synthesized MP3s keyed by backend, voice, options and text."""
+    
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        """
+        Initialize the narration cache.
+        
+        Args:
+            cache_dir: Directory holding cached MP3s (default: Config.TTS_CACHE_DIR)
+            max_bytes: Size limit before least-recently-used entries are evicted
+        """
+        self.cache_dir = cache_dir or Config.TTS_CACHE_DIR
+        self.max_bytes = max_bytes or Config.TTS_CACHE_MAX_MB * 1024 * 1024
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    def make_key(self, backend: str, voice: str, text: str, **options) -> str:
+        """
+        Hash everything that changes the synthesized audio.
+        
+        Args:
+            backend: "edge", "openai" or "gtts"
+            voice: Voice name (or language for gTTS)
+            text: Narration text (normalized before hashing)
+            **options: Other backend settings, e.g. rate="+0%" or model="tts-1"
+        """
+        digest = hashlib.sha256()
+        for part in (backend, voice, json.dumps(options, sort_keys=True), normalize_text(text)):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached audio path for a key, or None on a miss."""
+        path = self._path(key)
+        if not os.path.exists(path):
+            with self._lock:
+                self.misses += 1
+            return None
+        # Touch so eviction treats this entry as recently used
+        os.utime(path, None)
+        with self._lock:
+            self.hits += 1
+        return path
+    
+    def put(self, key: str, audio_path: str) -> str:
+        """Copy freshly synthesized audio (and its word timings, if any) into the cache."""
+        path = self._path(key)
+        # The sidecar goes first, so a cached MP3 never lacks timings it was made with
+        words_path = word_timings_path(audio_path)
+        if os.path.exists(words_path):
+            _copy_atomic(words_path, word_timings_path(path))
+        else:
+            discard(word_timings_path(path))
+        _copy_atomic(audio_path, path)
+        self.evict()
+        return path
+    
+    def restore(self, key: str, output_path: str) -> bool:
+        """
+        Place cached audio at output_path: a hard link, or a copy across filesystems.
+        
+        Returns:
+            False on a cache miss
+        """
+        cached = self.get(key)
+        if cached is None:
+            return False
+        os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+        discard(output_path)
+        try:
+            os.link(cached, output_path)
+        except OSError:
+            shutil.copy(cached, output_path)
+        words_path = word_timings_path(output_path)
+        discard(words_path)
+        if os.path.exists(word_timings_path(cached)):
+            shutil.copy(word_timings_path(cached), words_path)
+        return True
+    
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits its size limit."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".mp3"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+            discard(word_timings_path(path))
+    
+    def stats(self) -> dict:
+        """Hit/miss counts so far."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+
+def _copy_atomic(source: str, path: str):
+    """Copy a file into the cache so readers never see it half-written."""
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    shutil.copy(source, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def discard(path: str):
+    """
+    Remove a file before it is rewritten.
+    
+    Run audio may be a hard link to a cache entry; writing through the link
+    would change the cached audio too, so the link is removed instead.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def get_tts_cache() -> Optional[TTSCache]:
+    """The narration cache, or None when Config.TTS_CACHE_ENABLED is off."""
+    return TTSCache() if Config.TTS_CACHE_ENABLED else None
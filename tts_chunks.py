@@ -0,0 +1,168 @@
+"""
+Sentence-chunked narration and spoken-word timings.
+Long narration is split at sentence boundaries so the chunks can be
+synthesized concurrently, then decoded and re-joined in one ffmpeg pass
+(encoder delay and padding are dropped, so there are no gaps at the seams).
+Word boundaries reported by the TTS backend (Edge TTS) are saved next to
+the audio as a JSON sidecar, shifted to the joined track's time base.
+"""
+import os
+import re
+import json
+from typing import List, Optional
+from pydantic import BaseModel
+from config import Config
+from ffmpeg_tools import run_ffmpeg
+from audio_probe import mp3_duration
+
+# A sentence ends at ., ! or ? (optionally followed by a closing quote or bracket)
+_SENTENCE_END_RE = re.compile(r"(?:(?<=[.!?])|(?<=[.!?][\"')\]]))\s+")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class WordTiming(BaseModel):
+    """One spoken word and when it is heard, in seconds from the start of the narration."""
+    word: str
+    start: float
+    end: float
+
+
+def split_sentences(text: str, max_chars: int = None) -> List[str]:
+    """
+    Split narration into chunks of whole sentences.
+    
+    Sentences are packed into chunks of up to max_chars characters; a longer
+    sentence becomes a chunk of its own. Cutting inside a sentence would
+    break the voice's intonation.
+    
+    Args:
+        text: Narration text
+        max_chars: Chunk size limit (default: Config.TTS_CHUNK_CHARS; 0 = one chunk)
+    
+    Returns:
+        Chunks in reading order (the whole text when it is not split)
+    """
+    max_chars = Config.TTS_CHUNK_CHARS if max_chars is None else max_chars
+    text = text.strip()
+    if max_chars <= 0 or len(text) <= max_chars:
+        return [text]
+    
+    chunks = []
+    for sentence in _SENTENCE_END_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if chunks and len(chunks[-1]) + 1 + len(sentence) <= max_chars:
+            chunks[-1] = f"{chunks[-1]} {sentence}"
+        else:
+            chunks.append(sentence)
+    return chunks or [text]
+
+
+def chunk_path(output_path: str, index: int) -> str:
+    """Where chunk index of a narration file is synthesized before joining."""
+    root, ext = os.path.splitext(output_path)
+    return f"{root}.part{index}{ext}"
+
+
+def join_chunks(chunk_paths: List[str], output_path: str):
+    """
+    Join synthesized chunks into one MP3 without gaps at the seams.
+    
+    The chunks are decoded (dropping each one's encoder delay and padding),
+    concatenated and encoded once. A single chunk is just moved into place.
+    The chunk files are removed afterwards.
+    """
+    if len(chunk_paths) == 1:
+        os.replace(chunk_paths[0], output_path)
+        return
+    try:
+        inputs = []
+        for path in chunk_paths:
+            inputs += ["-i", path]
+        streams = "".join(f"[{i}:a]" for i in range(len(chunk_paths)))
+        run_ffmpeg(*inputs, "-filter_complex", f"{streams}concat=n={len(chunk_paths)}:v=0:a=1",
+                   "-c:a", "libmp3lame", "-q:a", "4", output_path)
+    finally:
+        for path in chunk_paths:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def offset_words(chunk_words: List[Optional[List[WordTiming]]], chunk_paths: List[str]) -> List[WordTiming]:
+    """
+    Shift each chunk's word timings by the length of the chunks before it.
+    
+    Must run before join_chunks, which removes the chunk files.
+    
+    Args:
+        chunk_words: Word timings per chunk, relative to the chunk (None if not reported)
+        chunk_paths: The synthesized chunks, in order
+    """
+    words = []
+    offset = 0.0
+    for timings, path in zip(chunk_words, chunk_paths):
+        for timing in timings or []:
+            words.append(WordTiming(word=timing.word, start=round(timing.start + offset, 3),
+                                    end=round(timing.end + offset, 3)))
+        if len(chunk_paths) > 1:
+            offset += mp3_duration(path) or 0.0
+    return words
+
+
+def word_timings_path(audio_path: str) -> str:
+    """Word timing sidecar of a narration file: scene_1_narration.words.json."""
+    return f"{os.path.splitext(audio_path)[0]}.words.json"
+
+
+def save_word_timings(words: List[WordTiming], audio_path: str) -> str:
+    """Write the word timing sidecar for a narration file."""
+    path = word_timings_path(audio_path)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([word.model_dump() for word in words], f, indent=2)
+    return path
+
+
+def load_word_timings(audio_path: str) -> Optional[List[WordTiming]]:
+    """Word timings of a narration file, or None if it has no sidecar."""
+    path = word_timings_path(audio_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return [WordTiming(**word) for word in json.load(f)]
+
+
+def tokens(text: str) -> List[str]:
+    """Lower-case words of a text, without punctuation (for matching labels to speech)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def first_spoken(phrase: str, words: List[WordTiming]) -> Optional[float]:
+    """
+    When a phrase (e.g. an element's label) is first spoken.
+    
+    The whole phrase is looked for first, then its longest word (of at least
+    four letters), so "DNS Resolver" still matches "the resolver asks...".
+    
+    Returns:
+        Start time in seconds, or None if it is never spoken
+    """
+    wanted = tokens(phrase)
+    if not wanted:
+        return None
+    # Edge TTS may report a hyphenated or punctuated word as one boundary
+    spoken = []
+    for word in words:
+        for token in tokens(word.word):
+            spoken.append((token, word.start))
+    
+    spoken_tokens = [token for token, _ in spoken]
+    for i in range(len(spoken) - len(wanted) + 1):
+        if spoken_tokens[i:i + len(wanted)] == wanted:
+            return spoken[i][1]
+    longest = max(wanted, key=len)
+    if len(longest) >= 4:
+        for token, start in spoken:
+            if token == longest:
+                return start
+    return None
@@ -0,0 +1,386 @@
+"""
+Final video assembly with ffmpeg.
+Each scene video is fitted to its narration's length, then the segments are
+joined with the concat demuxer and muxed with one continuous narration track
+(see narration_track), built in a single pass to the segments' actual
+lengths. Video is stream-copied wherever possible; only scenes whose
+narration outlasts the animation are re-encoded (to hold the last frame),
+and the narration is encoded to AAC once for the whole video.
+"""
+import os
+import re
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel
+from config import Config
+from ffmpeg_tools import MediaInfo, probe, run_ffmpeg, concat_copy, write_concat_list
+from audio_probe import audio_duration
+from narration_track import TrackPart, build_narration_track
+from instrumentation import in_context, span
+
+# How a scene is fitted to its narration when the narration is longer
+FIT_MODES = ("freeze", "loop", "none")
+
+_SCENE_NUMBER_RE = re.compile(r"scene_(\d+)")
+
+
+class AssemblyScene(BaseModel):
+    """A rendered scene and its (optional) narration."""
+    scene_number: int
+    video: str
+    audio: Optional[str] = None
+
+
+class SegmentPlan(BaseModel):
+    """How one scene is fitted to its narration."""
+    scene_number: int
+    video_duration: float
+    narration_duration: Optional[float] = None
+    duration: float             # Length of the finished segment
+    padding: float = 0.0        # Seconds added after the scene's own frames
+    mode: str = "copy"          # "copy" (stream copy, possibly trimmed), "freeze" or "loop"
+
+
+def narration_durations(audio_paths: Dict[int, str]) -> Dict[int, float]:
+    """
+    Probe narration lengths in parallel.
+    
+    Args:
+        audio_paths: Scene number -> narration file (missing files are skipped)
+    
+    Returns:
+        Scene number -> duration in seconds
+    """
+    existing = {number: path for number, path in audio_paths.items() if path and os.path.exists(path)}
+    if not existing:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(len(existing), 8)) as executor:
+        durations = dict(zip(existing, executor.map(audio_duration, existing.values())))
+    return {number: duration for number, duration in durations.items() if duration}
+
+
+class VideoAssembler:
+    """Joins scene videos and narration into the final MP4."""
+    
+    def __init__(self, fit: str = "freeze", temp_dir: str = None, max_workers: int = None):
+        """
+        Initialize the assembler.
+        
+        Args:
+            fit: When narration outlasts a scene: "freeze" holds the last frame,
+                "loop" replays the scene, "none" keeps the scene length
+            temp_dir: Where per-scene segments are written (default: Config.TEMP_DIR)
+            max_workers: Segments prepared in parallel (default: Config.RENDER_WORKERS)
+        """
+        if fit not in FIT_MODES:
+            raise ValueError(f"Unknown fit mode '{fit}'. Available: {', '.join(FIT_MODES)}")
+        self.fit = fit
+        self.temp_dir = temp_dir or Config.TEMP_DIR
+        self.max_workers = max(1, max_workers or Config.RENDER_WORKERS)
+    
+    def assemble(self, scenes: List[AssemblyScene], output_path: str) -> Optional[str]:
+        """
+        Build the final video.
+        
+        Args:
+            scenes: Scenes in playback order
+            output_path: Path to save the final video
+        
+        Returns:
+            output_path, or None if no scene could be assembled
+        """
+        scenes = [scene for scene in scenes if os.path.exists(scene.video)]
+        if not scenes:
+            return None
+        
+        with_audio = any(scene.audio and os.path.exists(scene.audio) for scene in scenes)
+        os.makedirs(self.temp_dir, exist_ok=True)
+        
+        workers = min(len(scenes), self.max_workers)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            segments = list(executor.map(in_context(self.prepare_segment), scenes))
+        prepared = [(scene, segment) for scene, segment in zip(scenes, segments) if segment]
+        if not prepared:
+            return None
+        segments = [segment_path for _, (segment_path, _) in prepared]
+        infos = [probe(segment) for segment in segments]
+        
+        track_path = None
+        if with_audio:
+            # Built to the segments' measured lengths (or the length they were cut
+            # to, if ffmpeg reports none), so the copied track stays in sync
+            track_path = os.path.join(self.temp_dir, "assembly_narration.m4a")
+            build_narration_track([
+                TrackPart(scene_number=scene.scene_number, audio=scene.audio,
+                          duration=info.duration or plan.duration)
+                for (scene, (_, plan)), info in zip(prepared, infos)
+            ], track_path)
+        
+        list_path = os.path.join(self.temp_dir, "assembly_segments.txt")
+        params = {info.video_params() for info in infos}
+        with span("concat", "assembly", copied=len(params) == 1) as call:
+            if len(params) == 1:
+                concat_copy(segments, output_path, list_path, audio=track_path)
+            else:
+                print(f"  [WARN] Scene encodings differ, re-encoding while joining")
+                self._concat_reencode(segments, output_path, list_path, track_path)
+            call.add_file(output_path)
+        
+        for path in segments + ([track_path] if track_path else []):
+            os.remove(path)
+        return output_path
+    
+    def plan_segment(self, scene: AssemblyScene, video: MediaInfo, narration_duration: Optional[float]) -> SegmentPlan:
+        """
+        Work out how long a scene's segment is and how its video gets there.
+        
+        Video is only re-encoded (freeze) when the narration outlasts the scene
+        by more than a frame; scenes rendered to their narration length, and
+        scenes that are trimmed, are stream-copied.
+        """
+        video_duration = video.duration or 0.0
+        duration = narration_duration or video_duration
+        if self.fit == "none":
+            duration = video_duration
+        padding = duration - video_duration
+        
+        mode = "copy"
+        if video.fps and padding > 1.0 / video.fps:
+            mode = "loop" if self.fit == "loop" else "freeze"
+        return SegmentPlan(
+            scene_number=scene.scene_number,
+            video_duration=video_duration,
+            narration_duration=narration_duration,
+            duration=duration,
+            padding=max(0.0, padding) if mode != "copy" else 0.0,
+            mode=mode
+        )
+    
+    def prepare_segment(self, scene: AssemblyScene) -> Optional[Tuple[str, SegmentPlan]]:
+        """
+        Fit one scene's video to its narration's length (video only; the
+        narration goes into the continuous track).
+        
+        Returns:
+            (segment path, plan), or None if the scene failed
+        """
+        segment_path = os.path.join(self.temp_dir, f"scene_{scene.scene_number}_assembly.mp4")
+        audio_path = scene.audio if scene.audio and os.path.exists(scene.audio) else None
+        try:
+            video = probe(scene.video)
+            plan = self.plan_segment(scene, video, audio_duration(audio_path) if audio_path else None)
+            
+            if plan.mode == "freeze":
+                # One encode pass; ffmpeg clones the last frame, nothing is held in Python
+                video_input = ["-i", scene.video]
+                video_output = self._reencode_args(video) + [
+                    "-vf", f"tpad=stop_mode=clone:stop_duration={plan.padding:.3f}"
+                ]
+            elif plan.mode == "loop":
+                video_input = ["-stream_loop", "-1", "-i", scene.video]
+                video_output = ["-c:v", "copy"]
+            else:
+                video_input = ["-i", scene.video]
+                video_output = ["-c:v", "copy"]
+            
+            with span("segment", "assembly", scene=scene.scene_number, mode=plan.mode) as call:
+                run_ffmpeg(
+                    *video_input,
+                    "-map", "0:v", *video_output, "-an",
+                    "-t", f"{plan.duration:.3f}",
+                    segment_path
+                )
+                call.add_file(segment_path)
+            detail = f"{plan.mode} +{plan.padding:.2f}s" if plan.padding else plan.mode
+            print(f"    [OK] Scene {scene.scene_number}: {plan.duration:.2f}s ({detail})")
+            return segment_path, plan
+        
+        except Exception as e:
+            print(f"    [X] Scene {scene.scene_number} failed: {e}")
+            return None
+    
+    def _reencode_args(self, video: MediaInfo) -> List[str]:
+        """Encoder settings matching the source, so the segment joins the copied ones."""
+        args = ["-c:v", "libx264", "-pix_fmt", video.pix_fmt or "yuv420p"]
+        if video.profile and video.profile.lower() in ("baseline", "main", "high"):
+            args += ["-profile:v", video.profile.lower()]
+        if video.fps:
+            args += ["-r", f"{video.fps:g}"]
+        return args
+    
+    def _concat_reencode(self, segments: List[str], output_path: str, list_path: str,
+                         track_path: Optional[str] = None):
+        """Join segments whose video parameters differ (slow path; the narration track is still copied)."""
+        write_concat_list(segments, list_path)
+        track = ["-i", track_path, "-map", "0:v", "-map", "1:a", "-c:a", "copy"] if track_path else []
+        try:
+            first = probe(segments[0])
+            scale = f"scale={first.width}:{first.height}:force_original_aspect_ratio=decrease," \
+                    f"pad={first.width}:{first.height}:(ow-iw)/2:(oh-ih)/2"
+            run_ffmpeg(
+                "-f", "concat", "-safe", "0", "-i", list_path, *track,
+                "-vf", scale, *self._reencode_args(first), output_path
+            )
+        finally:
+            if os.path.exists(list_path):
+                os.remove(list_path)
+
+
+def assemble_video(scenes: List[AssemblyScene], output_path: str, fit: str = "freeze") -> Optional[str]:
+    """Convenience wrapper: assemble scenes into output_path with a fresh VideoAssembler."""
+    return VideoAssembler(fit=fit).assemble(scenes, output_path)
+
+
+def _local_path(path: str) -> str:
+    """Paths in results files may have been written on Windows."""
+    return path.replace("\\", "/") if os.sep == "/" else path
+
+
+def _scene_number(path: str) -> Optional[int]:
+    match = _SCENE_NUMBER_RE.search(os.path.basename(path))
+    return int(match.group(1)) if match else None
+
+
+def discover_scenes(results: dict, style: str = None, audio_dir: str = None) -> List[AssemblyScene]:
+    """
+    Find every scene's video and narration for a pipeline run.
+    
+    Args:
+        results: Parsed results JSON written by VideoPipeline.generate_video
+        style: Render style whose scene files to use (see render_styles); by default
+            the run's own scene files, then the default style's and legacy names
+        audio_dir: Narration directory overriding the run's audio files
+    
+    Returns:
+        Scenes in scene order; scenes whose video is missing have video=""
+    """
+    output_dir = Config.OUTPUT_DIR
+    videos = {}
+    if not style:
+        for path in results.get("scene_files", []):
+            path = _local_path(path)
+            if _scene_number(path) is not None:
+                videos[_scene_number(path)] = path
+    
+    audio = {}
+    if audio_dir:
+        for name in os.listdir(audio_dir) if os.path.isdir(audio_dir) else []:
+            if name.endswith("_narration.mp3") and _scene_number(name) is not None:
+                audio[_scene_number(name)] = os.path.join(audio_dir, name)
+    else:
+        for path in results.get("audio_files", []):
+            path = _local_path(path)
+            if _scene_number(path) is not None:
+                audio[_scene_number(path)] = path
+    
+    # Scene numbers come from the blueprint when it is available
+    numbers = set(videos) | set(audio)
+    blueprint_path = _local_path(results.get("blueprint", ""))
+    if blueprint_path and os.path.exists(blueprint_path):
+        with open(blueprint_path, encoding="utf-8") as f:
+            numbers |= {scene["scene_number"] for scene in json.load(f).get("scene_blueprints", [])}
+    
+    if style:
+        from render_styles import get_style
+        suffixes = [get_style(style).suffix]
+    else:
+        suffixes = ["", "_video"]
+    for number in numbers:
+        if number in videos:
+            continue
+        for suffix in suffixes:
+            for ext in (".mp4", ".png"):
+                candidate = os.path.join(output_dir, f"scene_{number}{suffix}{ext}")
+                if number not in videos and os.path.exists(candidate):
+                    videos[number] = candidate
+    
+    return [
+        AssemblyScene(scene_number=number, video=videos.get(number, ""), audio=audio.get(number))
+        for number in sorted(numbers)
+    ]
+
+
+def assemble_results(results_path: str, style: str = None, audio_dir: str = None,
+                     output_path: str = None, fit: str = "freeze",
+                     render_missing: bool = False, preset: str = None) -> Optional[str]:
+    """
+    Assemble the final video for a pipeline run from its results JSON.
+    
+    Args:
+        results_path: Results JSON written by VideoPipeline.generate_video
+        style: Assemble this render style's scenes instead of the run's own
+        audio_dir: Use narration from this directory instead of the run's
+        output_path: Final video (default: the run's video, or <run>_<style>.mp4)
+        fit: How scenes are fitted to longer narration (see FIT_MODES)
+        render_missing: Render scenes without a video from the blueprint
+            (with style, through ManimEngine and its render cache)
+        preset: Render preset for scenes rendered or encoded here (default: Config.RENDER_PRESET)
+    
+    Returns:
+        output_path, or None if nothing could be assembled
+    """
+    with open(results_path, encoding="utf-8") as f:
+        results = json.load(f)
+    scenes = discover_scenes(results, style=style, audio_dir=audio_dir)
+    blueprint_path = _local_path(results.get("blueprint", ""))
+    
+    if not output_path:
+        video_path = _local_path(results.get("video") or results_path.replace("_results.json", ".mp4"))
+        output_path = f"{os.path.splitext(video_path)[0]}_{style}.mp4" if style else video_path
+    
+    print(f"[VIDEO] Assembling {len(scenes)} scenes for: {results.get('topic', results_path)}")
+    missing = [scene for scene in scenes if not scene.video]
+    if missing and render_missing and style and os.path.exists(blueprint_path):
+        _render_missing(missing, blueprint_path, style, preset)
+    for scene in scenes:
+        if not scene.video:
+            print(f"  [WARN] Scene {scene.scene_number} video not found")
+    scenes = [scene for scene in scenes if scene.video]
+    if not scenes:
+        return None
+    
+    if all(scene.video.endswith(".png") for scene in scenes):
+        # Simple-renderer runs keep images; encode them on the ffmpeg fast path
+        from simple_video_generator import SimpleVideoGenerator
+        from models_schemas import VideoBlueprint
+        with open(blueprint_path, encoding="utf-8") as f:
+            blueprint = VideoBlueprint(**json.load(f))
+        audio_dirs = {os.path.dirname(scene.audio) for scene in scenes if scene.audio}
+        image_dirs = {os.path.dirname(scene.video) for scene in scenes}
+        if len(image_dirs) > 1:
+            raise ValueError(f"Scene images are spread over several directories: {', '.join(sorted(image_dirs))}")
+        # Encode from where the run wrote its images (batch and scene_dir runs
+        # keep them in a per-run directory), as VideoPipeline does with scene_dir
+        generator = SimpleVideoGenerator(preset=preset)
+        image_dir = image_dirs.pop()
+        if os.path.abspath(image_dir) != os.path.abspath(generator.output_dir):
+            generator.output_dir = image_dir
+            generator.temp_dir = os.path.join(image_dir, "temp")
+        generator.encode_video(
+            blueprint, [scene.video for scene in scenes],
+            output_path, audio_dirs.pop() if len(audio_dirs) == 1 else audio_dir
+        )
+        return output_path
+    
+    return VideoAssembler(fit=fit).assemble(scenes, output_path)
+
+
+def _render_missing(scenes: List[AssemblyScene], blueprint_path: str, style: str, preset: str = None):
+    """Render scenes that have no video yet, each to its narration's length."""
+    from manim_engine import ManimEngine
+    from models_schemas import VideoBlueprint
+    with open(blueprint_path, encoding="utf-8") as f:
+        blueprint = VideoBlueprint(**json.load(f))
+    wanted = {scene.scene_number: scene for scene in scenes}
+    durations = narration_durations({scene.scene_number: scene.audio for scene in scenes})
+    
+    engine = ManimEngine(style=style, preset=preset)
+    jobs = [
+        engine.prepare_scene_job(scene_bp, target_duration=durations.get(scene_bp.scene_number))
+        for scene_bp in blueprint.scene_blueprints if scene_bp.scene_number in wanted
+    ]
+    print(f"  Rendering {len(jobs)} missing scenes in '{style}' style...")
+    for result in engine.scheduler.run(jobs):
+        if result.success:
+            wanted[result.scene_number].video = result.output_path
@@ -8,14 +8,22 @@ from pathlib import Path
 from manim import *
 from models_schemas import VideoBlueprint, SceneBlueprint, AnimationElement
 from config import Config
+from render_presets import get_preset
+from render_scheduler import MOVIE_PATH_ENV
 
 
 class VideoGenerator:
     """Generates MP4 videos from animation blueprints using Manim."""
     
-    def __init__(self):
-        """Initialize the video generator."""
+    def __init__(self, preset: str = None):
+        """
+        Initialize the video generator.
+        
+        Args:
+            preset: Render preset name (default: Config.RENDER_PRESET)
+        """
         self.output_dir = Config.OUTPUT_DIR
+        self.preset = get_preset(preset)
     
     def generate(self, blueprint: VideoBlueprint, output_path: str):
         """
@@ -59,11 +67,12 @@ class VideoGenerator:
         # Render with Manim CLI
         output_file = os.path.join(self.output_dir, f"scene_{scene_bp.scene_number}.mp4")
         
+        movie_path_file = os.path.join(self.output_dir, f"temp_scene_{scene_bp.scene_number}_movie.txt")
         try:
             # Run manim command
             cmd = [
                 "manim",
-                "-ql",  # Low quality for speed
+                *self.preset.manim_cli_args(),
                 "--format=mp4",
                 f"--output_file={output_file}",
                 "--disable_caching",
@@ -75,24 +84,24 @@ class VideoGenerator:
                 cmd,
                 capture_output=True,
                 text=True,
-                cwd=self.output_dir
+                cwd=self.output_dir,
+                env={**os.environ, MOVIE_PATH_ENV: os.path.abspath(movie_path_file)}
             )
             
             # Clean up temp file
             if os.path.exists(temp_file):
                 os.remove(temp_file)
             
-            # Find the rendered file (Manim puts it in media folder)
-            media_dir = os.path.join(self.output_dir, "media", "videos", f"temp_scene_{scene_bp.scene_number}", "480p15")
-            if os.path.exists(media_dir):
-                for file in os.listdir(media_dir):
-                    if file.endswith(".mp4"):
-                        src = os.path.join(media_dir, file)
-                        dst = os.path.join(self.output_dir, f"scene_{scene_bp.scene_number}.mp4")
-                        if os.path.exists(src):
-                            import shutil
-                            shutil.copy(src, dst)
-                            return dst
+            # The scene reports where Manim wrote the movie (see _generate_scene_code)
+            if os.path.exists(movie_path_file):
+                with open(movie_path_file, 'r', encoding='utf-8') as f:
+                    src = f.read().strip()
+                os.remove(movie_path_file)
+                dst = os.path.join(self.output_dir, f"scene_{scene_bp.scene_number}.mp4")
+                if os.path.exists(src):
+                    import shutil
+                    shutil.copy(src, dst)
+                    return dst
             
             return output_file
             
@@ -163,6 +172,14 @@ class DynamicScene(Scene):
         remaining = ''' + str(scene_bp.duration) + ''' - current_time
         if remaining > 0:
             self.wait(remaining)
+    
+    def render(self, *args, **kwargs):
+        super().render(*args, **kwargs)
+        import os
+        path_file = os.environ.get("''' + MOVIE_PATH_ENV + '''")
+        if path_file:
+            with open(path_file, "w", encoding="utf-8") as f:
+                f.write(str(self.renderer.file_writer.movie_file_path))
 '''
         
         return code